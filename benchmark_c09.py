@@ -0,0 +1,832 @@
+# benchmark_c09.py - Benchmarks e verificação de paridade do processamento C09
+"""
+Compara as implementações vetorizadas do processador C09 com as versões
+originais (linha a linha), usando dados sintéticos no formato do Frotalog.
+Verifica que a saída é idêntica e mede o ganho de tempo.
+
+Execute localmente: python benchmark_c09.py [agrupamento] [trajetos] [justificativas] [excel] [candles] [saidas] [candles_todos] [sentinela_grupos] [enriquecimento] [--tamanhos 10000,100000,1000000]
+"""
+
+import sys
+import time
+import argparse
+import multiprocessing
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent))
+
+from core.processor import C09DataProcessor
+from core.excel_writer import escrever_excel_tabelas
+
+
+CONFIG_POIS_SINTETICO = [
+    {"ponto_interesse": "PA AGUA CLARA", "grupo": "Parada Operacional", "sla_horas": 0, "ativo": True},
+    {"ponto_interesse": "Carregamento RRp", "grupo": "Carregamento", "sla_horas": 1.0, "ativo": True},
+    {"ponto_interesse": "Carregamento Fabrica RRP", "grupo": "Fabrica", "sla_horas": 1.0, "ativo": True},
+    {"ponto_interesse": "Descarga Inocencia", "grupo": "Descarregamento", "sla_horas": 1.1833, "ativo": True},
+    {"ponto_interesse": "Oficina JSL", "grupo": "Manutenção", "sla_horas": 0, "ativo": True},
+]
+
+OBSERVACOES_SINTETICAS = [
+    None,
+    "",
+    "Veículo permaneceu no POI após o fim do período pesquisado",
+    "Entrada registrada manualmente",
+]
+
+
+# ==========================================
+# DADOS SINTÉTICOS
+# ==========================================
+
+def gerar_dados_sinteticos(n_registros: int, n_veiculos: int = 90, seed: int = 42) -> pd.DataFrame:
+    """
+    Gera registros C09 sintéticos já filtrados e ordenados por Veículo/Data Entrada,
+    como chegam em _agrupar_registros_consecutivos.
+    """
+    rng = np.random.default_rng(seed)
+    pois = [poi["ponto_interesse"] for poi in CONFIG_POIS_SINTETICO]
+
+    veiculos = np.sort(rng.integers(0, n_veiculos, n_registros))
+    # Repete o POI anterior em ~30% dos casos para gerar blocos consecutivos
+    idx_poi = rng.integers(0, len(pois), n_registros)
+    repete = rng.random(n_registros) < 0.3
+    for i in np.flatnonzero(repete):
+        if i > 0:
+            idx_poi[i] = idx_poi[i - 1]
+
+    inicio = pd.Timestamp("2025-01-01")
+    passo_min = rng.integers(10, 240, n_registros)
+    offsets = np.zeros(n_registros, dtype=np.int64)
+    for v in np.unique(veiculos):
+        mascara = veiculos == v
+        offsets[mascara] = np.cumsum(passo_min[mascara])
+    entradas = inicio + pd.to_timedelta(offsets, unit="min")
+    saidas = entradas + pd.to_timedelta(rng.integers(1, 180, n_registros), unit="min")
+
+    obs = rng.integers(0, len(OBSERVACOES_SINTETICAS), n_registros)
+
+    return pd.DataFrame({
+        "Veículo": [f"RB - VE{v:03d}" for v in veiculos],
+        "Ponto de Interesse": np.array(pois, dtype=object)[idx_poi],
+        "Data Entrada": entradas,
+        "Data Saída": saidas,
+        "Observações": [OBSERVACOES_SINTETICAS[o] for o in obs],
+    })
+
+
+def gerar_eventos_sinteticos(n_visitas: int, n_veiculos: int = 200, seed: int = 42) -> pd.DataFrame:
+    """
+    Gera um mês de eventos de entrada/saída de um POI no formato de gerar_candles_poi
+    (ordenados por Data Evento, com 'Veículos no POI' após cada evento).
+    Horários em minutos cheios: há empates e eventos em hora exata.
+    """
+    rng = np.random.default_rng(seed)
+    inicio = pd.Timestamp("2025-01-01")
+
+    veiculos = [f"VE{v:03d}" for v in rng.integers(0, n_veiculos, n_visitas)]
+    entradas = inicio + pd.to_timedelta(rng.integers(0, 30 * 24 * 60, n_visitas), unit="min")
+    saidas = entradas + pd.to_timedelta(rng.integers(5, 12 * 60, n_visitas), unit="min")
+    # ~5% ainda no POI (saída ignorada)
+    com_saida = rng.random(n_visitas) >= 0.05
+
+    eventos = pd.concat([
+        pd.DataFrame({"Veículo": veiculos, "Data Evento": entradas, "Evento": "entrada"}),
+        pd.DataFrame({"Veículo": veiculos, "Data Evento": saidas, "Evento": "saida"})[com_saida],
+    ], ignore_index=True)
+    eventos.sort_values(by="Data Evento", inplace=True)
+
+    dentro_poi = set()
+    veiculos_no_poi = []
+    for placa, evento in zip(eventos["Veículo"], eventos["Evento"]):
+        if evento == "entrada":
+            dentro_poi.add(placa)
+        else:
+            dentro_poi.discard(placa)
+        veiculos_no_poi.append(";".join(sorted(dentro_poi)))
+    eventos["Veículos no POI"] = veiculos_no_poi
+    eventos["POI"] = "PA AGUA CLARA"
+
+    return eventos
+
+
+# ==========================================
+# IMPLEMENTAÇÕES ORIGINAIS (REFERÊNCIA)
+# ==========================================
+
+def agrupar_registros_legado(processor: C09DataProcessor, df: pd.DataFrame) -> pd.DataFrame:
+    """Versão original de _agrupar_registros_consecutivos (laço com iloc)."""
+    df["Grupo"] = df["Ponto de Interesse"].apply(processor._classificar_grupo)
+
+    agrupados = []
+    df_reset = df.reset_index(drop=True)
+    idx = 0
+    while idx < len(df_reset):
+        atual = df_reset.iloc[idx]
+        veic = atual["Veículo"]
+        ponto = atual["Ponto de Interesse"]
+        grupo = atual["Grupo"]
+        entrada = atual["Data Entrada"]
+        saida = atual["Data Saída"]
+
+        j = idx + 1
+        while j < len(df_reset) and df_reset.iloc[j]["Veículo"] == veic and df_reset.iloc[j]["Ponto de Interesse"] == ponto:
+            saida = df_reset.iloc[j]["Data Saída"]
+            j += 1
+
+        agrupados.append({
+            "Veículo": veic,
+            "Ponto de Interesse": ponto,
+            "Data Entrada": entrada,
+            "Data Saída": saida,
+            "Grupo": grupo,
+            "Observações": atual.get("Observações", "")
+        })
+        idx = j
+
+    df_ag = pd.DataFrame(agrupados)
+    df_ag["Tempo (h)"] = (df_ag["Data Saída"] - df_ag["Data Entrada"]).dt.total_seconds() / 3600
+    df_ag["Tempo (h)"] = df_ag["Tempo (h)"].round(5)
+    df_ag["Trajeto Carregado"] = 0.0
+    df_ag["Trajeto Vazio"] = 0.0
+    df_ag["Observação"] = ""
+    return df_ag
+
+
+def calcular_trajetos_legado(processor: C09DataProcessor, df_ag: pd.DataFrame) -> pd.DataFrame:
+    """Versão original de _calcular_trajetos (varredura para frente com iloc/at)."""
+    def soma_justificativas(df_temp, i_inicio, i_fim):
+        horas_manutencao = 0.0
+        horas_operacional = 0.0
+        for k in range(i_inicio + 1, i_fim):
+            registro = df_temp.iloc[k]
+            if registro["Grupo"] == "Manutenção":
+                horas_manutencao += registro["Tempo (h)"]
+            elif registro["Grupo"] == "Parada Operacional":
+                horas_operacional += registro["Tempo (h)"]
+        return horas_manutencao, horas_operacional
+
+    for i in range(len(df_ag)):
+        atual = df_ag.iloc[i]
+        veic = atual["Veículo"]
+        grupo = atual["Grupo"]
+        saida_atual = atual["Data Saída"]
+
+        if grupo in ["Carregamento", "Fabrica"]:
+            coluna, chave_sla, destino = "Trajeto Carregado", "trajeto_carregado", ["Descarregamento", "Terminal"]
+        elif grupo in ["Descarregamento", "Terminal"]:
+            coluna, chave_sla, destino = "Trajeto Vazio", "trajeto_vazio", ["Carregamento", "Fabrica"]
+        else:
+            continue
+
+        for j in range(i + 1, len(df_ag)):
+            prox = df_ag.iloc[j]
+            if prox["Veículo"] != veic:
+                break
+            if prox["Grupo"] in destino:
+                if prox["Data Entrada"] >= saida_atual:
+                    delta_h = (prox["Data Entrada"] - saida_atual).total_seconds() / 3600
+                    df_ag.at[i, coluna] = round(delta_h, 5)
+
+                    if delta_h > processor.slas.get(chave_sla, float('inf')):
+                        horas_mant, horas_oper = soma_justificativas(df_ag, i, j)
+                        if (horas_mant + horas_oper) > 0:
+                            df_ag.at[i, "Observação"] += (
+                                f"{coluna} longo ({delta_h:.2f}h > {processor.slas[chave_sla]:.2f}h): "
+                                f"{horas_mant:.2f}h em Manutenção, {horas_oper:.2f}h em Parada Operacional. "
+                            )
+                        else:
+                            df_ag.at[i, "Observação"] += (
+                                f"{coluna} longo ({delta_h:.2f}h > {processor.slas[chave_sla]:.2f}h), sem justificativa. "
+                            )
+                break
+
+    return df_ag
+
+
+def criar_excel_legado(df: pd.DataFrame) -> BytesIO:
+    """Versão original de _criar_excel_formatado (pandas + load_workbook + save)."""
+    from openpyxl import load_workbook
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.table import Table, TableStyleInfo
+
+    buffer_excel = BytesIO()
+    with pd.ExcelWriter(buffer_excel, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Relatório")
+    buffer_excel.seek(0)
+
+    wb = load_workbook(buffer_excel)
+    ws = wb.active
+    if ws.max_row > 1 and ws.max_column > 0:
+        tabela = Table(displayName="TabelaRelatorio", ref=f"A1:{get_column_letter(ws.max_column)}{ws.max_row}")
+        tabela.tableStyleInfo = TableStyleInfo(name="TableStyleMedium2", showRowStripes=True)
+        ws.add_table(tabela)
+
+    final_buffer = BytesIO()
+    wb.save(final_buffer)
+    final_buffer.seek(0)
+    return final_buffer
+
+
+def resumir_por_hora_legado(eventos: pd.DataFrame, poi: str) -> pd.DataFrame:
+    """Versão original do resumo por hora de gerar_candles_poi (filtro por hora + iterrows)."""
+    start_time = eventos['Data Evento'].min().floor('h')
+    end_time = eventos['Data Evento'].max().ceil('h')
+    timeline = pd.date_range(start=start_time, end=end_time, freq='h')
+
+    contagem = []
+    linha_atual = 0
+    dentro_poi = set()
+    veiculos_fim_anterior = 0
+
+    for i in range(len(timeline) - 1):
+        hora_inicio = timeline[i]
+        hora_fim = timeline[i + 1]
+        eventos_hora = eventos[
+            (eventos['Data Evento'] >= hora_inicio) &
+            (eventos['Data Evento'] < hora_fim)
+        ]
+
+        maximo = minimo = linha_atual
+
+        for _, evento in eventos_hora.iterrows():
+            placa = evento['Veículo']
+            if evento['Evento'] == 'entrada':
+                dentro_poi.add(placa)
+                linha_atual += 1
+            elif evento['Evento'] == 'saida':
+                dentro_poi.discard(placa)
+                linha_atual -= 1
+            maximo = max(maximo, linha_atual)
+            minimo = min(minimo, linha_atual)
+
+        contagem.append({
+            'Hora': hora_fim,
+            'Veículos no início da hora': veiculos_fim_anterior,
+            'Veículos no final da hora': linha_atual,
+            'Máximo de veículos': maximo,
+            'Mínimo de veículos': minimo,
+            'POI': poi,
+            'Veículos no POI': ';'.join(sorted(dentro_poi))
+        })
+
+        veiculos_fim_anterior = linha_atual
+
+    return pd.DataFrame(contagem)
+
+
+PADROES_AINDA_NO_POI_LEGADO = [
+    "permaneceu no poi após o fim do período pesquisado",
+    "permaneceu no poi após o fim do período",
+    "ainda permanece no local",
+    "continua no ponto de interesse",
+    "período pesquisado finalizado",
+    "veículo permaneceu no poi"
+]
+
+
+def mascara_ainda_no_poi_legado(df_poi: pd.DataFrame) -> pd.Series:
+    """Versão original do filtro de saídas de gerar_candles_poi (lower + loop de padrões por linha, sem prints)."""
+    ignoradas = []
+    for _, registro in df_poi.iterrows():
+        observacao = registro.get("Observações", "")
+        ainda_no_poi = False
+        if not pd.isna(observacao):
+            obs_lower = str(observacao).lower().strip()
+            ainda_no_poi = any(padrao in obs_lower for padrao in PADROES_AINDA_NO_POI_LEGADO)
+        ignoradas.append(ainda_no_poi)
+    return pd.Series(ignoradas, index=df_poi.index, dtype=bool)
+
+
+def consolidar_grupo_legado(processor, grupo: str, pois_do_grupo: list) -> pd.DataFrame:
+    """Versão original de _gerar_dados_sentinela_grupo (filtro por hora + laço pelos POIs da hora)."""
+    hoje = pd.Timestamp.now().normalize()
+    dias = [(hoje - pd.Timedelta(days=i)).date() for i in range(4)]
+    df_resumo_hora = processor._ler_aba_reports("Resumo por Hora")
+
+    df_grupo = df_resumo_hora[
+        (df_resumo_hora["POI"].isin(pois_do_grupo)) &
+        (df_resumo_hora["Hora"].dt.date.isin(dias))
+    ].copy()
+    df_grupo["Ocupação"] = processor.indice_placas.de_textos(df_grupo["Veículos no POI"])
+
+    df_consolidado = []
+    for hora in df_grupo["Hora"].unique():
+        df_hora = df_grupo[df_grupo["Hora"] == hora]
+        veiculos_grupo = 0
+        detalhes_pois = []
+
+        for poi, veiculos_poi in zip(df_hora["POI"], df_hora["Ocupação"]):
+            count_poi = veiculos_poi.bit_count()
+            if count_poi > 0:
+                detalhes_pois.append(f"{poi}({count_poi})")
+                veiculos_grupo |= veiculos_poi
+
+        df_consolidado.append({
+            "Hora": hora,
+            "Grupo": grupo,
+            "Veículos no Grupo": veiculos_grupo,
+            "Total_Veiculos": veiculos_grupo.bit_count(),
+            "Detalhes_POIs": " + ".join(detalhes_pois),
+            "POIs_Envolvidos": len(df_hora)
+        })
+
+    return pd.DataFrame(df_consolidado)
+
+
+def gerar_resumo_hora_sintetico(n_linhas: int, n_grupos: int = 8, n_veiculos: int = 300, seed: int = 42) -> tuple:
+    """
+    Aba "Resumo por Hora" dos últimos 4 dias (24 horas × POIs) e POIs por grupo.
+    O número de POIs é ajustado para ~n_linhas linhas.
+    """
+    rng = np.random.default_rng(seed)
+    n_pois = max(n_linhas // 96, n_grupos)
+    pois = [f"POI {i:05d}" for i in range(n_pois)]
+    grupos = {f"Grupo {g}": pois[g::n_grupos] for g in range(n_grupos)}
+
+    horas = pd.date_range(pd.Timestamp.now().floor("h") - pd.Timedelta(hours=95), periods=96, freq="h")
+    placas = np.array([f"PLC{i:04d}" for i in range(n_veiculos)])
+    # Ocupações distintas sorteadas de um conjunto (inclui POI vazio)
+    textos = [""] + [";".join(sorted(rng.choice(placas, int(rng.integers(1, 6)), replace=False))) for _ in range(999)]
+
+    df = pd.DataFrame({
+        "Hora": np.tile(horas, n_pois),
+        "POI": np.repeat(pois, len(horas)),
+        "Veículos no POI": rng.choice(np.array(textos, dtype=object), n_pois * len(horas)),
+    })
+    return df, grupos
+
+
+def enriquecer_alertas_grupo_legado(config_pois: list, df_alertas: pd.DataFrame, df_candles: pd.DataFrame) -> pd.DataFrame:
+    """Versão original de _enriquecer_alertas_entrada_grupo (apply por alerta varrendo todas as entradas)."""
+    df_entradas = df_candles[df_candles["Evento"].str.lower() == "entrada"]
+
+    def buscar_hora_entrada_grupo(row):
+        pois_do_grupo = [
+            poi["ponto_interesse"] for poi in config_pois
+            if poi.get("grupo") == row["Grupo"] and poi.get("ativo", True)
+        ]
+        entradas = df_entradas[
+            (df_entradas["Veículo"] == row["Placa"]) &
+            (df_entradas["POI"].isin(pois_do_grupo)) &
+            (df_entradas["Data Evento"] <= row["Data_Hora_Desvio"])
+        ]
+        return entradas["Data Evento"].max() if not entradas.empty else pd.NaT
+
+    df_alertas["Data_Hora_Entrada"] = df_alertas.apply(buscar_hora_entrada_grupo, axis=1)
+    return df_alertas
+
+
+def gerar_alertas_sinteticos(n_entradas: int, n_veiculos: int = 300, seed: int = 42) -> tuple:
+    """
+    Aba Candles sintética (um mês, POIs de CONFIG_POIS_SINTETICO em 3 grupos) e alertas de grupo
+    (~1 alerta para cada 20 eventos, nos mesmos veículos).
+    """
+    rng = np.random.default_rng(seed)
+    config_pois = [dict(poi, grupo=f"Grupo {i % 3}") for i, poi in enumerate(CONFIG_POIS_SINTETICO)]
+    pois = [poi["ponto_interesse"] for poi in config_pois] + ["POI FORA DA CONFIG"]
+    placas = np.array([f"PLC{i:04d}" for i in range(n_veiculos)], dtype=object)
+    inicio = pd.Timestamp("2025-01-01")
+
+    df_candles = pd.DataFrame({
+        "Veículo": rng.choice(placas, n_entradas),
+        "Data Evento": inicio + pd.to_timedelta(rng.integers(0, 30 * 24 * 60, n_entradas), unit="min"),
+        "Evento": rng.choice(np.array(["entrada", "saida", "Entrada"], dtype=object), n_entradas),
+        "POI": rng.choice(np.array(pois, dtype=object), n_entradas),
+    })
+
+    n_alertas = max(n_entradas // 20, 1)
+    df_alertas = pd.DataFrame({
+        "Placa": rng.choice(placas, n_alertas),
+        "Data_Hora_Desvio": inicio + pd.to_timedelta(rng.integers(0, 30 * 24, n_alertas), unit="h"),
+        "Grupo": rng.choice(np.array(["Grupo 0", "Grupo 1", "Grupo 2"], dtype=object), n_alertas),
+    })
+    return config_pois, df_alertas, df_candles
+
+
+def criar_excel_novo(df: pd.DataFrame) -> BytesIO:
+    """Escrita em passagem única usada por _criar_excel_formatado."""
+    return escrever_excel_tabelas([("Relatório", df, "TabelaRelatorio")], estilo="TableStyleMedium2")
+
+
+ESCRITORES_EXCEL = {
+    "original": criar_excel_legado,
+    "passagem_unica": criar_excel_novo,
+}
+
+
+def gerar_relatorio_final(tamanho: int) -> pd.DataFrame:
+    """DataFrame no formato da aba Relatório (como enviado ao SharePoint)."""
+    processor = C09DataProcessor(CONFIG_POIS_SINTETICO)
+    df = processor._calcular_trajetos(processor._agrupar_registros_consecutivos(gerar_dados_sinteticos(tamanho)))
+    df = processor._formatar_dados_finais(df)
+    df["Data Entrada"] = df["Data Entrada"].dt.strftime("%d/%m/%Y %H:%M:%S")
+    df["Data Saída"] = df["Data Saída"].dt.strftime("%d/%m/%Y %H:%M:%S")
+    return df
+
+
+def _medir_escrita_excel(variante: str, tamanho: int, fila) -> None:
+    """Executa uma escrita em processo isolado e devolve (segundos, pico RSS MB, acréscimo MB)."""
+    import gc
+
+    df = gerar_relatorio_final(tamanho)
+    gc.collect()
+
+    try:
+        import resource
+        fator = 1024 if sys.platform != "darwin" else 1024 * 1024
+        pico_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / fator
+        _, segundos = cronometrar(ESCRITORES_EXCEL[variante], df)
+        pico_depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / fator
+    except ImportError:
+        # Windows: sem ru_maxrss, usa pico de alocações Python
+        import tracemalloc
+        tracemalloc.start()
+        _, segundos = cronometrar(ESCRITORES_EXCEL[variante], df)
+        pico_antes, pico_depois = 0.0, tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    fila.put((segundos, pico_depois, pico_depois - pico_antes))
+
+
+# ==========================================
+# UTILITÁRIOS
+# ==========================================
+
+def cronometrar(funcao, *args) -> tuple:
+    """Executa função e retorna (resultado, segundos)."""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def imprimir_linha(tamanho: int, t_legado: float, t_novo: float):
+    """Imprime linha de resultado do benchmark."""
+    ganho = t_legado / t_novo if t_novo > 0 else float("inf")
+    print(f"   {tamanho:>9,} linhas | original: {t_legado:9.3f}s | novo: {t_novo:7.3f}s | {ganho:8.1f}x")
+
+
+# ==========================================
+# BENCHMARKS
+# ==========================================
+
+def benchmark_agrupamento(tamanhos: list) -> bool:
+    """Benchmark de _agrupar_registros_consecutivos (blocos consecutivos por veículo/POI)."""
+    print("\n📊 AGRUPAMENTO DE REGISTROS CONSECUTIVOS")
+    processor = C09DataProcessor(CONFIG_POIS_SINTETICO)
+    ok = True
+
+    for tamanho in tamanhos:
+        df = gerar_dados_sinteticos(tamanho)
+        esperado, t_legado = cronometrar(agrupar_registros_legado, processor, df.copy())
+        obtido, t_novo = cronometrar(processor._agrupar_registros_consecutivos, df.copy())
+
+        try:
+            pd.testing.assert_frame_equal(obtido, esperado)
+        except AssertionError as e:
+            print(f"❌ Divergência com {tamanho} linhas: {e}")
+            ok = False
+
+        imprimir_linha(tamanho, t_legado, t_novo)
+
+    return ok
+
+
+def benchmark_trajetos(tamanhos: list) -> bool:
+    """Benchmark de _calcular_trajetos (trajeto carregado/vazio e justificativas de SLA)."""
+    print("\n📊 CÁLCULO DE TRAJETOS")
+    processor = C09DataProcessor(CONFIG_POIS_SINTETICO)
+    ok = True
+
+    for tamanho in tamanhos:
+        df_ag = processor._agrupar_registros_consecutivos(gerar_dados_sinteticos(tamanho))
+        esperado, t_legado = cronometrar(calcular_trajetos_legado, processor, df_ag.copy())
+        obtido, t_novo = cronometrar(processor._calcular_trajetos, df_ag.copy())
+
+        try:
+            pd.testing.assert_frame_equal(obtido, esperado)
+        except AssertionError as e:
+            print(f"❌ Divergência com {tamanho} linhas: {e}")
+            ok = False
+
+        n_alertas = (obtido["Observação"] != "").sum()
+        imprimir_linha(tamanho, t_legado, t_novo)
+        print(f"   {'':>9}   ({n_alertas} trajetos acima do SLA)")
+
+    return ok
+
+
+def benchmark_justificativas(tamanhos: list, n_sementes: int = 10) -> bool:
+    """
+    Paridade das justificativas de trajeto longo (somas acumuladas x soma linha a linha)
+    em dados aleatórios com SLAs apertados e tempos ausentes. A comparação é feita no texto
+    da Observação (horas com 2 casas), que é o que vai para o relatório.
+    """
+    print("\n📊 JUSTIFICATIVAS DE TRAJETO LONGO (PARIDADE ALEATÓRIA)")
+    ok = True
+
+    for tamanho in tamanhos:
+        divergencias = total = 0
+        t_legado = t_novo = 0.0
+
+        for seed in range(n_sementes):
+            processor = C09DataProcessor(CONFIG_POIS_SINTETICO)
+            processor.slas["trajeto_carregado"] = 1.0
+            processor.slas["trajeto_vazio"] = 1.0
+
+            df_ag = processor._agrupar_registros_consecutivos(
+                gerar_dados_sinteticos(tamanho, n_veiculos=10, seed=seed)
+            )
+            ausentes = df_ag.sample(frac=0.02, random_state=seed).index
+            df_ag.loc[ausentes, "Tempo (h)"] = np.nan
+
+            esperado, t = cronometrar(calcular_trajetos_legado, processor, df_ag.copy())
+            t_legado += t
+            obtido, t = cronometrar(processor._calcular_trajetos, df_ag.copy())
+            t_novo += t
+
+            divergencias += (obtido["Observação"] != esperado["Observação"]).sum()
+            total += (esperado["Observação"] != "").sum()
+
+        if divergencias:
+            print(f"❌ {divergencias} observações divergentes com {tamanho} linhas")
+            ok = False
+
+        imprimir_linha(tamanho, t_legado / n_sementes, t_novo / n_sementes)
+        print(f"   {'':>9}   ({total} justificativas comparadas em {n_sementes} sementes)")
+
+    return ok
+
+
+def benchmark_excel(tamanhos: list) -> bool:
+    """Benchmark de escrita do Excel tratado: tempo e pico de RSS (processo isolado por medição)."""
+    print("\n📊 ESCRITA DO EXCEL FORMATADO (TABELA)")
+    ok = True
+
+    # Paridade de conteúdo e tabela (inclui caso com mais de 26 colunas)
+    df = gerar_relatorio_final(min(tamanhos))
+    largo = df.assign(**{f"Extra {i}": i for i in range(20)})
+    for df_teste in (df, largo):
+        esperado = pd.read_excel(criar_excel_legado(df_teste))
+        buffer_novo = criar_excel_novo(df_teste)
+        obtido = pd.read_excel(buffer_novo)
+        from openpyxl import load_workbook
+        refs = [t.ref for t in load_workbook(buffer_novo).active.tables.values()]
+        try:
+            pd.testing.assert_frame_equal(obtido, esperado)
+            ultima_coluna = refs[0].split(":")[1].rstrip("0123456789")
+            print(f"   {len(df_teste.columns)} colunas: conteúdo idêntico, tabela {refs[0]} ({ultima_coluna})")
+        except AssertionError as e:
+            print(f"❌ Divergência de conteúdo: {e}")
+            ok = False
+
+    contexto = multiprocessing.get_context("spawn")
+    for tamanho in tamanhos:
+        medidas = {}
+        for variante in ESCRITORES_EXCEL:
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_medir_escrita_excel, args=(variante, tamanho, fila))
+            processo.start()
+            medidas[variante] = fila.get()
+            processo.join()
+
+        (t_legado, rss_legado, inc_legado) = medidas["original"]
+        (t_novo, rss_novo, inc_novo) = medidas["passagem_unica"]
+        imprimir_linha(tamanho, t_legado, t_novo)
+        print(f"   {'':>9}   pico RSS: {rss_legado:7.1f} MB (+{inc_legado:.1f}) → {rss_novo:7.1f} MB (+{inc_novo:.1f})")
+
+    return ok
+
+
+def benchmark_candles(tamanhos: list) -> bool:
+    """Benchmark do resumo por hora de gerar_candles_poi (um mês de eventos de um POI)."""
+    # Import tardio: analytics depende do cliente SharePoint (office365)
+    from core.analytics_processor import AnalyticsProcessor
+
+    print("\n📊 RESUMO POR HORA DOS CANDLES (1 MÊS)")
+    ok = True
+
+    for tamanho in tamanhos:
+        casos = [gerar_eventos_sinteticos(tamanho)]
+        # Casos de borda: último evento em hora exata e todos os eventos na mesma hora exata
+        exato = casos[0].copy()
+        exato.loc[exato.index[-1], "Data Evento"] = exato["Data Evento"].max().ceil("h")
+        casos += [exato, exato[exato["Data Evento"] == exato["Data Evento"].max()]]
+
+        tempos = []
+        for eventos in casos:
+            esperado, t_legado = cronometrar(resumir_por_hora_legado, eventos, "PA AGUA CLARA")
+            obtido, t_novo = cronometrar(AnalyticsProcessor._resumir_por_hora, eventos)
+            tempos.append((t_legado, t_novo, len(esperado)))
+
+            try:
+                pd.testing.assert_frame_equal(obtido, esperado)
+            except AssertionError as e:
+                print(f"❌ Divergência com {tamanho} visitas: {e}")
+                ok = False
+
+        t_legado, t_novo, n_horas = tempos[0]
+        imprimir_linha(len(casos[0]), t_legado, t_novo)
+        print(f"   {'':>9}   ({n_horas} horas, {tamanho} visitas; linhas = eventos)")
+
+    return ok
+
+
+def benchmark_saidas(tamanhos: list) -> bool:
+    """Benchmark do filtro de saídas "ainda no POI" de gerar_candles_poi (um mês de registros de um POI)."""
+    # Import tardio: analytics depende do cliente SharePoint (office365)
+    from core.analytics_processor import AnalyticsProcessor, compilar_padroes_ainda_no_poi
+
+    print("\n📊 FILTRO DE SAÍDAS AINDA NO POI")
+    regex = compilar_padroes_ainda_no_poi(PADROES_AINDA_NO_POI_LEGADO)
+    observacoes = OBSERVACOES_SINTETICAS + [
+        "VEÍCULO PERMANECEU NO POI",
+        "Período pesquisado finalizado às 23:59",
+        "Continua no ponto de interesse (sinal GPS)",
+    ]
+    ok = True
+
+    for tamanho in tamanhos:
+        rng = np.random.default_rng(42)
+        df_poi = pd.DataFrame({"Observações": rng.choice(np.array(observacoes, dtype=object), tamanho)})
+
+        esperado, t_legado = cronometrar(mascara_ainda_no_poi_legado, df_poi)
+        obtido, t_novo = cronometrar(AnalyticsProcessor._mascara_ainda_no_poi, df_poi["Observações"], regex)
+
+        try:
+            pd.testing.assert_series_equal(obtido, esperado, check_names=False)
+        except AssertionError as e:
+            print(f"❌ Divergência com {tamanho} linhas: {e}")
+            ok = False
+
+        imprimir_linha(tamanho, t_legado, t_novo)
+
+    return ok
+
+
+def gerar_candles_por_poi(processor, df: pd.DataFrame, pois: list) -> tuple:
+    """Chamadas anteriores de processar_analytics_completo: gerar_candles_poi uma vez por POI."""
+    eventos, resumos = [], []
+    for poi in pois:
+        df_eventos, df_resumo_hora = processor.gerar_candles_poi(df, poi)
+        eventos.append(df_eventos)
+        resumos.append(df_resumo_hora)
+    return pd.concat(eventos, ignore_index=True), pd.concat(resumos, ignore_index=True)
+
+
+def benchmark_candles_todos(tamanhos: list) -> bool:
+    """Benchmark de gerar_candles_todos (passada única) contra gerar_candles_poi por POI."""
+    # Import tardio: analytics depende do cliente SharePoint (office365)
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from core.analytics_processor import AnalyticsProcessor
+
+    print("\n📊 CANDLES DE TODOS OS POIS")
+    config = {
+        "credenciais": {"sp_user": "", "sp_password": ""},
+        "unidades": [],
+        "pois_por_unidade": {"RRP": [dict(poi, candles=True) for poi in CONFIG_POIS_SINTETICO]},
+    }
+    ok = True
+
+    for tamanho in tamanhos:
+        df = gerar_dados_sinteticos(tamanho)
+        processor = AnalyticsProcessor("RRP", config)
+        pois = processor.obter_pois_candles()
+
+        with redirect_stdout(StringIO()):
+            esperado, t_legado = cronometrar(gerar_candles_por_poi, processor, df, pois)
+            obtido, t_novo = cronometrar(processor.gerar_candles_todos, df, pois)
+
+        try:
+            for parte_obtida, parte_esperada in zip(obtido, esperado):
+                pd.testing.assert_frame_equal(parte_obtida.reset_index(drop=True), parte_esperada)
+        except AssertionError as e:
+            print(f"❌ Divergência com {tamanho} linhas: {e}")
+            ok = False
+
+        imprimir_linha(tamanho, t_legado, t_novo)
+
+    return ok
+
+
+def benchmark_sentinela_grupos(tamanhos: list) -> bool:
+    """Benchmark da consolidação por grupo de _gerar_dados_sentinela_grupo (4 dias × todos os POIs × todos os grupos)."""
+    # Import tardio: analytics depende do cliente SharePoint (office365)
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from core.analytics_processor import AnalyticsProcessor
+
+    print("\n📊 CONSOLIDAÇÃO SENTINELA POR GRUPO (4 DIAS)")
+    config = {"credenciais": {"sp_user": "", "sp_password": ""}, "unidades": [], "pois_por_unidade": {}}
+    ok = True
+
+    for tamanho in tamanhos:
+        df_resumo_hora, grupos = gerar_resumo_hora_sintetico(tamanho)
+        processor = AnalyticsProcessor("RRP", config)
+        # Aba já carregada: sem leitura do SharePoint
+        processor._ler_aba_reports = lambda sheet_name, desde=None: df_resumo_hora
+
+        def consolidar_todos(funcao):
+            return [funcao(grupo, pois) for grupo, pois in grupos.items()]
+
+        with redirect_stdout(StringIO()):
+            esperado, t_legado = cronometrar(
+                consolidar_todos, lambda grupo, pois: consolidar_grupo_legado(processor, grupo, pois)
+            )
+            obtido, t_novo = cronometrar(consolidar_todos, processor._gerar_dados_sentinela_grupo)
+
+        try:
+            for parte_obtida, parte_esperada in zip(obtido, esperado):
+                parte_esperada["Veículos no Grupo"] = parte_esperada["Veículos no Grupo"].astype(object)
+                pd.testing.assert_frame_equal(parte_obtida, parte_esperada)
+        except AssertionError as e:
+            print(f"❌ Divergência com {tamanho} linhas: {e}")
+            ok = False
+
+        imprimir_linha(len(df_resumo_hora), t_legado, t_novo)
+        print(f"   {'':>9}   ({df_resumo_hora['POI'].nunique()} POIs, {len(grupos)} grupos)")
+
+    return ok
+
+
+def benchmark_enriquecimento(tamanhos: list) -> bool:
+    """Benchmark de _enriquecer_alertas_entrada_grupo (última entrada do veículo no grupo até o desvio)."""
+    # Import tardio: analytics depende do cliente SharePoint (office365)
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from core.analytics_processor import AnalyticsProcessor
+
+    print("\n📊 ENRIQUECIMENTO DE ALERTAS COM ENTRADAS")
+    ok = True
+
+    for tamanho in tamanhos:
+        config_pois, df_alertas, df_candles = gerar_alertas_sinteticos(tamanho)
+        config = {"credenciais": {"sp_user": "", "sp_password": ""}, "unidades": [], "pois_por_unidade": {"RRP": config_pois}}
+        processor = AnalyticsProcessor("RRP", config)
+        # Aba já carregada: sem leitura do SharePoint
+        processor._ler_aba_reports = lambda sheet_name, desde=None: df_candles
+
+        with redirect_stdout(StringIO()):
+            esperado, t_legado = cronometrar(enriquecer_alertas_grupo_legado, config_pois, df_alertas.copy(), df_candles)
+            obtido, t_novo = cronometrar(processor._enriquecer_alertas_entrada_grupo, df_alertas.copy())
+
+        try:
+            pd.testing.assert_series_equal(
+                obtido["Data_Hora_Entrada"], esperado["Data_Hora_Entrada"].astype("datetime64[ns]")
+            )
+            assert (obtido["Tempo"].isna() == esperado["Data_Hora_Entrada"].isna()).all(), "Tempo sem entrada correspondente"
+        except AssertionError as e:
+            print(f"❌ Divergência com {tamanho} eventos: {e}")
+            ok = False
+
+        imprimir_linha(tamanho, t_legado, t_novo)
+        print(f"   {'':>9}   ({len(df_alertas)} alertas; linhas = eventos Candles)")
+
+    return ok
+
+
+BENCHMARKS = {
+    "agrupamento": benchmark_agrupamento,
+    "trajetos": benchmark_trajetos,
+    "justificativas": benchmark_justificativas,
+    "excel": benchmark_excel,
+    "candles": benchmark_candles,
+    "saidas": benchmark_saidas,
+    "candles_todos": benchmark_candles_todos,
+    "sentinela_grupos": benchmark_sentinela_grupos,
+    "enriquecimento": benchmark_enriquecimento,
+}
+
+
+def main():
+    """Executa benchmarks selecionados."""
+    parser = argparse.ArgumentParser(description="Benchmarks do processamento C09")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks a executar (padrão: todos): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--tamanhos", default="10000,100000,1000000", help="Tamanhos separados por vírgula")
+    args = parser.parse_args()
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",")]
+    selecionados = args.benchmarks or list(BENCHMARKS)
+    desconhecidos = [nome for nome in selecionados if nome not in BENCHMARKS]
+    if desconhecidos:
+        parser.error(f"Benchmarks desconhecidos: {desconhecidos}")
+
+    print("🧪 BENCHMARKS C09")
+    print("=" * 60)
+
+    resultados = {nome: BENCHMARKS[nome](tamanhos) for nome in selecionados}
+
+    print("\n" + "=" * 60)
+    for nome, ok in resultados.items():
+        print(f"   {nome}: {'✅ saída idêntica' if ok else '❌ DIVERGÊNCIA'}")
+
+    return 0 if all(resultados.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -55,6 +55,7 @@ class ConfigurationLoader:
                     "empresa_frotalog": row["empresa_frotalog"],
                     "base_sharepoint": row["base_sharepoint"],
                     "total_veiculos": row.get("total_veiculos", 0),
+                    "padroes_ainda_no_poi": self._ler_padroes_ainda_no_poi(row.get("padroes_ainda_no_poi")),
                     "ativo": row.get("ativo", True)
                 }
                 unidades.append(unidade)
@@ -69,6 +70,22 @@ class ConfigurationLoader:
             print(f"Erro ao carregar configurações de unidades: {e}")
             raise
     
+    @staticmethod
+    def _ler_padroes_ainda_no_poi(valor) -> List[str]:
+        """
+        Lê padrões de observação "ainda no POI" da unidade.
+        
+        Args:
+            valor: Célula da coluna padroes_ainda_no_poi (padrões separados por ";")
+            
+        Returns:
+            Lista de padrões (padrão do sistema se a célula estiver vazia ou a coluna não existir)
+        """
+        if pd.isna(valor) or not str(valor).strip():
+            return list(ConstantesEspecificas.PADROES_AINDA_NO_POI)
+        
+        return [padrao.strip() for padrao in str(valor).split(";") if padrao.strip()]
+    
     def carregar_pois_unidade(self, unidade: str) -> List[Dict[str, Any]]:
         """
         Carrega configuração de POIs para uma unidade específica.
@@ -86,11 +103,13 @@ class ConfigurationLoader:
             
             pois = []
             for _, row in df_pois.iterrows():
+                candles = row.get("candles", False)
                 poi = {
                     "ponto_interesse": row["ponto_interesse"],
                     "grupo": row["grupo"],
                     "sla_horas": row.get("sla_horas", 0),
                     "threshold_alerta": row.get("threshold_alerta", 10),
+                    "candles": bool(candles) if pd.notna(candles) else False,
                     "ativo": row.get("ativo", True)
                 }
                 pois.append(poi)
@@ -210,9 +229,24 @@ class ConstantesEspecificas:
     
     # Configurações de execução
     DOWNLOAD_TIMEOUT = 300
+    MAX_UNIDADES_PARALELAS = 2   # Unidades processadas ao mesmo tempo (cada uma com seu Chrome)
+    TIMEOUT_UNIDADE = 420        # Segundos por unidade (download + processamento + upload)
+    PRAZO_EXECUCAO = 480         # Segundos para a execução inteira, com todas as unidades e tentativas;
+                                 # sobra margem para gravação em lote e e-mails nos 600s do app.py
     MAX_TENTATIVAS_STATUS = 60
     INTERVALO_VERIFICACAO = 10
     
+    # Observações do C09 que indicam saída falsa (veículo ainda no POI).
+    # Padrão do sistema; cada unidade pode sobrescrever na coluna "padroes_ainda_no_poi" da aba Unidades
+    PADROES_AINDA_NO_POI = [
+        "permaneceu no poi após o fim do período pesquisado",
+        "permaneceu no poi após o fim do período",
+        "ainda permanece no local",
+        "continua no ponto de interesse",
+        "período pesquisado finalizado",
+        "veículo permaneceu no poi"
+    ]
+    
     # Configurações SharePoint
     LISTA_ALERTAS = "DesviosTeste"  # Já alterado anteriormente
     REPORTS_SHAREPOINT_PATH = "CREARE/Reports"  # ← Será criado dentro de Teste_BOT
@@ -0,0 +1,89 @@
+# core/alertas_enviados.py
+"""
+Registro local dos alertas já presentes nas listas de alertas do SharePoint.
+Evita baixar a lista inteira a cada envio: os títulos ficam em SQLite e só os itens
+modificados desde a última sincronização são consultados no SharePoint.
+"""
+
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class RegistroAlertasEnviados:
+    """
+    Títulos de alertas por lista SharePoint, com o cursor de sincronização (maior Modified visto).
+    Cada operação abre sua própria conexão: seguro para unidades processadas em paralelo.
+    """
+
+    def __init__(self, caminho: str = None):
+        """
+        Inicializa registro de alertas enviados.
+
+        Args:
+            caminho: Arquivo SQLite (padrão: C09_ALERTAS_DB ou pasta temporária)
+        """
+        if caminho is None:
+            caminho = os.getenv("C09_ALERTAS_DB") or Path(tempfile.gettempdir()) / "c09_alertas_enviados.sqlite"
+
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(self._conectar()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS titulos ("
+                "lista TEXT NOT NULL, titulo TEXT NOT NULL, PRIMARY KEY (lista, titulo))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sincronizacao ("
+                "lista TEXT PRIMARY KEY, modificado TEXT NOT NULL)"
+            )
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=30)
+
+    def contem(self, lista: str, titulo: str) -> bool:
+        """Indica se o título já foi enviado/visto na lista."""
+        with closing(self._conectar()) as conn:
+            linha = conn.execute(
+                "SELECT 1 FROM titulos WHERE lista = ? AND titulo = ?", (lista, titulo)
+            ).fetchone()
+        return linha is not None
+
+    def registrar(self, lista: str, titulos: Iterable[str], modificado: Optional[str] = None) -> None:
+        """
+        Registra títulos da lista (ignora os já registrados).
+
+        Args:
+            lista: Nome da lista SharePoint
+            titulos: Títulos a registrar
+            modificado: Maior Modified (ISO 8601, UTC) dos itens lidos; avança o cursor de sincronização
+        """
+        with closing(self._conectar()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO titulos (lista, titulo) VALUES (?, ?)",
+                ((lista, titulo) for titulo in titulos if titulo)
+            )
+            if modificado:
+                conn.execute(
+                    "INSERT INTO sincronizacao (lista, modificado) VALUES (?, ?) "
+                    "ON CONFLICT (lista) DO UPDATE SET modificado = max(modificado, excluded.modificado)",
+                    (lista, modificado)
+                )
+
+    def ultima_modificacao(self, lista: str) -> Optional[str]:
+        """Cursor de sincronização da lista (None = nunca sincronizada)."""
+        with closing(self._conectar()) as conn:
+            linha = conn.execute(
+                "SELECT modificado FROM sincronizacao WHERE lista = ?", (lista,)
+            ).fetchone()
+        return linha[0] if linha else None
+
+
+# Factory function
+def criar_registro_alertas(caminho: str = None) -> RegistroAlertasEnviados:
+    """Cria registro de alertas enviados com configurações padrão."""
+    return RegistroAlertasEnviados(caminho)
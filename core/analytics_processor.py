@@ -6,12 +6,30 @@ Agora com suporte a processamento em tempo real (execuções a cada 10min).
 """
 
 import os
+import re
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from io import BytesIO
-from typing import Dict, Any, Optional
-from office365.sharepoint.client_context import ClientContext
-from office365.runtime.auth.user_credential import UserCredential
+from typing import Callable, Dict, Any, List, Optional, Union
+from core.processor import ResultadoProcessamento
+from core.sessao_sharepoint import obter_contexto_sharepoint
+from core.ocupacao import IndicePlacas, contar
+from core.alertas_enviados import criar_registro_alertas
+
+
+def compilar_padroes_ainda_no_poi(padroes: List[str]) -> "re.Pattern":
+    """
+    Compila padrões de observação "ainda no POI" em uma única regex (alternância, sem distinção de maiúsculas).
+    
+    Args:
+        padroes: Trechos de texto procurados nas Observações
+        
+    Returns:
+        Regex compilada (lista vazia nunca casa)
+    """
+    alternativas = [re.escape(padrao.strip()) for padrao in padroes if padrao and padrao.strip()]
+    return re.compile("|".join(alternativas) if alternativas else "(?!)", re.IGNORECASE)
 
 
 class AnalyticsProcessor:
@@ -32,13 +50,26 @@ class AnalyticsProcessor:
         self.username = config["credenciais"]["sp_user"]
         self.password = config["credenciais"]["sp_password"]
         
+        # Placas → ids da unidade (ocupação em bitset; texto só na exportação)
+        self.indice_placas = IndicePlacas()
+        
+        # Observações que indicam saída falsa (veículo ainda no POI), configuráveis por unidade
+        self.regex_ainda_no_poi = compilar_padroes_ainda_no_poi(self._obter_padroes_ainda_no_poi())
+        
+        # Manifesto das partições de reports já lido/gravado nesta execução (partições em cache por versão)
+        self._manifesto_lido = False
+        
+        # Títulos já enviados à lista de alertas (SQLite local, sincronizado por Modified)
+        self.registro_alertas = criar_registro_alertas()
+        
         # Gerenciador de reports no SharePoint
         try:
             from core.reports_sharepoint import criar_reports_manager
             self.reports_manager = criar_reports_manager(
                 site_url=self.site_url,
                 username=self.username,
-                password=self.password
+                password=self.password,
+                unidade=self.unidade
             )
         except ImportError as e:
             print(f"⚠️ Erro ao importar reports_sharepoint: {e}")
@@ -65,6 +96,31 @@ class AnalyticsProcessor:
             print(f"Erro ao carregar planilha do buffer: {e}")
             return pd.DataFrame()
     
+    def carregar_dados_tratados(self, dados: Union[ResultadoProcessamento, BytesIO]) -> pd.DataFrame:
+        """
+        Obtém DataFrame dos dados tratados pelo processador C09.
+        
+        Args:
+            dados: ResultadoProcessamento (em memória) ou buffer Excel
+            
+        Returns:
+            DataFrame com datas nativas
+        """
+        if isinstance(dados, BytesIO):
+            return self.carregar_planilha_buffer(dados)
+        
+        # Handoff em memória: datas já são datetime, sem releitura do Excel
+        df = dados.df.copy()
+        print(f"Dados recebidos do processador: {len(df)} registros")
+        return df
+    
+    def _converter_datas(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte Data Entrada/Data Saída para datetime quando ainda são texto."""
+        for coluna in ['Data Entrada', 'Data Saída']:
+            if not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+                df[coluna] = pd.to_datetime(df[coluna], format='%d/%m/%Y %H:%M:%S', dayfirst=True, errors='coerce')
+        return df
+    
     def calcular_tpv(self, df: pd.DataFrame, poi: str, data: datetime.date) -> float:
         """
         Calcula TPV (Tempo de Permanência Médio) para um POI em uma data.
@@ -127,155 +183,224 @@ class AnalyticsProcessor:
         Returns:
             Tuple com (df_eventos, df_resumo_hora)
         """
-        df_poi = df[df['Ponto de Interesse'] == poi].copy()
+        return self.gerar_candles_todos(df, [poi])
+    
+    def gerar_candles_todos(self, df: pd.DataFrame, 
+                            pois: Optional[List[str]] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Gera candles de vários POIs em uma única passada (datas, saídas e timelines agrupadas por POI).
+        
+        Args:
+            df: DataFrame com dados
+            pois: POIs desejados (padrão: POIs com candles na configuração da unidade)
+            
+        Returns:
+            Tuple com (df_eventos, df_resumo_hora) de todos os POIs, concatenados na ordem de pois
+        """
+        if pois is None:
+            pois = self.obter_pois_candles()
+        pois = list(dict.fromkeys(pois))
+        
+        df_pois = df[df['Ponto de Interesse'].isin(pois)]
+        registros_por_poi = df_pois['Ponto de Interesse'].value_counts()
         
-        if df_poi.empty:
-            print(f"Nenhum dado para POI: {poi}")
+        for poi in pois:
+            if poi not in registros_por_poi:
+                print(f"Nenhum dado para POI: {poi}")
+        
+        if df_pois.empty:
             return pd.DataFrame(), pd.DataFrame()
         
         # Converte datas se necessário
-        df_poi['Data Entrada'] = pd.to_datetime(df_poi['Data Entrada'], format='%d/%m/%Y %H:%M:%S', dayfirst=True, errors='coerce')
-        df_poi['Data Saída'] = pd.to_datetime(df_poi['Data Saída'], format='%d/%m/%Y %H:%M:%S', dayfirst=True, errors='coerce')
-        
-        # Padrões para detectar veículos que ainda estão no POI
-        PADROES_AINDA_NO_POI = [
-            "permaneceu no poi após o fim do período pesquisado",
-            "permaneceu no poi após o fim do período",
-            "ainda permanece no local", 
-            "continua no ponto de interesse",
-            "período pesquisado finalizado",
-            "veículo permaneceu no poi"
-        ]
-        
-        def veiculo_ainda_esta_no_poi(observacao: str) -> bool:
-            """Verifica se veículo ainda está no POI baseado na observação."""
-            if pd.isna(observacao):
-                return False
-                
-            obs_lower = str(observacao).lower().strip()
-            
-            for padrao in PADROES_AINDA_NO_POI:
-                if padrao in obs_lower:
-                    return True
-                    
-            return False
+        df_pois = self._converter_datas(df_pois.copy())
         
         # Cria eventos de entrada (sempre válidos)
-        entradas = df_poi[['Veículo', 'Data Entrada', 'Observações']].copy()
+        entradas = df_pois[['Veículo', 'Data Entrada', 'Ponto de Interesse']].rename(
+            columns={'Data Entrada': 'Data Evento', 'Ponto de Interesse': 'POI'}
+        )
         entradas['Evento'] = 'entrada'
-        entradas.rename(columns={'Data Entrada': 'Data Evento'}, inplace=True)
-        
-        # Cria eventos de saída (FILTRADOS para excluir falsas saídas)
-        saidas_validas = []
-        saidas_ignoradas = 0
         
-        for _, registro in df_poi.iterrows():
-            if veiculo_ainda_esta_no_poi(registro.get("Observações", "")):
-                # IGNORA esta saída - veículo ainda está no POI
-                saidas_ignoradas += 1
-                print(f"⚠️ {registro['Veículo']} em {poi}: Saída ignorada (ainda no POI)")
-            else:
-                # Saída válida - registra normalmente
-                saidas_validas.append({
-                    'Veículo': registro['Veículo'],
-                    'Data Evento': registro['Data Saída'],
-                    'Evento': 'saida',
-                    'Observações': registro.get('Observações', '')
-                })
-        
-        # Converte saídas para DataFrame
-        if saidas_validas:
-            saidas = pd.DataFrame(saidas_validas)
-        else:
-            saidas = pd.DataFrame(columns=['Veículo', 'Data Evento', 'Evento', 'Observações'])
+        # Cria eventos de saída (FILTRADOS para excluir falsas saídas - veículo ainda no POI)
+        ainda_no_poi = self._mascara_ainda_no_poi(df_pois['Observações'], self.regex_ainda_no_poi)
+        saidas = df_pois.loc[~ainda_no_poi, ['Veículo', 'Data Saída', 'Ponto de Interesse']].rename(
+            columns={'Data Saída': 'Data Evento', 'Ponto de Interesse': 'POI'}
+        )
+        saidas['Evento'] = 'saida'
         
         # Log de estatísticas
-        total_registros = len(df_poi)
-        entradas_count = len(entradas)
-        saidas_count = len(saidas)
-        
-        print(f"📊 {poi}: {total_registros} registros → {entradas_count} entradas, {saidas_count} saídas válidas")
-        if saidas_ignoradas > 0:
-            print(f"   ⚠️ {saidas_ignoradas} saídas ignoradas (veículos ainda no POI)")
-        
-        # Combina eventos e ordena cronologicamente
-        eventos = pd.concat([entradas[['Veículo', 'Data Evento', 'Evento']], 
-                            saidas[['Veículo', 'Data Evento', 'Evento']]], 
-                        ignore_index=True)
+        saidas_por_poi = saidas['POI'].value_counts()
+        ignoradas_por_poi = df_pois.loc[ainda_no_poi, 'Ponto de Interesse'].value_counts()
+        
+        for poi, total_registros in registros_por_poi.reindex(pois).dropna().astype(int).items():
+            print(f"📊 {poi}: {total_registros} registros → {total_registros} entradas, "
+                  f"{saidas_por_poi.get(poi, 0)} saídas válidas")
+            if ignoradas_por_poi.get(poi, 0) > 0:
+                print(f"   ⚠️ {ignoradas_por_poi[poi]} saídas ignoradas (veículos ainda no POI)")
+        
+        # Combina eventos e ordena por POI (ordem de pois) e cronologicamente.
+        # Ordenação estável: em horários iguais, entradas antes de saídas (ordem do relatório)
+        eventos = pd.concat([entradas, saidas], ignore_index=True)[['Veículo', 'Data Evento', 'Evento', 'POI']]
         eventos.dropna(subset=['Data Evento'], inplace=True)
-        eventos.sort_values(by='Data Evento', inplace=True)
-        
-        # Calcula veículos presentes em cada evento
-        dentro_poi = set()
-        veiculos_no_poi_evento = []
         
-        for _, evento in eventos.iterrows():
-            placa = evento['Veículo']
-            if evento['Evento'] == 'entrada':
-                dentro_poi.add(placa)
-            elif evento['Evento'] == 'saida':
-                dentro_poi.discard(placa)
-            veiculos_no_poi_evento.append(';'.join(sorted(dentro_poi)))
-        
-        eventos['Veículos no POI'] = veiculos_no_poi_evento
-        eventos['POI'] = poi
+        codigos_poi = pd.Categorical(eventos['POI'], categories=pois).codes
+        ordem = np.lexsort((eventos['Data Evento'].to_numpy(), codigos_poi))
+        eventos = eventos.iloc[ordem]
         
         # Se não há eventos, retorna DataFrames vazios
         if eventos.empty:
+            eventos.insert(3, 'Veículos no POI', pd.Series(dtype=object))
             return eventos, pd.DataFrame()
         
+        # Veículos presentes após cada evento, por POI (bitset; texto só em exportar_ocupacao)
+        codigos_poi = codigos_poi[ordem]
+        limites = np.r_[np.flatnonzero(np.diff(codigos_poi)) + 1, len(eventos)]
+        placas = eventos['Veículo'].to_numpy()
+        entrada = eventos['Evento'].to_numpy() == 'entrada'
+        
+        eventos.insert(3, 'Veículos no POI', np.concatenate([
+            self.indice_placas.ocupacao_por_evento(placas[inicio:fim], entrada[inicio:fim])
+            for inicio, fim in zip(np.r_[0, limites[:-1]], limites)
+        ]))
+        
         # Gera resumo por hora
-        start_time = eventos['Data Evento'].min().floor('h')
-        end_time = eventos['Data Evento'].max().ceil('h')
-        timeline = pd.date_range(start=start_time, end=end_time, freq='h')
-        
-        contagem = []
-        linha_atual = 0
-        dentro_poi = set()
-        veiculos_fim_anterior = 0
-        
-        for i in range(len(timeline) - 1):
-            hora_inicio = timeline[i]
-            hora_fim = timeline[i + 1]
-            eventos_hora = eventos[
-                (eventos['Data Evento'] >= hora_inicio) & 
-                (eventos['Data Evento'] < hora_fim)
-            ]
-            
-            maximo = minimo = linha_atual
-            
-            for _, evento in eventos_hora.iterrows():
-                placa = evento['Veículo']
-                if evento['Evento'] == 'entrada':
-                    dentro_poi.add(placa)
-                    linha_atual += 1
-                elif evento['Evento'] == 'saida':
-                    dentro_poi.discard(placa)
-                    linha_atual -= 1
-                maximo = max(maximo, linha_atual)
-                minimo = min(minimo, linha_atual)
-            
-            contagem.append({
-                'Hora': hora_fim,
-                'Veículos no início da hora': veiculos_fim_anterior,
-                'Veículos no final da hora': linha_atual,
-                'Máximo de veículos': maximo,
-                'Mínimo de veículos': minimo,
-                'POI': poi,
-                'Veículos no POI': ';'.join(sorted(dentro_poi))
-            })
-            
-            veiculos_fim_anterior = linha_atual
-        
-        df_contagem = pd.DataFrame(contagem)
+        df_contagem = self._resumir_por_hora(eventos)
         
         # Log final
         if not df_contagem.empty:
-            ultimo_count = df_contagem.iloc[-1]['Veículos no final da hora']
-            print(f"✅ {poi}: {ultimo_count} veículos presentes no final do período")
+            presentes = df_contagem.groupby('POI', sort=False)['Veículos no final da hora'].last()
+            for poi, ultimo_count in presentes.items():
+                print(f"✅ {poi}: {ultimo_count} veículos presentes no final do período")
         
         return eventos, df_contagem
     
+    @staticmethod
+    def _mascara_ainda_no_poi(observacoes: pd.Series, regex: "re.Pattern") -> pd.Series:
+        """True onde a observação indica que o veículo ainda está no POI (saída deve ser ignorada)."""
+        return observacoes.astype("string").str.contains(regex, na=False).astype(bool)
+    
+    @staticmethod
+    def _resumir_por_hora(eventos: pd.DataFrame) -> pd.DataFrame:
+        """
+        Resumo de ocupação por hora a partir dos eventos de um ou mais POIs.
+        Ocupação = soma acumulada de +1 (entrada) / -1 (saída) na ordem dos eventos de cada POI;
+        cada hora da timeline do POI recebe início, fim, máximo e mínimo dessa série.
+        
+        Args:
+            eventos: Eventos com 'POI', 'Data Evento', 'Evento' e 'Veículos no POI' (ocupação após o evento),
+                     contíguos por POI e em ordem cronológica dentro de cada POI
+            
+        Returns:
+            DataFrame com uma linha por hora da timeline de cada POI
+        """
+        if eventos.empty:
+            return pd.DataFrame()
+        
+        pois = eventos['POI'].to_numpy()
+        datas = pd.DatetimeIndex(eventos['Data Evento'])
+        
+        # Blocos contíguos de um mesmo POI
+        inicios = np.flatnonzero(np.r_[True, pois[1:] != pois[:-1]])
+        fins = np.r_[inicios[1:], len(eventos)] - 1
+        tamanhos = fins - inicios + 1
+        bloco = np.repeat(np.arange(len(inicios)), tamanhos)
+        
+        # Timeline de cada POI: hora cheia antes do primeiro evento até hora cheia após o último
+        start_time = datas[inicios].floor('h')
+        end_time = datas[fins].ceil('h')
+        n_horas = np.asarray((end_time - start_time) // pd.Timedelta(hours=1), dtype='int64')
+        primeira_hora = np.r_[0, np.cumsum(n_horas)[:-1]]
+        total_horas = int(n_horas.sum())
+        
+        if total_horas <= 0:
+            return pd.DataFrame()
+        
+        ocupacao = np.where(eventos['Evento'].to_numpy() == 'entrada', 1, -1).cumsum()
+        ocupacao -= np.repeat(np.r_[0, ocupacao[fins[:-1]]], tamanhos)
+        
+        # Eventos exatamente no fim da timeline do POI não pertencem a nenhuma hora
+        no_periodo = datas < end_time[bloco]
+        hora = primeira_hora[bloco] + (datas - start_time[bloco]) // pd.Timedelta(hours=1)
+        por_hora = pd.DataFrame({
+            'hora': hora[no_periodo],
+            'ocupacao': ocupacao[no_periodo],
+            'veiculos': eventos['Veículos no POI'].to_numpy()[no_periodo],
+        }).groupby('hora')
+        
+        # A primeira hora de cada POI sempre tem evento: ffill não atravessa POIs
+        horas = pd.RangeIndex(total_horas)
+        fim = por_hora['ocupacao'].last().reindex(horas).ffill().fillna(0).astype('int64')
+        inicio = fim.shift(1, fill_value=0)
+        inicio.iloc[primeira_hora[n_horas > 0]] = 0
+        
+        # Hora sem eventos: máximo/mínimo = ocupação do início da hora
+        maximo = np.maximum(inicio, por_hora['ocupacao'].max().reindex(horas).fillna(inicio)).astype('int64')
+        minimo = np.minimum(inicio, por_hora['ocupacao'].min().reindex(horas).fillna(inicio)).astype('int64')
+        
+        bloco_hora = np.repeat(np.arange(len(inicios)), n_horas)
+        hora_no_poi = np.arange(total_horas) - primeira_hora[bloco_hora]
+        
+        return pd.DataFrame({
+            'Hora': start_time[bloco_hora] + pd.to_timedelta(hora_no_poi + 1, unit='h'),
+            'Veículos no início da hora': inicio.to_numpy(),
+            'Veículos no final da hora': fim.to_numpy(),
+            'Máximo de veículos': maximo.to_numpy(),
+            'Mínimo de veículos': minimo.to_numpy(),
+            'POI': pois[inicios][bloco_hora],
+            'Veículos no POI': por_hora['veiculos'].last().reindex(horas).ffill().to_numpy(),
+        })
+    
+    def exportar_ocupacao(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cópia com 'Veículos no POI' em texto "placa1;placa2" (formato das abas Candles/Resumo por Hora)."""
+        if df.empty or 'Veículos no POI' not in df:
+            return df
+        
+        df = df.copy()
+        df['Veículos no POI'] = self.indice_placas.textos(df['Veículos no POI'])
+        return df
+    
+    def salvar_candles(self, df_eventos: pd.DataFrame, df_resumo_hora: pd.DataFrame,
+                       mes: int, ano: int) -> bool:
+        """
+        Exporta candles de todos os POIs (gerados por gerar_candles_todos) em uma única
+        atualização das partições de reports da unidade.
+        
+        Returns:
+            True se atualizado com sucesso
+        """
+        sucesso = self.reports_manager.atualizar_candles_lote(
+            {self.unidade: (self.exportar_ocupacao(df_eventos), self.exportar_ocupacao(df_resumo_hora))},
+            mes=mes,
+            ano=ano
+        )
+        
+        self._registrar_gravacao_reports()
+        return sucesso
+    
+    def _registrar_gravacao_reports(self) -> None:
+        """
+        Após gravar partições de reports, leituras da execução usam o manifesto e as partições
+        gravados (candles da unidade calculados nesta execução, sem nova leitura do SharePoint).
+        """
+        self._manifesto_lido = self.reports_manager.manifesto is not None
+    
+    def _ler_aba_reports(self, sheet_name: str, desde: Optional[datetime.date] = None) -> pd.DataFrame:
+        """
+        Lê aba de reports da unidade com cache da execução.
+        Manifesto consultado uma vez por execução; partições baixadas só se a versão mudou.
+        
+        Args:
+            sheet_name: Nome da aba (ex: "Candles", "Resumo por Hora")
+            desde: Primeira data necessária (carrega só as partições mensais a partir dela)
+            
+        Returns:
+            DataFrame da aba (vazio se não existir); não deve ser alterado in-place
+        """
+        df = self.reports_manager.carregar_particoes(
+            self.unidade, sheet_name, desde, reler_manifesto=not self._manifesto_lido
+        )
+        self._manifesto_lido = self.reports_manager.manifesto is not None
+        return df
+    
     def identificar_desvios_grupo(self, grupo: str, threshold: int) -> pd.DataFrame:
         """
         Identifica desvios (acúmulo de veículos) para um GRUPO de POIs.
@@ -315,9 +440,7 @@ class AnalyticsProcessor:
                 return pd.DataFrame()
             
             # 3. Identifica desvios baseado no threshold do grupo
-            df_grupo_consolidado["n_veiculos"] = df_grupo_consolidado["Veículos no Grupo"].fillna('').apply(
-                lambda x: len([v for v in str(x).split(';') if v.strip()])
-            )
+            df_grupo_consolidado["n_veiculos"] = df_grupo_consolidado["Total_Veiculos"]
             
             df_filtrado = df_grupo_consolidado[df_grupo_consolidado["n_veiculos"] >= threshold].copy()
             df_filtrado.sort_values("Hora", inplace=True)
@@ -346,22 +469,20 @@ class AnalyticsProcessor:
                 
                 # Pega detalhes dos POIs envolvidos
                 detalhes_pois = row.get("Detalhes_POIs", "")
-                veiculos_grupo = str(row["Veículos no Grupo"]).split(";")
                 
-                # Gera alerta para o grupo (não individual)
-                for v in veiculos_grupo:
-                    if v.strip():
-                        alertas.append({
-                            "Título": titulo,
-                            "Placa": v.strip(),
-                            "Ponto_de_Interesse": grupo,  # ✅ MUDANÇA: Usa GRUPO aqui
-                            "Detalhes_POIs": detalhes_pois,  # Detalhes dos POIs específicos
-                            "Data_Hora_Desvio": hora_atual,
-                            "Data_Hora_Entrada": None,
-                            "Tempo": None,
-                            "Nível": f"Tratativa N{nivel}",
-                            "Grupo": grupo
-                        })
+                # Gera alerta para o grupo (não individual); placas só são decodificadas aqui
+                for v in self.indice_placas.lista(row["Veículos no Grupo"]):
+                    alertas.append({
+                        "Título": titulo,
+                        "Placa": v,
+                        "Ponto_de_Interesse": grupo,  # ✅ MUDANÇA: Usa GRUPO aqui
+                        "Detalhes_POIs": detalhes_pois,  # Detalhes dos POIs específicos
+                        "Data_Hora_Desvio": hora_atual,
+                        "Data_Hora_Entrada": None,
+                        "Tempo": None,
+                        "Nível": f"Tratativa N{nivel}",
+                        "Grupo": grupo
+                    })
             
             df_alertas = pd.DataFrame(alertas)
             
@@ -384,60 +505,51 @@ class AnalyticsProcessor:
             pois_do_grupo: Lista de POIs que pertencem ao grupo
             
         Returns:
-            DataFrame consolidado por hora para o grupo
+            DataFrame consolidado por hora para o grupo ('Veículos no Grupo' como bitset de indice_placas)
         """
         try:
             hoje = datetime.now().date()
             dias = [hoje - timedelta(days=i) for i in range(4)]
             
-            # Carrega dados do SharePoint
-            df_resumo_hora = self.reports_manager.carregar_candles_sharepoint("Resumo por Hora")
+            # Carrega dados do SharePoint (cache da execução)
+            df_resumo_hora = self._ler_aba_reports("Resumo por Hora", desde=dias[-1])
             
             if df_resumo_hora.empty:
                 return pd.DataFrame()
             
-            # Filtra dados dos POIs do grupo nos últimos 4 dias
+            # Filtra dados dos POIs do grupo nos últimos 4 dias (intervalo de datas, sem converter cada hora em date)
             df_grupo = df_resumo_hora[
                 (df_resumo_hora["POI"].isin(pois_do_grupo)) &
-                (df_resumo_hora["Hora"].dt.date.isin(dias))
+                (df_resumo_hora["Hora"] >= pd.Timestamp(dias[-1])) &
+                (df_resumo_hora["Hora"] < pd.Timestamp(hoje + timedelta(days=1)))
             ].copy()
             
             if df_grupo.empty:
                 return pd.DataFrame()
             
-            # Consolida por hora (agrupa todos os POIs do grupo)
-            df_consolidado = []
-            
-            # Pega todas as horas únicas
-            horas_unicas = df_grupo["Hora"].unique()
+            # Texto exportado → bitset (cada texto distinto é lido uma vez)
+            df_grupo["Ocupação"] = self.indice_placas.de_textos(
+                df_grupo.get("Veículos no POI", pd.Series("", index=df_grupo.index))
+            )
             
-            for hora in horas_unicas:
-                df_hora = df_grupo[df_grupo["Hora"] == hora]
-                
-                # Consolida veículos de todos os POIs desta hora
-                todos_veiculos = set()
-                detalhes_pois = []
-                
-                for _, row in df_hora.iterrows():
-                    poi = row["POI"]
-                    veiculos_poi = str(row.get("Veículos no POI", "")).split(";")
-                    count_poi = len([v for v in veiculos_poi if v.strip()])
-                    
-                    if count_poi > 0:
-                        detalhes_pois.append(f"{poi}({count_poi})")
-                        todos_veiculos.update([v.strip() for v in veiculos_poi if v.strip()])
-                
-                # Cria registro consolidado
-                df_consolidado.append({
-                    "Hora": hora,
-                    "Grupo": grupo,
-                    "Veículos no Grupo": ";".join(sorted(todos_veiculos)),
-                    "Total_Veiculos": len(todos_veiculos),
-                    "Detalhes_POIs": " + ".join(detalhes_pois),
-                    "POIs_Envolvidos": len(df_hora)
-                })
-            
-            resultado = pd.DataFrame(df_consolidado)
+            # Consolida por hora (agrupa todos os POIs do grupo): união dos bitsets e detalhes em uma agregação
+            # Detalhe de cada POI com veículos já com separador ("POI(n) + "); a soma por hora concatena na ordem
+            contagem_poi = contar(df_grupo["Ocupação"])
+            df_grupo["Detalhe"] = (
+                df_grupo["POI"].astype(str) + "(" + contagem_poi.astype(str) + ") + "
+            ).where(contagem_poi > 0, "")
+            
+            resultado = df_grupo.groupby("Hora", sort=False).agg(**{
+                "Veículos no Grupo": ("Ocupação", lambda conjuntos: np.bitwise_or.reduce(conjuntos.to_numpy(), initial=0)),
+                "Detalhes_POIs": ("Detalhe", "sum"),
+                "POIs_Envolvidos": ("POI", "size"),
+            }).reset_index()
+            
+            resultado["Detalhes_POIs"] = resultado["Detalhes_POIs"].str.removesuffix(" + ")
+            # Bitsets pequenos voltam como int64 do groupby: mantém int do Python (coluna object)
+            resultado["Veículos no Grupo"] = resultado["Veículos no Grupo"].astype(object)
+            resultado.insert(1, "Grupo", grupo)
+            resultado.insert(3, "Total_Veiculos", contar(resultado["Veículos no Grupo"]))
             print(f"📊 Dados consolidados {grupo}: {len(resultado)} horas analisadas")
             
             return resultado
@@ -462,45 +574,21 @@ class AnalyticsProcessor:
             return df_alertas
         
         try:
-            # Carrega dados de candles do SharePoint
-            df_candles = self.reports_manager.carregar_candles_sharepoint("Candles")
-            
-            if df_candles.empty:
+            # POI → grupo (POIs ativos da unidade), calculado uma vez para todas as entradas
+            grupo_por_poi = {
+                poi["ponto_interesse"]: poi.get("grupo")
+                for poi in self.config["pois_por_unidade"].get(self.unidade, [])
+                if poi.get("ativo", True)
+            }
+            
+            entradas = self._buscar_entradas_candles(
+                df_alertas, "Grupo", lambda df_entradas: df_entradas["POI"].map(grupo_por_poi)
+            )
+            if entradas is None:
                 return df_alertas
             
-            df_entradas = df_candles[df_candles["Evento"].str.lower() == "entrada"]
-            
-            def buscar_hora_entrada_grupo(row):
-                """Busca última entrada do veículo em qualquer POI do grupo."""
-                grupo = row["Grupo"]
-                placa = row["Placa"]
-                
-                # Identifica POIs do grupo
-                config_pois = self.config["pois_por_unidade"].get(self.unidade, [])
-                pois_do_grupo = [
-                    poi["ponto_interesse"] for poi in config_pois 
-                    if poi.get("grupo") == grupo and poi.get("ativo", True)
-                ]
-                
-                # Busca entradas em qualquer POI do grupo
-                entradas = df_entradas[
-                    (df_entradas["Veículo"] == placa) &
-                    (df_entradas["POI"].isin(pois_do_grupo)) &
-                    (df_entradas["Data Evento"] <= row["Data_Hora_Desvio"])
-                ]
-                
-                return entradas["Data Evento"].max() if not entradas.empty else pd.NaT
-            
-            df_alertas["Data_Hora_Entrada"] = df_alertas.apply(buscar_hora_entrada_grupo, axis=1)
-            
-            def calcular_tempo_permanencia(row):
-                """Calcula tempo de permanência até agora."""
-                if pd.notnull(row["Data_Hora_Entrada"]):
-                    delta = datetime.now() - row["Data_Hora_Entrada"]
-                    return round(delta.total_seconds() / 3600, 2)
-                return None
-            
-            df_alertas["Tempo"] = df_alertas.apply(calcular_tempo_permanencia, axis=1)
+            df_alertas["Data_Hora_Entrada"] = entradas
+            df_alertas["Tempo"] = self._calcular_tempo_permanencia(df_alertas["Data_Hora_Entrada"])
             
             print(f"✅ Alertas de grupo enriquecidos com dados de entrada")
             
@@ -509,14 +597,97 @@ class AnalyticsProcessor:
         
         return df_alertas
 
+    def _buscar_entradas_candles(self, df_alertas: pd.DataFrame, chave_alerta: str,
+                                 chave_entrada: Callable[[pd.DataFrame], pd.Series]) -> Optional[pd.Series]:
+        """
+        Última entrada de cada alerta na aba Candles (cache da execução).
+        Lê primeiro as partições desde um mês antes do desvio mais antigo; alertas sem entrada
+        nessa janela são buscados de novo em todas as partições (mesmo resultado da busca completa).
+        
+        Args:
+            df_alertas: Alertas com "Placa", chave_alerta e "Data_Hora_Desvio"
+            chave_alerta: Coluna do alerta comparada com a chave da entrada
+            chave_entrada: Calcula a chave (POI ou grupo) de cada entrada
+            
+        Returns:
+            Data_Hora_Entrada alinhada ao índice de df_alertas (None se não houver candles)
+        """
+        def buscar(alertas: pd.DataFrame, desde) -> Optional[pd.Series]:
+            df_candles = self._ler_aba_reports("Candles", desde=desde)
+            if df_candles.empty:
+                return None
+            df_entradas = df_candles[df_candles["Evento"].str.lower() == "entrada"]
+            return self._buscar_ultima_entrada(alertas, chave_alerta, df_entradas, chave_entrada(df_entradas))
+        
+        desde = (pd.Timestamp(df_alertas["Data_Hora_Desvio"].min()) - pd.DateOffset(months=1)).date()
+        entradas = buscar(df_alertas, desde)
+        
+        # Entradas mais antigas que a janela só existem em partições anteriores
+        sem_entrada = df_alertas.index if entradas is None else entradas.index[entradas.isna()]
+        if len(sem_entrada):
+            anteriores = buscar(df_alertas.loc[sem_entrada], None)
+            if anteriores is not None:
+                entradas = anteriores if entradas is None else entradas.fillna(anteriores)
+        
+        return entradas
+    
+    @staticmethod
+    def _buscar_ultima_entrada(df_alertas: pd.DataFrame, chave_alerta: str,
+                               df_entradas: pd.DataFrame, chave_entrada: pd.Series) -> pd.Series:
+        """
+        Última entrada do veículo (por placa e chave: POI ou grupo) até a hora do desvio.
+        merge_asof ordenado: O((alertas + entradas) log n) em vez de varrer as entradas por alerta.
+        
+        Args:
+            df_alertas: Alertas com "Placa", chave_alerta e "Data_Hora_Desvio"
+            chave_alerta: Coluna do alerta comparada com chave_entrada
+            df_entradas: Eventos de entrada da aba Candles
+            chave_entrada: POI ou grupo de cada entrada (NaN = fora de qualquer chave)
+            
+        Returns:
+            Data_Hora_Entrada alinhada ao índice de df_alertas (NaT se não houver entrada)
+        """
+        alertas = pd.DataFrame({
+            "Placa": df_alertas["Placa"].to_numpy(),
+            "Chave": df_alertas[chave_alerta].to_numpy(),
+            "Data_Hora_Desvio": pd.to_datetime(df_alertas["Data_Hora_Desvio"]).astype("datetime64[ns]").to_numpy(),
+            "Ordem": np.arange(len(df_alertas)),
+        })
+        
+        entradas = pd.DataFrame({
+            "Placa": df_entradas["Veículo"],
+            "Chave": chave_entrada,
+            "Data_Hora_Entrada": pd.to_datetime(df_entradas["Data Evento"], errors="coerce").astype("datetime64[ns]"),
+        }).dropna(subset=["Chave", "Data_Hora_Entrada"])
+        
+        resultado = pd.merge_asof(
+            alertas.sort_values("Data_Hora_Desvio", kind="stable"),
+            entradas.sort_values("Data_Hora_Entrada", kind="stable"),
+            left_on="Data_Hora_Desvio",
+            right_on="Data_Hora_Entrada",
+            by=["Placa", "Chave"],
+            direction="backward"
+        )
+        
+        return pd.Series(
+            resultado.sort_values("Ordem")["Data_Hora_Entrada"].to_numpy(),
+            index=df_alertas.index
+        )
+    
+    @staticmethod
+    def _calcular_tempo_permanencia(entradas: pd.Series) -> pd.Series:
+        """Tempo de permanência até agora, em horas (None sem entrada)."""
+        tempo = ((datetime.now() - entradas).dt.total_seconds() / 3600).round(2)
+        return tempo.astype(object).where(tempo.notna(), None)
+    
     def _gerar_dados_sentinela(self, poi: str) -> pd.DataFrame:
         """Gera dados sentinela (últimos 4 dias) para um POI."""
         hoje = datetime.now().date()
         dias = [hoje - timedelta(days=i) for i in range(4)]
         
         try:
-            # Carrega dados do SharePoint
-            df_resumo_hora = self.reports_manager.carregar_candles_sharepoint("Resumo por Hora")
+            # Carrega dados do SharePoint (cache da execução)
+            df_resumo_hora = self._ler_aba_reports("Resumo por Hora", desde=dias[-1])
             
             if df_resumo_hora.empty:
                 return pd.DataFrame()
@@ -545,33 +716,14 @@ class AnalyticsProcessor:
             return df_alertas
         
         try:
-            # Carrega dados de candles do SharePoint
-            df_candles = self.reports_manager.carregar_candles_sharepoint("Candles")
-            
-            if df_candles.empty:
+            entradas = self._buscar_entradas_candles(
+                df_alertas, "Ponto_de_Interesse", lambda df_entradas: df_entradas["POI"]
+            )
+            if entradas is None:
                 return df_alertas
             
-            df_entradas = df_candles[df_candles["Evento"].str.lower() == "entrada"]
-            
-            def buscar_hora_entrada(row):
-                """Busca última entrada do veículo no POI antes do desvio."""
-                entradas = df_entradas[
-                    (df_entradas["Veículo"] == row["Placa"]) &
-                    (df_entradas["POI"] == row["Ponto_de_Interesse"]) &
-                    (df_entradas["Data Evento"] <= row["Data_Hora_Desvio"])
-                ]
-                return entradas["Data Evento"].max() if not entradas.empty else pd.NaT
-            
-            df_alertas["Data_Hora_Entrada"] = df_alertas.apply(buscar_hora_entrada, axis=1)
-            
-            def calcular_tempo_permanencia(row):
-                """Calcula tempo de permanência até agora."""
-                if pd.notnull(row["Data_Hora_Entrada"]):
-                    delta = datetime.now() - row["Data_Hora_Entrada"]
-                    return round(delta.total_seconds() / 3600, 2)
-                return None
-            
-            df_alertas["Tempo"] = df_alertas.apply(calcular_tempo_permanencia, axis=1)
+            df_alertas["Data_Hora_Entrada"] = entradas
+            df_alertas["Tempo"] = self._calcular_tempo_permanencia(df_alertas["Data_Hora_Entrada"])
             
         except Exception as e:
             print(f"Erro ao enriquecer alertas: {e}")
@@ -581,33 +733,36 @@ class AnalyticsProcessor:
     def enviar_alertas_sharepoint(self, df_alertas: pd.DataFrame) -> bool:
         """
         Envia alertas para lista SharePoint.
+        Duplicatas são verificadas no registro local; os itens do título saem em um único batch.
         """
         if df_alertas.empty:
             return True
         
         try:
-            ctx = ClientContext(self.site_url).with_credentials(
-                UserCredential(self.username, self.password)
-            )
+            # Envia apenas o último título (mais recente)
+            ultimo_titulo = df_alertas["Título"].iloc[-1]
             
-            sp_list = ctx.web.lists.get_by_title(self.list_name)
+            if self.registro_alertas.contem(self.list_name, ultimo_titulo):
+                print(f"⚠️ Alerta '{ultimo_titulo}' já existe no SharePoint")
+                return True
             
-            # Verifica títulos existentes (evita duplicatas)
-            existing_items = sp_list.items.select(["Title"]).top(5000).get().execute_query()
-            existing_titles = {item.properties["Title"] for item in existing_items}
+            ctx = obter_contexto_sharepoint(self.site_url, self.username, self.password)
             
-            # Envia apenas o último título (mais recente)
-            ultimo_titulo = df_alertas["Título"].iloc[-1]
+            sp_list = ctx.web.lists.get_by_title(self.list_name)
             
-            if ultimo_titulo in existing_titles:
+            # Traz para o registro os itens criados/alterados por outros desde a última sincronização
+            self._sincronizar_registro_alertas(sp_list)
+            
+            if self.registro_alertas.contem(self.list_name, ultimo_titulo):
                 print(f"⚠️ Alerta '{ultimo_titulo}' já existe no SharePoint")
                 return True
             
             # Filtra alertas do último título
             df_ultimo = df_alertas[df_alertas["Título"] == ultimo_titulo]
             
-            # Envia alertas
-            for _, row in df_ultimo.iterrows():
+            # Enfileira um item por placa e envia tudo em uma requisição batch
+            itens = []
+            for row in df_ultimo.to_dict("records"):
                 item = {
                     "Title": str(row["Título"]),
                     "Placa": str(row["Placa"]),
@@ -620,7 +775,20 @@ class AnalyticsProcessor:
                     "Tipo_Alerta": row["Nível"],
                     "Status": "Pendente"
                 }
-                sp_list.add_item(item).execute_query()
+                itens.append(sp_list.add_item(item))
+            
+            try:
+                ctx.execute_batch()
+            finally:
+                # Só item com resposta de sucesso no batch recebe Id; título registrado se algum foi criado
+                # (a próxima sincronização também o traria da lista)
+                criados = sum(1 for item in itens if item.properties.get("Id") is not None)
+                if criados:
+                    self.registro_alertas.registrar(self.list_name, [ultimo_titulo])
+            
+            if criados < len(itens):
+                print(f"⚠️ Alerta '{ultimo_titulo}': {criados} de {len(itens)} registros criados no SharePoint")
+                return False
             
             print(f"✅ Alerta '{ultimo_titulo}' enviado para SharePoint ({len(df_ultimo)} registros)")
             return True
@@ -629,6 +797,28 @@ class AnalyticsProcessor:
             print(f"❌ Erro ao enviar alertas para SharePoint: {e}")
             return False
     
+    def _sincronizar_registro_alertas(self, sp_list) -> None:
+        """
+        Atualiza o registro local com os itens da lista modificados desde a última sincronização.
+        Primeira sincronização lê a lista inteira (paginada, sem o limite de 5000 itens).
+        """
+        desde = self.registro_alertas.ultima_modificacao(self.list_name)
+        
+        consulta = sp_list.items.select(["Title", "Modified"])
+        if desde:
+            # "ge": itens gravados no mesmo segundo do cursor são relidos (registro ignora repetidos)
+            consulta = consulta.filter(f"Modified ge datetime'{desde}'")
+        
+        itens = consulta.get_all(5000).execute_query()
+        
+        titulos = [item.properties.get("Title") for item in itens]
+        modificados = [item.properties.get("Modified") for item in itens if item.properties.get("Modified")]
+        
+        self.registro_alertas.registrar(self.list_name, titulos, max(modificados, default=None))
+        
+        if titulos:
+            print(f"🔄 Registro de alertas sincronizado: {len(titulos)} itens {'novos/alterados' if desde else 'na lista'}")
+    
     def _obter_total_veiculos(self) -> int:
         """Obtém total de veículos da unidade."""
         for unidade_config in self.config["unidades"]:
@@ -636,6 +826,24 @@ class AnalyticsProcessor:
                 return unidade_config.get("total_veiculos", 91)  # Default RRP
         return 91
     
+    def _obter_padroes_ainda_no_poi(self) -> List[str]:
+        """Obtém padrões de "ainda no POI" da unidade (aba Unidades) ou o padrão do sistema."""
+        for unidade_config in self.config.get("unidades", []):
+            if unidade_config.get("unidade") == self.unidade and unidade_config.get("padroes_ainda_no_poi"):
+                return unidade_config["padroes_ainda_no_poi"]
+        
+        from config.settings import ConstantesEspecificas
+        return ConstantesEspecificas.PADROES_AINDA_NO_POI
+    
+    def obter_pois_candles(self) -> List[str]:
+        """Obtém POIs com candles habilitados (coluna candles da aba POIs_<unidade>)."""
+        pois_config = self.config["pois_por_unidade"].get(self.unidade, [])
+        
+        return [
+            poi["ponto_interesse"] for poi in pois_config
+            if poi.get("ativo", True) and poi.get("candles", False)
+        ]
+    
     def _obter_pois_alertas(self) -> Dict[str, int]:
         """Obtém POIs e seus thresholds de alerta."""
         pois_config = self.config["pois_por_unidade"].get(self.unidade, [])
@@ -647,12 +855,13 @@ class AnalyticsProcessor:
         
         return thresholds
     
-    def processar_analytics_completo(self, buffer_dados: BytesIO, data_referencia: datetime) -> bool:
+    def processar_analytics_completo(self, dados_tratados: Union[ResultadoProcessamento, BytesIO], 
+                                     data_referencia: datetime) -> bool:
         """
         Executa processamento completo de analytics.
         
         Args:
-            buffer_dados: Buffer com dados tratados
+            dados_tratados: ResultadoProcessamento do processador (ou buffer Excel)
             data_referencia: Data de referência para processamento
             
         Returns:
@@ -662,7 +871,7 @@ class AnalyticsProcessor:
             print(f"=== Analytics {self.unidade} - {data_referencia.date()} ===")
             
             # 1. Carrega dados
-            df = self.carregar_planilha_buffer(buffer_dados)
+            df = self.carregar_dados_tratados(dados_tratados)
             if df.empty:
                 print("⚠️ Dados vazios, pulando analytics")
                 return False
@@ -674,17 +883,14 @@ class AnalyticsProcessor:
             if self.unidade == "RRP":
                 tpv_ac = self.calcular_tpv(df, "PA AGUA CLARA", ontem)
                 dm_valor = self.calcular_dm(df, "Manutenção", ontem)
-                pois_candles = ["Descarga Inocencia", "Carregamento Fabrica RRP", "PA AGUA CLARA", "Oficina JSL"]
                 
             elif self.unidade == "TLS":
                 tpv_ac = self.calcular_tpv(df, "PA Celulose", ontem)
                 dm_valor = self.calcular_dm(df, "Manutenção", ontem)
-                pois_candles = ["PA Celulose", "Manutencao Celulose", "Carregamento Fabrica", "Descarga TAP", "Oficina Central JSL"]
                 
             else:
                 print(f"⚠️ Unidade {self.unidade} não tem configuração específica")
                 tpv_ac = dm_valor = 0
-                pois_candles = []
             
             # 4. Atualiza resumo diário no SharePoint
             total_veiculos = self._obter_total_veiculos()
@@ -695,6 +901,7 @@ class AnalyticsProcessor:
                 dm_valor=dm_valor,
                 total_veiculos=total_veiculos
             )
+            self._registrar_gravacao_reports()
             
             if not sucesso_resumo:
                 print("⚠️ Falha ao atualizar resumo diário")
@@ -703,23 +910,18 @@ class AnalyticsProcessor:
             mes_atual = datetime.now().month
             ano_atual = datetime.now().year
             
-            for poi in pois_candles:
-                print(f"Processando candles: {poi}")
-                df_eventos, df_resumo_hora = self.gerar_candles_poi(df, poi)
+            pois_candles = self.obter_pois_candles()
+            print(f"Processando candles: {', '.join(pois_candles)}")
+            df_eventos, df_resumo_hora = self.gerar_candles_todos(df, pois_candles)
+            
+            if not df_eventos.empty:
+                # Todos os POIs em uma única atualização do arquivo de reports
+                sucesso_candles = self.salvar_candles(df_eventos, df_resumo_hora, mes_atual, ano_atual)
                 
-                if not df_eventos.empty:
-                    sucesso_candles = self.reports_manager.atualizar_candles(
-                        df_eventos_novos=df_eventos,
-                        df_resumo_novos=df_resumo_hora,
-                        poi=poi,
-                        mes=mes_atual,
-                        ano=ano_atual
-                    )
-                    
-                    if not sucesso_candles:
-                        print(f"⚠️ Falha ao salvar candles para {poi}")
-                else:
-                    print(f"⚠️ Nenhum dado de candles para {poi}")
+                if not sucesso_candles:
+                    print(f"⚠️ Falha ao salvar candles: {', '.join(df_eventos['POI'].unique())}")
+            else:
+                print(f"⚠️ Nenhum dado de candles para {', '.join(pois_candles)}")
             
             # 6. Processa sistema de alertas
             self._processar_sistema_alertas()
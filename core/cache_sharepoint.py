@@ -0,0 +1,168 @@
+# core/cache_sharepoint.py
+"""
+Cache local de arquivos baixados do SharePoint, validado por versão (ETag).
+Um arquivo inalterado desde a execução anterior é lido do disco (bytes e abas já lidas)
+em vez de ser baixado e relido com openpyxl. As abas são gravadas com pickle: o diretório
+é privado do usuário (0700) e recusado se pertencer a outro usuário.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+
+# Tamanho máximo padrão do diretório de cache
+TAMANHO_MAXIMO_MB = 500
+
+# Instância do processo (compartilhada pelos gerenciadores de todas as unidades)
+_cache_processo = None
+_LOCK_CACHE_PROCESSO = threading.Lock()
+
+
+class CacheArquivosSharePoint:
+    """
+    Cache em disco por URL relativa ao servidor + versão, com descarte LRU por tamanho total.
+    Cada entrada é "<hash da URL>_<hash da versão>.bin" (bytes) e/ou ".pkl" (DataFrame lido);
+    uma versão nova da mesma URL substitui as anteriores. O mtime marca o último acesso.
+    """
+
+    def __init__(self, pasta: str = None, tamanho_maximo_mb: float = TAMANHO_MAXIMO_MB):
+        """
+        Inicializa cache de arquivos do SharePoint.
+
+        Args:
+            pasta: Diretório do cache (padrão: C09_SP_CACHE_DIR ou pasta temporária do usuário)
+            tamanho_maximo_mb: Tamanho máximo do diretório antes de descartar entradas antigas
+
+        Raises:
+            PermissionError: Diretório existente pertence a outro usuário
+        """
+        if pasta is None:
+            sufixo = f"_{os.getuid()}" if hasattr(os, "getuid") else ""
+            pasta = os.getenv("C09_SP_CACHE_DIR") or Path(tempfile.gettempdir()) / f"c09_cache_sharepoint{sufixo}"
+
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._proteger_pasta()
+        self.tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+
+        self.acertos = 0
+        self.falhas = 0
+
+    def _proteger_pasta(self) -> None:
+        """Garante que só o usuário atual escreve no cache (entradas .pkl são desserializadas)."""
+        if not hasattr(os, "getuid"):
+            return
+
+        info = self.pasta.stat()
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"Diretório de cache SharePoint pertence a outro usuário: {self.pasta}")
+        if info.st_mode & 0o077:
+            self.pasta.chmod(0o700)
+
+    @staticmethod
+    def _hash(texto: str) -> str:
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:32]
+
+    def _caminho(self, url: str, versao: str, extensao: str) -> Path:
+        return self.pasta / f"{self._hash(url)}_{self._hash(versao)}.{extensao}"
+
+    def _obter(self, caminho: Path, ler, contar_falha: bool = True):
+        if not caminho.exists():
+            self.falhas += contar_falha
+            return None
+
+        try:
+            valor = ler(caminho)
+        except Exception as e:
+            print(f"⚠️ Entrada de cache SharePoint ilegível, descartada: {e}")
+            caminho.unlink(missing_ok=True)
+            self.falhas += contar_falha
+            return None
+
+        os.utime(caminho)  # Marca acesso recente (LRU)
+        self.acertos += 1
+        return valor
+
+    def _salvar(self, url: str, caminho: Path, escrever) -> None:
+        temporario = caminho.with_name(caminho.name + ".tmp")
+
+        try:
+            escrever(temporario)
+            os.replace(temporario, caminho)
+        except Exception as e:
+            print(f"⚠️ Não foi possível salvar no cache SharePoint: {e}")
+            temporario.unlink(missing_ok=True)
+            return
+
+        # Versões anteriores da mesma URL não serão mais válidas
+        for antigo in self.pasta.glob(f"{self._hash(url)}_*{caminho.suffix}"):
+            if antigo != caminho:
+                antigo.unlink(missing_ok=True)
+
+        self._descartar_excedente()
+
+    def obter_bytes(self, url: str, versao: str) -> Optional[bytes]:
+        """Conteúdo do arquivo na versão informada (None se não estiver em cache)."""
+        return self._obter(self._caminho(url, versao, "bin"), Path.read_bytes)
+
+    def salvar_bytes(self, url: str, versao: str, conteudo: bytes) -> None:
+        """Salva conteúdo baixado do arquivo na versão informada."""
+        self._salvar(url, self._caminho(url, versao, "bin"), lambda caminho: caminho.write_bytes(conteudo))
+
+    def obter_tabela(self, url: str, versao: str, contar_falha: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Aba já lida do arquivo na versão informada (None se não estiver em cache).
+
+        Args:
+            contar_falha: False quando a falha é seguida de obter_bytes do mesmo arquivo,
+                para que a consulta conte uma única vez na taxa de acerto
+        """
+        return self._obter(self._caminho(url, versao, "pkl"), pd.read_pickle, contar_falha)
+
+    def salvar_tabela(self, url: str, versao: str, df: pd.DataFrame) -> None:
+        """Salva aba lida do arquivo na versão informada."""
+        self._salvar(url, self._caminho(url, versao, "pkl"), df.to_pickle)
+
+    def _descartar_excedente(self) -> None:
+        """Remove entradas com acesso mais antigo até o diretório caber no limite."""
+        entradas = [
+            (arquivo, arquivo.stat()) for arquivo in self.pasta.iterdir()
+            if arquivo.suffix in (".bin", ".pkl")
+        ]
+        total = sum(info.st_size for _, info in entradas)
+
+        for arquivo, info in sorted(entradas, key=lambda entrada: entrada[1].st_mtime):
+            if total <= self.tamanho_maximo:
+                break
+            arquivo.unlink(missing_ok=True)
+            total -= info.st_size
+
+    def resumo(self) -> str:
+        """Linha de log com contadores de acerto/falha e taxa de acerto."""
+        total = self.acertos + self.falhas
+        taxa = f"{100 * self.acertos / total:.0f}%" if total else "-"
+        return f"📦 Cache SharePoint: {self.acertos} acertos, {self.falhas} falhas ({taxa} de acerto)"
+
+
+# Factory function
+def criar_cache_sharepoint(pasta: str = None, tamanho_maximo_mb: float = None) -> CacheArquivosSharePoint:
+    """Cria cache de arquivos do SharePoint com configurações padrão."""
+    if tamanho_maximo_mb is None:
+        tamanho_maximo_mb = float(os.getenv("C09_SP_CACHE_MAX_MB", TAMANHO_MAXIMO_MB))
+
+    return CacheArquivosSharePoint(pasta, tamanho_maximo_mb)
+
+
+def obter_cache_sharepoint() -> CacheArquivosSharePoint:
+    """Cache de arquivos do SharePoint do processo (criado no primeiro uso)."""
+    global _cache_processo
+    with _LOCK_CACHE_PROCESSO:
+        if _cache_processo is None:
+            _cache_processo = criar_cache_sharepoint()
+        return _cache_processo
@@ -111,13 +111,11 @@ class EmailNotifier:
             True se enviado com sucesso
         """
         try:
-            from office365.sharepoint.client_context import ClientContext
-            from office365.runtime.auth.user_credential import UserCredential
+            from core.sessao_sharepoint import obter_contexto_sharepoint
             
-            # Conecta no SharePoint
+            # Conecta no SharePoint (sessão autenticada compartilhada pelo processo)
             site_url = "https://suzano.sharepoint.com/sites/Controleoperacional"
-            credentials = UserCredential(self.username, self.password)
-            ctx = ClientContext(site_url).with_credentials(credentials)
+            ctx = obter_contexto_sharepoint(site_url, self.username, self.password)
             
             # Tenta usar utilidades de e-mail do SharePoint
             # Nota: Nem todos os tenants permitem isso
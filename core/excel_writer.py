@@ -0,0 +1,94 @@
+# core/excel_writer.py
+"""
+Módulo de escrita de planilhas Excel formatadas como tabela.
+Grava linhas e definição da Tabela em uma única passagem (openpyxl write-only),
+sem escrever com pandas e reabrir o arquivo com load_workbook.
+"""
+
+import warnings
+from io import BytesIO
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+
+# Linhas convertidas por vez (mantém memória constante em abas grandes)
+LINHAS_POR_BLOCO = 5000
+
+
+def _criar_tabela(nome_tabela: str, colunas: List[str], num_linhas: int, estilo: str) -> Table:
+    """
+    Cria definição de Tabela Excel cobrindo cabeçalho + dados.
+
+    Args:
+        nome_tabela: displayName da tabela
+        colunas: Nomes das colunas (cabeçalho)
+        num_linhas: Total de linhas incluindo cabeçalho
+        estilo: Nome do estilo (ex: "TableStyleMedium2")
+
+    Returns:
+        Tabela pronta para add_table
+    """
+    ref = f"A1:{get_column_letter(len(colunas))}{num_linhas}"
+
+    tabela = Table(displayName=nome_tabela, ref=ref, autoFilter=AutoFilter(ref=ref))
+    # Em modo write-only as células não podem ser relidas: colunas são declaradas aqui
+    tabela.tableColumns = [TableColumn(id=i, name=nome) for i, nome in enumerate(colunas, 1)]
+    tabela.tableStyleInfo = TableStyleInfo(
+        name=estilo,
+        showFirstColumn=False,
+        showLastColumn=False,
+        showRowStripes=True,
+        showColumnStripes=False
+    )
+    return tabela
+
+
+def _iterar_linhas(df: pd.DataFrame, linhas_por_bloco: int = LINHAS_POR_BLOCO) -> Iterator[list]:
+    """Itera linhas do DataFrame em blocos, convertendo NaN/NaT em célula vazia."""
+    for inicio in range(0, len(df), linhas_por_bloco):
+        bloco = df.iloc[inicio:inicio + linhas_por_bloco]
+        bloco = bloco.astype(object).where(bloco.notna(), None)
+        yield from bloco.itertuples(index=False, name=None)
+
+
+def escrever_excel_tabelas(abas: List[Tuple[str, pd.DataFrame, str]], estilo: str) -> BytesIO:
+    """
+    Escreve Excel com uma Tabela formatada por aba, em passagem única.
+
+    Args:
+        abas: Lista de (nome da aba, DataFrame, nome da tabela)
+        estilo: Estilo aplicado às tabelas
+
+    Returns:
+        BytesIO posicionado no início com o arquivo final
+    """
+    wb = Workbook(write_only=True)
+
+    for nome_aba, df, nome_tabela in abas:
+        ws = wb.create_sheet(title=nome_aba)
+        colunas = [str(coluna) for coluna in df.columns]
+
+        if not colunas:
+            continue
+
+        # Tabela só faz sentido com ao menos uma linha de dados
+        if not df.empty:
+            with warnings.catch_warnings():
+                # Aviso do modo write-only sobre colunas da tabela (já declaradas em _criar_tabela)
+                warnings.simplefilter("ignore", UserWarning)
+                ws.add_table(_criar_tabela(nome_tabela, colunas, len(df) + 1, estilo))
+
+        ws.append(colunas)
+        for linha in _iterar_linhas(df):
+            ws.append(linha)
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+
+    return buffer
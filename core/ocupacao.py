@@ -0,0 +1,95 @@
+# core/ocupacao.py
+"""
+Representação compacta de ocupação de POIs.
+Placas são internadas em ids inteiros e o conjunto de veículos presentes é um bitset
+(int do Python, bit = id da placa). Texto "placa1;placa2" só é gerado na exportação.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+class IndicePlacas:
+    """
+    Índice placa ↔ id inteiro (posição do bit nos conjuntos de ocupação).
+    Um índice por unidade: conjuntos de POIs diferentes podem ser unidos com OR.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.placas: List[str] = []
+        self._textos: Dict[int, str] = {}
+
+    def id(self, placa: str) -> int:
+        """Id da placa (cria se ainda não existir)."""
+        placa_id = self._ids.get(placa)
+        if placa_id is None:
+            placa_id = self._ids[placa] = len(self.placas)
+            self.placas.append(placa)
+        return placa_id
+
+    def ocupacao_por_evento(self, placas: Iterable[str], entradas: Iterable[bool]) -> np.ndarray:
+        """
+        Conjunto de veículos presentes após cada evento (fluxo de deltas entrada/saída).
+
+        Args:
+            placas: Placa de cada evento (ordem cronológica)
+            entradas: True para entrada, False para saída
+
+        Returns:
+            Array (object) com o bitset após cada evento
+        """
+        bits = 0
+        conjuntos = []
+
+        for placa, entrada in zip(placas, entradas):
+            bit = 1 << self.id(placa)
+            bits = bits | bit if entrada else bits & ~bit
+            conjuntos.append(bits)
+
+        return np.array(conjuntos, dtype=object)
+
+    def lista(self, bits: int) -> List[str]:
+        """Placas do conjunto, em ordem alfabética."""
+        placas = []
+        while bits:
+            menor = bits & -bits
+            placas.append(self.placas[menor.bit_length() - 1])
+            bits ^= menor
+        return sorted(placas)
+
+    def texto(self, bits: int) -> str:
+        """Conjunto no formato exportado ("placa1;placa2", ordem alfabética)."""
+        texto = self._textos.get(bits)
+        if texto is None:
+            texto = self._textos[bits] = ";".join(self.lista(bits))
+        return texto
+
+    def textos(self, conjuntos: pd.Series) -> pd.Series:
+        """Materializa uma coluna de bitsets como texto (fronteira de exportação)."""
+        return conjuntos.map(self.texto)
+
+    def de_texto(self, texto) -> int:
+        """Bitset a partir do texto exportado (vazio/NaN = conjunto vazio)."""
+        if pd.isna(texto):
+            return 0
+
+        bits = 0
+        for placa in str(texto).split(";"):
+            placa = placa.strip()
+            if placa:
+                bits |= 1 << self.id(placa)
+        return bits
+
+    def de_textos(self, textos: pd.Series) -> pd.Series:
+        """Converte coluna de texto em bitsets (cada texto distinto é lido uma vez)."""
+        codigos, unicos = pd.factorize(textos, use_na_sentinel=False)
+        conjuntos = np.array([self.de_texto(texto) for texto in unicos], dtype=object)
+        return pd.Series(conjuntos[codigos] if len(codigos) else [], index=textos.index, dtype=object)
+
+
+def contar(conjuntos: pd.Series) -> pd.Series:
+    """Quantidade de veículos em cada bitset."""
+    return conjuntos.map(int.bit_count).astype("int64")
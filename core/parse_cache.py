@@ -0,0 +1,142 @@
+# core/parse_cache.py
+"""
+Cache de leitura dos relatórios C09 endereçado por conteúdo.
+Um XLSX baixado com o mesmo conteúdo de outro já lido (retry, CANDLES x COMPLETO)
+reaproveita a cópia colunar do DataFrame filtrado em vez de reler o Excel.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+
+# Parquet (pyarrow): leitura não executa código, ao contrário de pickle
+FORMATO_CACHE = "parquet"
+
+
+# Tamanho máximo padrão do diretório de cache
+TAMANHO_MAXIMO_MB = 500
+
+
+def calcular_hash_arquivo(caminho_arquivo: str, tamanho_bloco: int = 1024 * 1024) -> str:
+    """Hash SHA-256 do conteúdo do arquivo (lido em blocos)."""
+    sha = hashlib.sha256()
+    with open(caminho_arquivo, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+class CacheLeitura:
+    """
+    Cache local de DataFrames lidos, com descarte LRU por tamanho total.
+    Cada entrada é um arquivo "<chave>_<total de registros>.<formato>"; o mtime marca o último acesso.
+    """
+
+    def __init__(self, pasta: str = None, tamanho_maximo_mb: float = TAMANHO_MAXIMO_MB):
+        """
+        Inicializa cache de leitura.
+
+        Args:
+            pasta: Diretório do cache (padrão: C09_CACHE_DIR ou pasta temporária do usuário)
+            tamanho_maximo_mb: Tamanho máximo do diretório antes de descartar entradas antigas
+
+        Raises:
+            PermissionError: Diretório existente pertence a outro usuário
+        """
+        if pasta is None:
+            sufixo = f"_{os.getuid()}" if hasattr(os, "getuid") else ""
+            pasta = os.getenv("C09_CACHE_DIR") or Path(tempfile.gettempdir()) / f"c09_cache_leitura{sufixo}"
+
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._proteger_pasta()
+        self.tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+
+        self.acertos = 0
+        self.falhas = 0
+
+    def _proteger_pasta(self) -> None:
+        """Garante que só o usuário atual escreve no cache (entradas substituem a leitura do Excel)."""
+        if not hasattr(os, "getuid"):
+            return
+
+        info = self.pasta.stat()
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"Diretório de cache de leitura pertence a outro usuário: {self.pasta}")
+        if info.st_mode & 0o077:
+            self.pasta.chmod(0o700)
+
+    def _entrada(self, chave: str) -> Optional[Path]:
+        return next(iter(self.pasta.glob(f"{chave}_*.{FORMATO_CACHE}")), None)
+
+    def obter(self, chave: str) -> Optional[Tuple[pd.DataFrame, int]]:
+        """
+        Busca DataFrame lido em cache.
+
+        Returns:
+            Tuple com (DataFrame filtrado, total de registros) ou None se não estiver em cache
+        """
+        caminho = self._entrada(chave)
+        if caminho is None:
+            self.falhas += 1
+            return None
+
+        try:
+            df = pd.read_parquet(caminho)
+            total_registros = int(caminho.stem.rsplit("_", 1)[1])
+        except Exception as e:
+            print(f"⚠️ Entrada de cache ilegível, descartada: {e}")
+            caminho.unlink(missing_ok=True)
+            self.falhas += 1
+            return None
+
+        os.utime(caminho)  # Marca acesso recente (LRU)
+        self.acertos += 1
+        print(f"📦 Cache de leitura: relatório já lido ({len(df)} registros)")
+
+        return df, total_registros
+
+    def salvar(self, chave: str, df: pd.DataFrame, total_registros: int) -> None:
+        """Salva DataFrame lido e descarta entradas menos usadas acima do limite."""
+        caminho = self.pasta / f"{chave}_{total_registros}.{FORMATO_CACHE}"
+        temporario = caminho.with_suffix(".tmp")
+
+        try:
+            df = df.reset_index(drop=True)
+            df.to_parquet(temporario, index=False)
+            os.replace(temporario, caminho)
+        except Exception as e:
+            print(f"⚠️ Não foi possível salvar no cache de leitura: {e}")
+            temporario.unlink(missing_ok=True)
+            return
+
+        self._descartar_excedente()
+
+    def _descartar_excedente(self) -> None:
+        """Remove entradas com acesso mais antigo até o diretório caber no limite."""
+        entradas = [(arquivo, arquivo.stat()) for arquivo in self.pasta.glob(f"*.{FORMATO_CACHE}")]
+        total = sum(info.st_size for _, info in entradas)
+
+        for arquivo, info in sorted(entradas, key=lambda entrada: entrada[1].st_mtime):
+            if total <= self.tamanho_maximo:
+                break
+            arquivo.unlink(missing_ok=True)
+            total -= info.st_size
+
+    def resumo(self) -> str:
+        """Linha de log com contadores de acerto/falha."""
+        return f"📦 Cache de leitura C09: {self.acertos} acertos, {self.falhas} falhas"
+
+
+# Factory function
+def criar_cache_leitura(pasta: str = None, tamanho_maximo_mb: float = None) -> CacheLeitura:
+    """Cria cache de leitura com configurações padrão."""
+    if tamanho_maximo_mb is None:
+        tamanho_maximo_mb = float(os.getenv("C09_CACHE_MAX_MB", TAMANHO_MAXIMO_MB))
+
+    return CacheLeitura(pasta, tamanho_maximo_mb)
@@ -0,0 +1,89 @@
+# core/pastas_sharepoint.py
+"""
+Registro local das pastas já existentes no SharePoint.
+Evita consultar pasta por pasta a cada upload: caminhos conhecidos ficam em SQLite e só
+são verificados de novo quando o SharePoint responde 404 (pasta removida/renomeada).
+"""
+
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class RegistroPastasSharePoint:
+    """
+    Caminhos de pastas (URL relativa ao servidor) conhecidos por site SharePoint.
+    Cada operação abre sua própria conexão: seguro para unidades processadas em paralelo.
+    """
+
+    def __init__(self, caminho: str = None):
+        """
+        Inicializa registro de pastas do SharePoint.
+
+        Args:
+            caminho: Arquivo SQLite (padrão: C09_PASTAS_DB ou pasta temporária)
+        """
+        if caminho is None:
+            caminho = os.getenv("C09_PASTAS_DB") or Path(tempfile.gettempdir()) / "c09_pastas_sharepoint.sqlite"
+
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(self._conectar()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pastas ("
+                "site TEXT NOT NULL, caminho TEXT NOT NULL, PRIMARY KEY (site, caminho))"
+            )
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=30)
+
+    def ancestral_conhecido(self, site: str, caminho: str) -> Optional[str]:
+        """
+        Pasta conhecida mais profunda no caminho (ele próprio incluído).
+
+        Args:
+            site: URL do site SharePoint
+            caminho: URL relativa ao servidor da pasta
+
+        Returns:
+            Caminho da pasta conhecida ou None se nenhuma parte do caminho estiver registrada
+        """
+        partes = caminho.rstrip("/").split("/")
+        prefixos = ["/".join(partes[:i]) for i in range(len(partes), 1, -1)]
+
+        with closing(self._conectar()) as conn:
+            conhecidos = {
+                linha[0] for linha in conn.execute(
+                    f"SELECT caminho FROM pastas WHERE site = ? AND caminho IN ({','.join('?' * len(prefixos))})",
+                    (site, *prefixos)
+                )
+            }
+
+        return next((prefixo for prefixo in prefixos if prefixo in conhecidos), None)
+
+    def registrar(self, site: str, caminhos: Iterable[str]) -> None:
+        """Registra pastas existentes (ignora as já registradas)."""
+        with closing(self._conectar()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO pastas (site, caminho) VALUES (?, ?)",
+                ((site, caminho.rstrip("/")) for caminho in caminhos)
+            )
+
+    def descartar(self, site: str, caminho: str) -> None:
+        """Remove a pasta e as subpastas do registro (ex: SharePoint respondeu 404)."""
+        caminho = caminho.rstrip("/")
+        with closing(self._conectar()) as conn, conn:
+            conn.execute(
+                "DELETE FROM pastas WHERE site = ? AND (caminho = ? OR substr(caminho, 1, ?) = ?)",
+                (site, caminho, len(caminho) + 1, caminho + "/")
+            )
+
+
+# Factory function
+def criar_registro_pastas(caminho: str = None) -> RegistroPastasSharePoint:
+    """Cria registro de pastas do SharePoint com configurações padrão."""
+    return RegistroPastasSharePoint(caminho)
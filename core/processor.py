@@ -5,14 +5,70 @@ Substitui as funções tratar_planilha_c09() duplicadas em RRP/TLS.
 VERSÃO CORRIGIDA: Com validações robustas para Cloud Run.
 """
 
+import numpy as np
 import pandas as pd
 import unicodedata
+import hashlib
 import os
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
+from typing import Callable, Dict, List, Tuple, Any
 from openpyxl import load_workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
-from typing import Dict, List, Tuple, Any
+from openpyxl.utils.exceptions import InvalidFileException
+
+from core.excel_writer import escrever_excel_tabelas
+from core.parse_cache import CacheLeitura, calcular_hash_arquivo
+
+
+# Colunas do relatório Frotalog usadas pelo pipeline
+COLUNAS_RELATORIO = ["Veículo", "Ponto de Interesse", "Data Entrada", "Data Saída", "Observações"]
+
+# Versão da leitura filtrada gravada no cache: incrementar ao mudar colunas, tipos ou filtros
+VERSAO_LEITURA_CACHE = 1
+
+# Nomes de POI distintos mantidos em cache (compartilhado entre unidades e execuções do processo)
+TAMANHO_CACHE_POIS = 4096
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_POIS)
+def _normalizar_ascii(texto: str) -> str:
+    """Remove acentos (NFKD + ASCII) e espaços das pontas. Resultado em cache por valor."""
+    texto_normalizado = unicodedata.normalize("NFKD", texto)
+    texto_ascii = texto_normalizado.encode("ascii", errors="ignore").decode("utf-8")
+    
+    return texto_ascii.strip()
+
+
+class ResultadoProcessamento:
+    """
+    Resultado do processamento C09.
+    Mantém o DataFrame final com datas nativas; o Excel formatado só é gerado quando necessário (upload).
+    """
+    
+    def __init__(self, df: pd.DataFrame, gerador_excel: Callable[[pd.DataFrame], BytesIO]):
+        """
+        Args:
+            df: DataFrame final (Data Entrada/Data Saída como datetime)
+            gerador_excel: Função que serializa o DataFrame no Excel formatado
+        """
+        self.df = df
+        self._gerador_excel = gerador_excel
+        self._excel_bytes = None
+    
+    def __len__(self) -> int:
+        return len(self.df)
+    
+    @property
+    def excel_bytes(self) -> bytes:
+        """Conteúdo do Excel tratado (gerado na primeira chamada)."""
+        if self._excel_bytes is None:
+            self._excel_bytes = self._gerador_excel(self.df).getvalue()
+        return self._excel_bytes
+    
+    def buffer_excel(self) -> BytesIO:
+        """Novo buffer posicionado no início com o Excel tratado."""
+        return BytesIO(self.excel_bytes)
 
 
 class C09DataProcessor:
@@ -66,10 +122,124 @@ class C09DataProcessor:
             return ""
         
         # Remove acentos e normaliza
-        texto_normalizado = unicodedata.normalize("NFKD", str(texto))
-        texto_ascii = texto_normalizado.encode("ascii", errors="ignore").decode("utf-8")
+        return _normalizar_ascii(str(texto))
+    
+    def _padronizar_coluna(self, serie: pd.Series) -> pd.Series:
+        """
+        Padroniza uma coluna de texto normalizando apenas os valores distintos.
         
-        return texto_ascii.strip()
+        Args:
+            serie: Coluna com nomes (ex: "Ponto de Interesse")
+            
+        Returns:
+            Series padronizada com o mesmo índice
+        """
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+        normalizados = np.array([self._padronizar_texto(valor) for valor in unicos], dtype=object)
+        
+        return pd.Series(normalizados[codigos], index=serie.index, name=serie.name).infer_objects()
+    
+    def _ler_relatorio_filtrado(self, caminho_arquivo: str) -> Tuple[pd.DataFrame, int]:
+        """
+        Lê o relatório C09 em modo streaming (read-only), mantendo apenas as colunas
+        usadas e as linhas cujo POI padronizado está em pontos_desejados.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo Excel baixado
+            
+        Returns:
+            Tuple com (DataFrame filtrado, total de registros lidos)
+        """
+        try:
+            wb = load_workbook(caminho_arquivo, read_only=True, data_only=True, keep_links=False)
+        except InvalidFileException:
+            # Formato não suportado pelo openpyxl (ex: .xls): leitura completa
+            return self._ler_relatorio_completo(caminho_arquivo)
+        
+        try:
+            ws = wb.worksheets[0]
+            ws.reset_dimensions()
+            linhas = ws.iter_rows(values_only=True)
+            
+            cabecalho = next(linhas, None) or ()
+            posicoes = {}
+            for i, nome in enumerate(cabecalho):
+                posicoes.setdefault(nome, i)
+            
+            faltando = [coluna for coluna in COLUNAS_RELATORIO if coluna not in posicoes]
+            if faltando:
+                raise ValueError(f"Colunas ausentes no relatório C09: {faltando}")
+            
+            indices = [posicoes[coluna] for coluna in COLUNAS_RELATORIO]
+            i_poi = COLUNAS_RELATORIO.index("Ponto de Interesse")
+            pontos = set(self.pontos_desejados)
+            
+            total_registros = 0
+            registros = []
+            
+            for linha in linhas:
+                if all(valor is None for valor in linha):
+                    continue  # Linha em branco (ignorada também pelo read_excel)
+                total_registros += 1
+                
+                valores = [linha[i] if i < len(linha) else None for i in indices]
+                poi = valores[i_poi]
+                if poi is None:
+                    continue
+                
+                valores[i_poi] = _normalizar_ascii(str(poi))
+                if valores[i_poi] in pontos:
+                    registros.append(valores)
+        finally:
+            wb.close()
+        
+        df = pd.DataFrame(registros, columns=COLUNAS_RELATORIO).infer_objects()
+        
+        # Células vazias como NaN (igual ao read_excel)
+        df = df.fillna(np.nan)
+        
+        return df, total_registros
+    
+    def _ler_relatorio(self, caminho_arquivo: str, cache_leitura: CacheLeitura = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Lê o relatório filtrado, reaproveitando o cache quando o arquivo tem conteúdo já lido.
+        
+        Args:
+            caminho_arquivo: Caminho do arquivo Excel baixado
+            cache_leitura: Cache de leitura endereçado por conteúdo (None = sempre lê o Excel)
+            
+        Returns:
+            Tuple com (DataFrame filtrado, total de registros lidos)
+        """
+        if cache_leitura is None:
+            return self._ler_relatorio_filtrado(caminho_arquivo)
+        
+        # Mesmo arquivo filtrado por outra lista de POIs (ou outra versão da leitura) é outra entrada
+        chave = hashlib.sha256((
+            f"v{VERSAO_LEITURA_CACHE}:{calcular_hash_arquivo(caminho_arquivo)}"
+            + repr(sorted(self.pontos_desejados))
+        ).encode("utf-8")).hexdigest()
+        
+        em_cache = cache_leitura.obter(chave)
+        if em_cache is not None:
+            return em_cache
+        
+        df, total_registros = self._ler_relatorio_filtrado(caminho_arquivo)
+        cache_leitura.salvar(chave, df, total_registros)
+        
+        return df, total_registros
+    
+    def _ler_relatorio_completo(self, caminho_arquivo: str) -> Tuple[pd.DataFrame, int]:
+        """Leitura completa com pandas (fallback), padronizando e filtrando POIs depois."""
+        df = pd.read_excel(caminho_arquivo)
+        
+        if df.empty:
+            return df, 0
+        
+        df["Ponto de Interesse"] = self._padronizar_coluna(df["Ponto de Interesse"].astype(str))
+        df_filtrado = df[df["Ponto de Interesse"].isin(self.pontos_desejados)].copy()
+        
+        return df_filtrado, len(df)
     
     def _classificar_grupo(self, ponto: str) -> str:
         """Classifica grupo do POI com base na configuração."""
@@ -85,37 +255,27 @@ class C09DataProcessor:
         Returns:
             DataFrame agrupado
         """
-        # Aplica a classificação de grupo
-        df["Grupo"] = df["Ponto de Interesse"].apply(self._classificar_grupo)
-
-        # Agrupa entradas consecutivas por Veículo e Ponto de Interesse
-        agrupados = []
         df_reset = df.reset_index(drop=True)
-        idx = 0
-        while idx < len(df_reset):
-            atual = df_reset.iloc[idx]
-            veic  = atual["Veículo"]
-            ponto = atual["Ponto de Interesse"]
-            grupo = atual["Grupo"]
-            entrada = atual["Data Entrada"]
-            saida   = atual["Data Saída"]
+        veiculos = df_reset["Veículo"]
+        pontos = df_reset["Ponto de Interesse"]
 
-            j = idx + 1
-            while j < len(df_reset) and df_reset.iloc[j]["Veículo"] == veic and df_reset.iloc[j]["Ponto de Interesse"] == ponto:
-                saida = df_reset.iloc[j]["Data Saída"]
-                j += 1
+        # Um novo bloco começa sempre que veículo ou POI mudam em relação à linha anterior
+        # (NaN nunca é igual ao anterior, igual à comparação linha a linha original)
+        inicio_bloco = veiculos.ne(veiculos.shift()) | pontos.ne(pontos.shift())
+        inicios = np.flatnonzero(inicio_bloco.to_numpy())
+        fins = np.append(inicios[1:] - 1, len(df_reset) - 1) if len(inicios) else inicios
 
-            agrupados.append({
-                "Veículo": veic,
-                "Ponto de Interesse": ponto,
-                "Data Entrada": entrada,
-                "Data Saída": saida,
-                "Grupo": grupo,
-                "Observações": atual.get("Observações", "")
-            })
-            idx = j
-
-        df_ag = pd.DataFrame(agrupados)
+        # Primeira linha do bloco: veículo, POI, entrada e observação; última linha: saída
+        primeiros = df_reset.iloc[inicios].reset_index(drop=True)
+        df_ag = pd.DataFrame({
+            "Veículo": primeiros["Veículo"],
+            "Ponto de Interesse": primeiros["Ponto de Interesse"],
+            "Data Entrada": primeiros["Data Entrada"],
+            "Data Saída": df_reset["Data Saída"].iloc[fins].reset_index(drop=True),
+        })
+        df_ag["Grupo"] = df_ag["Ponto de Interesse"].map(self._classificar_grupo)
+        df_ag["Observações"] = primeiros["Observações"] if "Observações" in primeiros else ""
+        df_ag = df_ag.infer_objects()
 
         # Calcula o tempo de permanência
         df_ag["Tempo (h)"] = (df_ag["Data Saída"] - df_ag["Data Entrada"]).dt.total_seconds() / 3600
@@ -128,76 +288,119 @@ class C09DataProcessor:
 
         return df_ag
     
+    def _indice_proximo_evento(self, grupos: np.ndarray, blocos: np.ndarray, grupos_alvo: List[str]) -> np.ndarray:
+        """
+        Calcula, para cada linha, o índice da próxima linha do mesmo veículo cujo grupo está em grupos_alvo.
+        
+        Args:
+            grupos: Grupo de cada linha (já ordenado por Veículo/Data Entrada)
+            blocos: Identificador do bloco consecutivo de cada veículo
+            grupos_alvo: Grupos que encerram o trajeto
+            
+        Returns:
+            Array com o índice do próximo evento ou -1 se não houver
+        """
+        n = len(grupos)
+        posicoes = np.where(np.isin(grupos, grupos_alvo), np.arange(n), n)
+        
+        # Mínimo acumulado de trás para frente = próxima posição alvo a partir de cada linha
+        proximo = np.minimum.accumulate(posicoes[::-1])[::-1]
+        proximo = np.append(proximo[1:], n)  # Apenas linhas posteriores
+        
+        valido = proximo < n
+        valido[valido] = blocos[proximo[valido]] == blocos[valido]
+        
+        return np.where(valido, proximo, -1)
+    
+    def _acumular_horas_grupo(self, grupos: np.ndarray, tempos: np.ndarray, 
+                              blocos: np.ndarray, grupo: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soma acumulada por veículo das horas de um grupo (ex: Manutenção).
+        
+        Returns:
+            Tuple com (horas acumuladas, quantidade acumulada de tempos ausentes)
+        """
+        do_grupo = grupos == grupo
+        horas = pd.Series(np.where(do_grupo, np.nan_to_num(tempos), 0.0))
+        ausentes = pd.Series((do_grupo & np.isnan(tempos)).astype(np.int64))
+        
+        return (
+            horas.groupby(blocos).cumsum().to_numpy(),
+            ausentes.groupby(blocos).cumsum().to_numpy()
+        )
+    
+    def _somar_horas_intervalo(self, acumulado: Tuple[np.ndarray, np.ndarray], 
+                               i_inicio: np.ndarray, i_fim: np.ndarray) -> np.ndarray:
+        """Soma horas entre i_inicio e i_fim (exclusivo) como diferença de somas acumuladas."""
+        horas, ausentes = acumulado
+        soma = horas[i_fim - 1] - horas[i_inicio]
+        
+        # Tempo ausente no intervalo propaga NaN, como na soma linha a linha
+        return np.where(ausentes[i_fim - 1] > ausentes[i_inicio], np.nan, soma)
+    
     def _calcular_trajetos(self, df_ag: pd.DataFrame) -> pd.DataFrame:
         """Calcula trajetos carregados e vazios."""
-        def soma_justificativas(df_temp, i_inicio, i_fim):
-            """Soma horas de manutenção e parada operacional entre dois índices."""
-            horas_manutencao = 0.0
-            horas_operacional = 0.0
-            
-            for k in range(i_inicio + 1, i_fim):
-                registro = df_temp.iloc[k]
-                if registro["Grupo"] == "Manutenção":
-                    horas_manutencao += registro["Tempo (h)"]
-                elif registro["Grupo"] == "Parada Operacional":
-                    horas_operacional += registro["Tempo (h)"]
-            
-            return horas_manutencao, horas_operacional
-        
-        # Processa cada linha para calcular trajetos
-        for i in range(len(df_ag)):
-            atual = df_ag.iloc[i]
-            veic = atual["Veículo"]
-            grupo = atual["Grupo"]
-            saida_atual = atual["Data Saída"]
-            
-            if grupo in ["Carregamento", "Fabrica"]:
-                # Trajeto Carregado: desta saída até próxima entrada de Descarregamento/Terminal
-                for j in range(i + 1, len(df_ag)):
-                    prox = df_ag.iloc[j]
-                    if prox["Veículo"] != veic:
-                        break
-                    if prox["Grupo"] in ["Descarregamento", "Terminal"]:
-                        if prox["Data Entrada"] >= saida_atual:
-                            delta_h = (prox["Data Entrada"] - saida_atual).total_seconds() / 3600
-                            df_ag.at[i, "Trajeto Carregado"] = round(delta_h, 5)
-                            
-                            if delta_h > self.slas.get("trajeto_carregado", float('inf')):
-                                horas_mant, horas_oper = soma_justificativas(df_ag, i, j)
-                                if (horas_mant + horas_oper) > 0:
-                                    df_ag.at[i, "Observação"] += (
-                                        f"Trajeto Carregado longo ({delta_h:.2f}h > {self.slas['trajeto_carregado']:.2f}h): "
-                                        f"{horas_mant:.2f}h em Manutenção, {horas_oper:.2f}h em Parada Operacional. "
-                                    )
-                                else:
-                                    df_ag.at[i, "Observação"] += (
-                                        f"Trajeto Carregado longo ({delta_h:.2f}h > {self.slas['trajeto_carregado']:.2f}h), sem justificativa. "
-                                    )
-                        break
-                        
-            elif grupo in ["Descarregamento", "Terminal"]:
-                # Trajeto Vazio: desta saída até próxima entrada de Carregamento
-                for j in range(i + 1, len(df_ag)):
-                    prox = df_ag.iloc[j]
-                    if prox["Veículo"] != veic:
-                        break
-                    if prox["Grupo"] in ["Carregamento", "Fabrica"]:
-                        if prox["Data Entrada"] >= saida_atual:
-                            delta_h = (prox["Data Entrada"] - saida_atual).total_seconds() / 3600
-                            df_ag.at[i, "Trajeto Vazio"] = round(delta_h, 5)
-                            
-                            if delta_h > self.slas.get("trajeto_vazio", float('inf')):
-                                horas_mant, horas_oper = soma_justificativas(df_ag, i, j)
-                                if (horas_mant + horas_oper) > 0:
-                                    df_ag.at[i, "Observação"] += (
-                                        f"Trajeto Vazio longo ({delta_h:.2f}h > {self.slas['trajeto_vazio']:.2f}h): "
-                                        f"{horas_mant:.2f}h em Manutenção, {horas_oper:.2f}h em Parada Operacional. "
-                                    )
-                                else:
-                                    df_ag.at[i, "Observação"] += (
-                                        f"Trajeto Vazio longo ({delta_h:.2f}h > {self.slas['trajeto_vazio']:.2f}h), sem justificativa. "
-                                    )
-                        break
+        grupos = df_ag["Grupo"].to_numpy()
+        tempos = df_ag["Tempo (h)"].to_numpy(dtype=float)
+        
+        # Blocos consecutivos do mesmo veículo (a busca nunca atravessa para outro veículo)
+        veiculos = df_ag["Veículo"]
+        blocos = veiculos.ne(veiculos.shift()).cumsum().to_numpy()
+        
+        # Horas acumuladas por veículo em cada grupo de justificativa
+        justificativas = {
+            grupo: self._acumular_horas_grupo(grupos, tempos, blocos, grupo)
+            for grupo in ("Manutenção", "Parada Operacional")
+        }
+        
+        observacoes = df_ag["Observação"].to_numpy(dtype=object, copy=True)
+        
+        trajetos = [
+            # Trajeto Carregado: desta saída até próxima entrada de Descarregamento/Terminal
+            ("Trajeto Carregado", "trajeto_carregado", ["Carregamento", "Fabrica"], ["Descarregamento", "Terminal"]),
+            # Trajeto Vazio: desta saída até próxima entrada de Carregamento
+            ("Trajeto Vazio", "trajeto_vazio", ["Descarregamento", "Terminal"], ["Carregamento", "Fabrica"]),
+        ]
+        
+        for coluna, chave_sla, grupos_origem, grupos_destino in trajetos:
+            proximo = self._indice_proximo_evento(grupos, blocos, grupos_destino)
+            linhas = np.flatnonzero(np.isin(grupos, grupos_origem) & (proximo >= 0))
+            destinos = proximo[linhas]
+            
+            saida_atual = df_ag["Data Saída"].iloc[linhas].reset_index(drop=True)
+            entrada_prox = df_ag["Data Entrada"].iloc[destinos].reset_index(drop=True)
+            
+            # Só considera o trajeto se a próxima entrada não for anterior à saída
+            alcancavel = (entrada_prox >= saida_atual).to_numpy()
+            linhas, destinos = linhas[alcancavel], destinos[alcancavel]
+            deltas_h = ((entrada_prox - saida_atual)[alcancavel].dt.total_seconds() / 3600).tolist()
+            
+            valores = df_ag[coluna].to_numpy(copy=True)
+            valores[linhas] = [round(delta_h, 5) for delta_h in deltas_h]
+            df_ag[coluna] = valores
+            
+            sla = self.slas.get(chave_sla, float('inf'))
+            longos = np.flatnonzero(np.array(deltas_h) > sla)
+            if len(longos) == 0:
+                continue
+            
+            i_longos, j_longos = linhas[longos], destinos[longos]
+            horas_mant = self._somar_horas_intervalo(justificativas["Manutenção"], i_longos, j_longos)
+            horas_oper = self._somar_horas_intervalo(justificativas["Parada Operacional"], i_longos, j_longos)
+            
+            for i, k, mant, oper in zip(i_longos, longos, horas_mant, horas_oper):
+                delta_h = deltas_h[k]
+                if (mant + oper) > 0:
+                    observacoes[i] += (
+                        f"{coluna} longo ({delta_h:.2f}h > {self.slas[chave_sla]:.2f}h): "
+                        f"{mant:.2f}h em Manutenção, {oper:.2f}h em Parada Operacional. "
+                    )
+                else:
+                    observacoes[i] += (
+                        f"{coluna} longo ({delta_h:.2f}h > {self.slas[chave_sla]:.2f}h), sem justificativa. "
+                    )
+        
+        df_ag["Observação"] = observacoes
         
         return df_ag
     
@@ -213,69 +416,34 @@ class C09DataProcessor:
             lambda x: x.split("-")[-1].strip()
         )
         
-        # Formata datas para string
-        df["Data Entrada"] = df["Data Entrada"].dt.strftime("%d/%m/%Y %H:%M:%S")
-        df["Data Saída"] = df["Data Saída"].dt.strftime("%d/%m/%Y %H:%M:%S")
-        
         return df
     
     def _criar_excel_formatado(self, df: pd.DataFrame) -> BytesIO:
         """Cria Excel formatado com tabela."""
-        buffer_excel = BytesIO()
-        
-        # Escreve dados
-        with pd.ExcelWriter(buffer_excel, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Relatório")
-        
-        buffer_excel.seek(0)
-        
-        # Formata como tabela
-        wb = load_workbook(buffer_excel)
-        ws = wb.active
-        num_linhas = ws.max_row
-        num_colunas = ws.max_column
-        
-        if num_linhas > 1 and num_colunas > 0:
-            # Calcula referência da tabela
-            def coluna_letra(n):
-                letra = ""
-                while n > 0:
-                    n, resto = divmod(n - 1, 26)
-                    letra = chr(65 + resto) + letra
-                return letra
-            
-            ultima_coluna = coluna_letra(num_colunas)
-            ref = f"A1:{ultima_coluna}{num_linhas}"
-            
-            # Cria tabela
-            tabela = Table(displayName="TabelaRelatorio", ref=ref)
-            style = TableStyleInfo(
-                name="TableStyleMedium2",
-                showFirstColumn=False,
-                showLastColumn=False,
-                showRowStripes=True,
-                showColumnStripes=False
-            )
-            tabela.tableStyleInfo = style
-            ws.add_table(tabela)
-        
-        # Salva resultado final
-        final_buffer = BytesIO()
-        wb.save(final_buffer)
-        final_buffer.seek(0)
-        
-        return final_buffer
+        df = df.copy()
+        
+        # Formata datas para string
+        df["Data Entrada"] = df["Data Entrada"].dt.strftime("%d/%m/%Y %H:%M:%S")
+        df["Data Saída"] = df["Data Saída"].dt.strftime("%d/%m/%Y %H:%M:%S")
+        
+        # Escreve dados e tabela em passagem única
+        return escrever_excel_tabelas(
+            [("Relatório", df, "TabelaRelatorio")],
+            estilo="TableStyleMedium2"
+        )
     
-    def processar_relatorio_c09(self, caminho_arquivo_origem: str) -> BytesIO:
+    def processar_relatorio_c09(self, caminho_arquivo_origem: str,
+                                cache_leitura: CacheLeitura = None) -> ResultadoProcessamento:
         """
         Processa relatório C09 completo.
         VERSÃO CORRIGIDA: Com validações robustas.
         
         Args:
             caminho_arquivo_origem: Caminho do arquivo Excel baixado
-            
+            cache_leitura: Cache de leitura por conteúdo do arquivo (None = sempre lê o Excel)
+
         Returns:
-            BytesIO: Excel tratado e formatado
+            ResultadoProcessamento: DataFrame tratado + Excel formatado sob demanda
             
         Raises:
             Exception: Se houver erro no processamento
@@ -300,18 +468,13 @@ class C09DataProcessor:
             print(f"✅ Validação OK: {caminho_arquivo_origem} ({tamanho_arquivo} bytes)")
             # ===== FIM DAS VALIDAÇÕES =====
             
-            # 1. Carrega dados
-            df = pd.read_excel(caminho_arquivo_origem)
-            print(f"Dados carregados: {len(df)} registros")
+            # 1-3. Carrega dados em streaming, padronizando e filtrando POIs durante a leitura
+            df_filtrado, total_registros = self._ler_relatorio(caminho_arquivo_origem, cache_leitura)
+            print(f"Dados carregados: {total_registros} registros")
             
-            if df.empty:
+            if total_registros == 0:
                 raise ValueError("Arquivo Excel está vazio ou sem dados válidos")
             
-            # 2. Padroniza POIs
-            df["Ponto de Interesse"] = df["Ponto de Interesse"].astype(str).apply(self._padronizar_texto)
-            
-            # 3. Filtra POIs desejados
-            df_filtrado = df[df["Ponto de Interesse"].isin(self.pontos_desejados)].copy()
             print(f"Após filtro POIs: {len(df_filtrado)} registros")
             
             if df_filtrado.empty:
@@ -319,7 +482,7 @@ class C09DataProcessor:
             
             # 4. Organiza dados
             df_filtrado = df_filtrado.sort_values(by=["Veículo", "Data Entrada"])
-            df_filtrado = df_filtrado[["Veículo", "Ponto de Interesse", "Data Entrada", "Data Saída", "Observações"]]
+            df_filtrado = df_filtrado[COLUNAS_RELATORIO]
             
             # 5. Agrupa registros consecutivos
             df_agrupado = self._agrupar_registros_consecutivos(df_filtrado)
@@ -331,11 +494,11 @@ class C09DataProcessor:
             # 7. Formatação final
             df_final = self._formatar_dados_finais(df_com_trajetos)
             
-            # 8. Cria Excel formatado
-            buffer_resultado = self._criar_excel_formatado(df_final)
+            # 8. Excel formatado fica para quando for necessário (upload)
+            resultado = ResultadoProcessamento(df_final, self._criar_excel_formatado)
             
             print(f"=== Processamento concluído: {len(df_final)} registros finais ===")
-            return buffer_resultado
+            return resultado
             
         except Exception as e:
             print(f"❌ ERRO no processamento: {e}")
@@ -4,245 +4,629 @@ Módulo para gerenciar Reports diretamente no SharePoint.
 Substitui dependência de arquivos locais por processamento em nuvem.
 """
 
+import hashlib
+import json
+import os
+import threading
+import time
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from urllib.parse import quote
+from office365.runtime.http.http_method import HttpMethod
+from office365.runtime.http.request_options import RequestOptions
 from office365.sharepoint.client_context import ClientContext
-from office365.runtime.auth.user_credential import UserCredential
-from openpyxl import load_workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
+
+from core.excel_writer import escrever_excel_tabelas
+from core.cache_sharepoint import obter_cache_sharepoint
+from core.sessao_sharepoint import obter_contexto_sharepoint
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+
+# Manifesto das partições é único para todas as unidades: leitura-modificação-escrita
+# serializada no processo (unidades rodam em paralelo); entre processos (CANDLES x COMPLETO)
+# partições e manifesto são gravados condicionados ao ETag lido e refeitos em caso de conflito
+_LOCK_ARQUIVO_REPORTS = threading.RLock()
+TENTATIVAS_MANIFESTO = 5
+
+# Arquivo alterado fora do manifesto há mais tempo que isso é de execução interrompida
+# (app.py encerra a execução em 600 s) e pode ser sobrescrito
+PRAZO_GRAVACAO_ABANDONADA = timedelta(minutes=15)
+
+# Partições gravadas por este processo e ainda não confirmadas no manifesto (caminho → ETag):
+# na nova tentativa após 412 do manifesto podem ser sobrescritas
+_VERSOES_PENDENTES = {}
+
+# Abas do arquivo de reports (uma partição por unidade/mês/aba)
+ABAS_REPORTS = ["Resumo", "Candles", "Resumo por Hora"]
+
+# Coluna de data que define o mês da partição
+COLUNA_DATA_ABA = {"Resumo": "Data", "Candles": "Data Evento", "Resumo por Hora": "Hora"}
+
+# Cópia Parquet ao lado de cada XLSX (leitura mais rápida; XLSX continua para o Power BI)
+GRAVAR_PARQUET = PARQUET_DISPONIVEL and os.getenv("REPORTS_PARQUET", "").lower() in ("1", "true", "sim")
+
+
+class ConflitoVersao(Exception):
+    """Arquivo alterado por outra execução desde a leitura (gravação condicional recusada)."""
+
+
+class WorkbookReports:
+    """
+    Snapshot do arquivo monolítico de reports (base_dados_reports.xlsx): todas as abas de um único
+    download, com datas já tipadas. Usado apenas na migração para o armazenamento particionado.
+    """
+    
+    def __init__(self, abas: Dict[str, pd.DataFrame], existe: bool = True, versao: Optional[str] = None):
+        """
+        Args:
+            abas: DataFrames por nome de aba (apenas abas presentes no arquivo)
+            existe: False se o arquivo não existe/não pôde ser lido
+            versao: ETag do arquivo no SharePoint (None se desconhecida)
+        """
+        self.abas = abas
+        self.existe = existe
+        self.versao = versao
+    
+    @property
+    def resumo(self) -> Optional[pd.DataFrame]:
+        """Aba Resumo (None se não existir)."""
+        return self.abas.get("Resumo")
+    
+    def aba(self, sheet_name: str) -> pd.DataFrame:
+        """Aba pelo nome (DataFrame vazio se não existir)."""
+        return self.abas.get(sheet_name, pd.DataFrame())
+
+
+def hash_conteudo(df: pd.DataFrame) -> str:
+    """
+    Hash do conteúdo da partição, estável entre gravação e releitura do XLSX
+    (vazio/NaN/NaT equivalentes, valores comparados como texto).
+    """
+    normalizado = df.astype(object).where(df.notna(), "").astype(str)
+    sha = hashlib.sha256("|".join(map(str, df.columns)).encode())
+    sha.update(pd.util.hash_pandas_object(normalizado, index=False).to_numpy().tobytes())
+    return sha.hexdigest()
 
 
 class SharePointReportsManager:
     """
     Gerencia sistema de Reports diretamente no SharePoint.
-    Elimina dependência de arquivos locais.
+    Dados particionados em um arquivo por unidade/mês/aba (CREARE/Reports/Particoes),
+    indexados por manifesto.json: cada atualização regrava apenas as partições alteradas.
     """
     
-    def __init__(self, site_url: str, username: str, password: str):
-        """Inicializa gerenciador de reports."""
+    def __init__(self, site_url: str, username: str, password: str, unidade: Optional[str] = None):
+        """
+        Inicializa gerenciador de reports.
+        
+        Args:
+            site_url: URL do site SharePoint
+            username: Usuário SharePoint
+            password: Senha SharePoint
+            unidade: Unidade padrão das atualizações de um POI (atualizar_candles)
+        """
         self.site_url = site_url
         self.username = username
         self.password = password
-        self._ctx = None
+        self.unidade = unidade
         
         # ✅ MUDANÇA: Usa nova estrutura de pastas
         from config.settings import ConstantesEspecificas
         self.base_docs = ConstantesEspecificas.SHAREPOINT_DOCS_PATH
         self.reports_path = f"{self.base_docs}/CREARE/Reports"
-        self.reports_file = "base_dados_reports.xlsx"
+        self.reports_file = "base_dados_reports.xlsx"  # Arquivo monolítico anterior (migração)
+        self.particoes_path = f"{self.reports_path}/Particoes"
+        self.manifesto_file = "manifesto.json"
+        
+        # Último manifesto conhecido (lido ou gravado por esta instância) e seu ETag
+        self.manifesto = None
+        self.versao_manifesto = None
+        # Partições já lidas/gravadas: chave → (versão/ETag, DataFrame)
+        self._cache_particoes = {}
+        # Pastas já confirmadas no SharePoint
+        self._pastas_existentes = set()
     
     def _get_context(self) -> ClientContext:
-        """Obtém contexto SharePoint."""
-        if self._ctx is None:
-            credentials = UserCredential(self.username, self.password)
-            self._ctx = ClientContext(self.site_url).with_credentials(credentials)
-        return self._ctx
-    
-    def _criar_pasta_reports(self) -> bool:
-        """Cria pasta Reports no SharePoint se não existir."""
-        try:
-            ctx = self._get_context()
+        """Obtém contexto SharePoint (sessão autenticada compartilhada pelo processo)."""
+        return obter_contexto_sharepoint(self.site_url, self.username, self.password)
+    
+    @staticmethod
+    def _nao_encontrado(erro: Exception) -> bool:
+        """Indica se o erro do SharePoint é 404 (arquivo/pasta inexistente)."""
+        resposta = getattr(erro, "response", None)
+        return getattr(resposta, "status_code", None) == 404
+    
+    def _garantir_pasta(self, caminho: str) -> None:
+        """Cria a pasta (e as intermediárias abaixo de Reports) se não existir."""
+        if caminho in self._pastas_existentes:
+            return
+        
+        ctx = self._get_context()
+        atual = self.base_docs
+        
+        for parte in caminho[len(self.base_docs):].strip("/").split("/"):
+            pai, atual = atual, f"{atual}/{parte}"
+            if atual in self._pastas_existentes:
+                continue
             
-            # Verifica se pasta existe
             try:
-                pasta = ctx.web.get_folder_by_server_relative_url(self.reports_path)
+                pasta = ctx.web.get_folder_by_server_relative_url(atual)
                 ctx.load(pasta)
                 ctx.execute_query()
-                return True
-            except:
-                # Cria pasta
-                pasta_pai = ctx.web.get_folder_by_server_relative_url(f"{self.base_docs}/CREARE")
-                pasta_pai.folders.add("Reports")
+            except Exception as e:
+                if not self._nao_encontrado(e):
+                    raise
+                ctx.web.get_folder_by_server_relative_url(pai).folders.add(parte)
                 ctx.execute_query()
-                print("✅ Pasta Reports criada no SharePoint")
-                return True
-                
-        except Exception as e:
-            print(f"❌ Erro ao criar pasta Reports: {e}")
-            return False
+                print(f"✅ Pasta {parte} criada no SharePoint")
+            
+            self._pastas_existentes.add(atual)
     
-    def carregar_arquivo_reports(self) -> Optional[pd.DataFrame]:
+    def _url_arquivo(self, caminho_arquivo: str) -> str:
+        """URL REST do conteúdo ($value) do arquivo."""
+        caminho = quote(caminho_arquivo.replace("'", "''"))
+        return f"{self.site_url}/_api/web/GetFileByServerRelativeUrl('{caminho}')/$value"
+    
+    def _baixar(self, caminho_arquivo: str,
+                versao: Optional[str] = None) -> Optional[Tuple[BytesIO, Optional[str]]]:
         """
-        Carrega arquivo de reports do SharePoint.
+        Baixa arquivo do SharePoint, reaproveitando o cache em disco se a versão não mudou.
+        O cache é gravado sob o ETag da resposta do download, não sob o ETag esperado: se o
+        arquivo mudou desde que a versão foi lida, o conteúdo novo não fica sob a versão antiga.
         
+        Args:
+            caminho_arquivo: URL relativa ao servidor
+            versao: ETag esperado (ex: do manifesto); None consulta o ETag atual (uma requisição de metadados)
+            
         Returns:
-            DataFrame com dados ou None se não existir
+            Tuple com (buffer, ETag do conteúdo baixado ou None se desconhecido);
+            None se o arquivo não existir (demais erros propagam)
         """
+        ctx = self._get_context()
+        cache = obter_cache_sharepoint()
+        
         try:
-            ctx = self._get_context()
-            caminho_arquivo = f"{self.reports_path}/{self.reports_file}"
-            
-            # Baixa arquivo (método correto Office365)
-            arquivo = ctx.web.get_file_by_server_relative_url(caminho_arquivo)
-            
-            # Cria buffer para receber o download
-            download_buffer = BytesIO()
-            arquivo.download(download_buffer).execute_query()
-            ctx.execute_query()
-            
-            # Volta para o início do buffer
-            download_buffer.seek(0)
-            
-            # Carrega em DataFrame
-            df = pd.read_excel(download_buffer, sheet_name="Resumo", engine="openpyxl")
-            df['Data'] = pd.to_datetime(df['Data']).dt.date
-            
-            print(f"✅ Reports carregado: {len(df)} registros")
-            return df
-            
+            if versao is None:
+                versao = self._consultar_versao(caminho_arquivo)
         except Exception as e:
-            print(f"⚠️ Arquivo reports não encontrado no SharePoint: {e}")
+            if self._nao_encontrado(e):
+                return None
+            raise
+        
+        conteudo = cache.obter_bytes(caminho_arquivo, versao) if versao else None
+        if conteudo is not None:
+            return BytesIO(conteudo), versao
+        
+        resposta = ctx.pending_request().execute_request_direct(RequestOptions(self._url_arquivo(caminho_arquivo)))
+        if resposta.status_code == 404:
             return None
+        resposta.raise_for_status()
+        conteudo = resposta.content
+        
+        versao_baixada = resposta.headers.get("ETag")
+        if not versao_baixada and versao:
+            # Sem ETag na resposta: conteúdo é da versão esperada só se ela ainda for a atual
+            versao_baixada = versao if self._consultar_versao(caminho_arquivo) == versao else None
+        
+        if versao_baixada:
+            cache.salvar_bytes(caminho_arquivo, versao_baixada, conteudo)
+        return BytesIO(conteudo), versao_baixada
+    
+    def _consultar_versao(self, caminho_arquivo: str) -> Optional[str]:
+        """ETag atual do arquivo (uma requisição de metadados; exceção 404 se não existir)."""
+        ctx = self._get_context()
+        arquivo = ctx.web.get_file_by_server_relative_url(caminho_arquivo)
+        ctx.load(arquivo, ["ETag"])
+        ctx.execute_query()
+        return arquivo.properties.get("ETag")
     
-    def carregar_candles_sharepoint(self, sheet_name: str) -> Optional[pd.DataFrame]:
+    def _gravar_se_versao(self, pasta: str, nome_arquivo: str, conteudo: bytes,
+                          versao_esperada: Optional[str]) -> Optional[str]:
         """
-        Carrega dados de Candles do SharePoint.
+        Grava arquivo somente se ele ainda estiver na versão lida (uma gravação, sem exclusão prévia).
         
         Args:
-            sheet_name: Nome da aba (ex: "Candles", "Resumo por Hora")
+            pasta: URL relativa ao servidor da pasta
+            nome_arquivo: Nome do arquivo
+            conteudo: Conteúdo completo
+            versao_esperada: ETag lido (If-Match); None = arquivo não deve existir
             
         Returns:
-            DataFrame com dados ou None se não existir
+            ETag do arquivo gravado
+            
+        Raises:
+            ConflitoVersao: Outra execução gravou o arquivo depois da leitura
         """
+        ctx = self._get_context()
+        caminho_arquivo = f"{pasta}/{nome_arquivo}"
+        
+        if versao_esperada is None:
+            # Criação: falha se outra execução criou o arquivo nesse meio tempo
+            try:
+                arquivo = ctx.web.get_folder_by_server_relative_url(pasta).files.add(
+                    nome_arquivo, conteudo, False
+                ).execute_query()
+            except Exception as e:
+                raise ConflitoVersao(f"{nome_arquivo} não pôde ser criado: {e}") from e
+            versao = arquivo.properties.get("ETag")
+        else:
+            request = RequestOptions(self._url_arquivo(caminho_arquivo))
+            request.method = HttpMethod.Post
+            request.set_header("X-HTTP-Method", "PUT")
+            request.set_header("If-Match", versao_esperada)
+            request.data = conteudo
+            
+            resposta = ctx.pending_request().execute_request_direct(request)
+            if resposta.status_code == 412:
+                raise ConflitoVersao(f"{nome_arquivo} alterado por outra execução (HTTP 412)")
+            resposta.raise_for_status()
+            
+            versao = resposta.headers.get("ETag")
+            if not versao:
+                arquivo = ctx.web.get_file_by_server_relative_url(caminho_arquivo)
+                ctx.load(arquivo, ["ETag"])
+                ctx.execute_query()
+                versao = arquivo.properties.get("ETag")
+        
+        if versao:
+            # Conteúdo enviado já é o da nova versão: próxima leitura não baixa
+            obter_cache_sharepoint().salvar_bytes(caminho_arquivo, versao, conteudo)
+        return versao
+    
+    def _versao_abandonada(self, caminho_arquivo: str) -> Optional[str]:
+        """
+        ETag atual do arquivo se a gravação que o alterou não será confirmada por outra execução:
+        gravação própria deste processo ou mais antiga que PRAZO_GRAVACAO_ABANDONADA.
+        
+        Returns:
+            ETag atual ou None (arquivo inexistente ou gravação recente de outra execução)
+        """
+        ctx = self._get_context()
+        arquivo = ctx.web.get_file_by_server_relative_url(caminho_arquivo)
         try:
-            ctx = self._get_context()
-            caminho_arquivo = f"{self.reports_path}/{self.reports_file}"
-            
-            # Baixa arquivo (método correto Office365)
-            arquivo = ctx.web.get_file_by_server_relative_url(caminho_arquivo)
-            
-            # Cria buffer para receber o download
-            download_buffer = BytesIO()
-            arquivo.download_session(download_buffer).execute_query()
+            ctx.load(arquivo, ["ETag", "TimeLastModified"])
             ctx.execute_query()
+        except Exception as e:
+            if self._nao_encontrado(e):
+                return None
+            raise
+        
+        versao = arquivo.properties.get("ETag")
+        if versao and _VERSOES_PENDENTES.get(caminho_arquivo) == versao:
+            return versao
+        
+        modificado = arquivo.properties.get("TimeLastModified")
+        if isinstance(modificado, str):
+            modificado = datetime.fromisoformat(modificado.replace("Z", "+00:00"))
+        if modificado is None:
+            return None
+        if modificado.tzinfo is None:
+            modificado = modificado.replace(tzinfo=timezone.utc)
+        
+        return versao if datetime.now(timezone.utc) - modificado > PRAZO_GRAVACAO_ABANDONADA else None
+    
+    def _enviar_particao(self, pasta: str, nome_arquivo: str, conteudo: bytes,
+                         versao_esperada: Optional[str]) -> Optional[str]:
+        """
+        Grava arquivo de partição condicionado à versão do manifesto.
+        Gravação não confirmada no manifesto (execução interrompida ou tentativa anterior
+        deste processo) é substituída; gravação recente de outra execução é conflito.
+        
+        Returns:
+            ETag do arquivo gravado
+        """
+        caminho_arquivo = f"{pasta}/{nome_arquivo}"
+        try:
+            versao = self._gravar_se_versao(pasta, nome_arquivo, conteudo, versao_esperada)
+        except ConflitoVersao:
+            versao_atual = self._versao_abandonada(caminho_arquivo)
+            if versao_atual is None:
+                raise
+            
+            print(f"♻️ {nome_arquivo}: gravação não confirmada no manifesto substituída")
+            versao = self._gravar_se_versao(pasta, nome_arquivo, conteudo, versao_atual)
+        
+        _VERSOES_PENDENTES[caminho_arquivo] = versao
+        return versao
+    
+    def _baixar_arquivo_reports(self) -> Tuple[BytesIO, Optional[str]]:
+        """
+        Baixa arquivo monolítico de reports do SharePoint.
+        
+        Returns:
+            Tuple com (buffer do arquivo, ETag); exceção se não existir
+        """
+        ctx = self._get_context()
+        caminho_arquivo = f"{self.reports_path}/{self.reports_file}"
+        
+        # Baixa arquivo (método correto Office365)
+        arquivo = ctx.web.get_file_by_server_relative_url(caminho_arquivo)
+        
+        # Cria buffer para receber o download
+        download_buffer = BytesIO()
+        arquivo.download_session(download_buffer).execute_query()
+        ctx.load(arquivo, ["ETag"])
+        ctx.execute_query()
+        
+        # Volta para o início do buffer
+        download_buffer.seek(0)
+        return download_buffer, arquivo.properties.get("ETag")
+    
+    @staticmethod
+    def _tipar_datas(sheet_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte colunas de data da aba (Resumo: date; Candles/Resumo por Hora: datetime)."""
+        if sheet_name == "Resumo" and "Data" in df.columns:
+            df["Data"] = pd.to_datetime(df["Data"], errors="coerce").dt.date
+        elif sheet_name == "Candles" and "Data Evento" in df.columns:
+            df["Data Evento"] = pd.to_datetime(df["Data Evento"], errors="coerce")
+        elif sheet_name == "Resumo por Hora" and "Hora" in df.columns:
+            df["Hora"] = pd.to_datetime(df["Hora"], errors="coerce")
+        return df
+    
+    def carregar_workbook_reports(self) -> WorkbookReports:
+        """
+        Baixa o arquivo monolítico de reports uma vez e lê todas as abas em uma única chamada.
+        
+        Returns:
+            WorkbookReports com as abas presentes (vazio se o arquivo não existir)
+        """
+        try:
+            buffer, versao = self._baixar_arquivo_reports()
             
-            # Volta para o início do buffer
-            download_buffer.seek(0)
-            
-            # Carrega aba específica
-            df = pd.read_excel(download_buffer, sheet_name=sheet_name, engine="openpyxl")
-            
-            # Converte colunas de data
-            if sheet_name == "Candles" and "Data Evento" in df.columns:
-                df["Data Evento"] = pd.to_datetime(df["Data Evento"], errors="coerce")
-            elif sheet_name == "Resumo por Hora" and "Hora" in df.columns:
-                df["Hora"] = pd.to_datetime(df["Hora"], errors="coerce")
-            
-            print(f"✅ {sheet_name} carregado: {len(df)} registros")
-            return df
+            with pd.ExcelFile(buffer, engine="openpyxl") as arquivo:
+                presentes = [aba for aba in ABAS_REPORTS if aba in arquivo.sheet_names]
+                abas = pd.read_excel(arquivo, sheet_name=presentes)
             
         except Exception as e:
-            print(f"⚠️ {sheet_name} não encontrado: {e}")
-            return pd.DataFrame()
+            print(f"⚠️ Arquivo reports não encontrado no SharePoint: {e}")
+            return WorkbookReports({}, existe=False)
+        
+        for nome, df in abas.items():
+            self._tipar_datas(nome, df)
+        
+        print(f"✅ Reports carregado: {', '.join(f'{nome} {len(df)}' for nome, df in abas.items())} registros")
+        return WorkbookReports(abas, versao=versao)
+    
+    # ------------------------------------------------------------------
+    # Partições
+    # ------------------------------------------------------------------
     
-    def salvar_arquivo_reports(self, df_resumo: pd.DataFrame, 
-                              df_candles: Optional[pd.DataFrame] = None,
-                              df_resumo_hora: Optional[pd.DataFrame] = None) -> bool:
+    @staticmethod
+    def _chave_particao(unidade: str, ano: int, mes: int, sheet_name: str) -> str:
+        """Chave da partição no manifesto (também caminho relativo sem extensão)."""
+        return f"{unidade}/{ano:04d}-{mes:02d}/{sheet_name.replace(' ', '_')}"
+    
+    def carregar_manifesto(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Baixa o manifesto das partições.
+        
+        Returns:
+            Entradas por chave de partição (vazio se ainda não existir); exceção em erro de leitura
+        """
+        # ETag do conteúdo lido: a gravação seguinte só é aceita se o manifesto ainda estiver nele
+        baixado = self._baixar(f"{self.particoes_path}/{self.manifesto_file}")
+        if baixado is None:
+            self.manifesto, self.versao_manifesto = {}, None
+            return self.manifesto
+        
+        buffer, versao = baixado
+        if versao is None:
+            raise ConflitoVersao("Manifesto alterado durante a leitura")
+        
+        self.manifesto = json.load(buffer)["particoes"]
+        self.versao_manifesto = versao
+        return self.manifesto
+    
+    def _salvar_manifesto(self, manifesto: Dict[str, Dict[str, Any]], versao_lida: Optional[str]) -> None:
         """
-        Salva arquivo completo de reports no SharePoint.
+        Grava o manifesto se ele não mudou desde a leitura (exceção em caso de erro).
         
         Args:
-            df_resumo: DataFrame da aba Resumo
-            df_candles: DataFrame da aba Candles (opcional)
-            df_resumo_hora: DataFrame da aba Resumo por Hora (opcional)
+            manifesto: Conteúdo novo
+            versao_lida: ETag do manifesto lido (If-Match); None = manifesto ainda não existia
             
+        Raises:
+            ConflitoVersao: Outra execução gravou o manifesto depois da leitura
+        """
+        self._garantir_pasta(self.particoes_path)
+        conteudo = json.dumps({"particoes": manifesto}, ensure_ascii=False, indent=1, sort_keys=True).encode("utf-8")
+        
+        versao = self._gravar_se_versao(self.particoes_path, self.manifesto_file, conteudo, versao_lida)
+        self.manifesto = manifesto
+        self.versao_manifesto = versao
+        
+        # Partições referenciadas pelo manifesto gravado deixam de ser pendentes
+        confirmadas = {
+            versao_particao for entrada in manifesto.values()
+            for versao_particao in (entrada["versao"], entrada.get("versao_parquet")) if versao_particao
+        }
+        for caminho_arquivo, versao_particao in list(_VERSOES_PENDENTES.items()):
+            if versao_particao in confirmadas:
+                del _VERSOES_PENDENTES[caminho_arquivo]
+    
+    def _atualizar_manifesto(self, atualizar: Callable[[Dict[str, Dict[str, Any]]], bool]) -> bool:
+        """
+        Leitura-modificação-escrita do manifesto, refeita se outra execução gravou no meio
+        (partição ou manifesto alterados desde a leitura).
+        
+        Args:
+            atualizar: Recebe cópia do manifesto lido, grava as partições e altera as entradas;
+                retorna True se o manifesto precisa ser gravado
+                
         Returns:
-            True se salvo com sucesso
+            True se o manifesto foi gravado
         """
-        try:
-            # Cria pasta se necessário
-            if not self._criar_pasta_reports():
-                return False
-            
-            # Cria Excel em memória
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-                # Aba principal
-                df_resumo.to_excel(writer, sheet_name="Resumo", index=False)
+        for tentativa in range(1, TENTATIVAS_MANIFESTO + 1):
+            try:
+                manifesto = dict(self.carregar_manifesto())
+                versao_lida = self.versao_manifesto
                 
-                # Abas opcionais
-                if df_candles is not None and not df_candles.empty:
-                    df_candles.to_excel(writer, sheet_name="Candles", index=False)
+                if not atualizar(manifesto):
+                    return False
                 
-                if df_resumo_hora is not None and not df_resumo_hora.empty:
-                    df_resumo_hora.to_excel(writer, sheet_name="Resumo por Hora", index=False)
-            
-            # Aplica formatação de tabelas
-            buffer.seek(0)
-            buffer_formatado = self._aplicar_formatacao_tabelas(buffer)
-            
-            # Upload para SharePoint
-            ctx = self._get_context()
-            caminho_arquivo = f"{self.reports_path}/{self.reports_file}"
-            
-            # Remove arquivo antigo
-            try:
-                arquivo_antigo = ctx.web.get_file_by_server_relative_url(caminho_arquivo)
-                arquivo_antigo.delete_object()
-                ctx.execute_query()
-            except:
-                pass  # Arquivo não existe, ok
-            
-            # Upload novo arquivo
-            pasta_reports = ctx.web.get_folder_by_server_relative_url(self.reports_path)
-            pasta_reports.upload_file(self.reports_file, buffer_formatado.read()).execute_query()
+                self._salvar_manifesto(manifesto, versao_lida)
+                return True
+            except ConflitoVersao as e:
+                if tentativa == TENTATIVAS_MANIFESTO:
+                    raise
+                print(f"🔁 {e}; refazendo atualização ({tentativa}/{TENTATIVAS_MANIFESTO})")
+                time.sleep(tentativa)
+    
+    def _ler_particao(self, entrada: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Lê partição do manifesto (read-through: baixa apenas se a versão mudou).
+        
+        Returns:
+            DataFrame com datas tipadas; não deve ser alterado in-place
+        """
+        chave = entrada["chave"]
+        em_cache = self._cache_particoes.get(chave)
+        if em_cache is not None and em_cache[0] == entrada["versao"]:
+            return em_cache[1]
+        
+        formato = "parquet" if entrada.get("parquet") and PARQUET_DISPONIVEL else "xlsx"
+        caminho_arquivo = f"{self.particoes_path}/{chave}.{formato}"
+        
+        # Aba já lida em execução anterior (mesma versão): sem download nem openpyxl;
+        # na falha, _baixar consulta os bytes e conta a consulta
+        cache = obter_cache_sharepoint()
+        df = cache.obter_tabela(caminho_arquivo, entrada["versao"], contar_falha=False) if entrada["versao"] else None
+        
+        versao = entrada["versao"]
+        if df is None:
+            baixado = self._baixar(caminho_arquivo, entrada["versao"])
+            if baixado is None:
+                raise FileNotFoundError(f"Partição {chave}.{formato} listada no manifesto não existe")
+            
+            buffer, versao = baixado
+            if versao != entrada["versao"]:
+                print(f"⚠️ Partição {chave} difere da versão do manifesto (gravação não confirmada)")
+            
+            if formato == "parquet":
+                df = pd.read_parquet(buffer)
+            else:
+                df = self._tipar_datas(entrada["aba"], pd.read_excel(buffer, engine="openpyxl"))
             
-            print(f"✅ Reports salvo no SharePoint: {self.reports_file}")
-            return True
+            if versao:
+                cache.salvar_tabela(caminho_arquivo, versao, df)
+        
+        self._cache_particoes[chave] = (versao, df)
+        return df
+    
+    def _gravar_particao(self, manifesto: Dict[str, Dict[str, Any]], unidade: str, ano: int, mes: int,
+                         sheet_name: str, df: pd.DataFrame) -> bool:
+        """
+        Grava partição se o conteúdo mudou e atualiza a entrada no manifesto (em memória).
+        O arquivo só é sobrescrito se ainda estiver na versão registrada no manifesto lido.
+        
+        Returns:
+            True se a partição foi enviada; False se o conteúdo já era o mesmo
             
-        except Exception as e:
-            print(f"❌ Erro ao salvar reports: {e}")
+        Raises:
+            ConflitoVersao: Partição gravada por outra execução depois da leitura do manifesto
+        """
+        chave = self._chave_particao(unidade, ano, mes, sheet_name)
+        hash_novo = hash_conteudo(df)
+        
+        entrada = manifesto.get(chave)
+        if entrada is not None and entrada["hash"] == hash_novo:
             return False
+        
+        pasta, nome = f"{self.particoes_path}/{chave}".rsplit("/", 1)
+        self._garantir_pasta(pasta)
+        
+        buffer = escrever_excel_tabelas(
+            [(sheet_name, df, f"Tabela_{sheet_name.replace(' ', '_')}")],
+            estilo="TableStyleMedium9"
+        )
+        versao = self._enviar_particao(
+            pasta, f"{nome}.xlsx", buffer.getvalue(), entrada["versao"] if entrada else None
+        )
+        
+        parquet, versao_parquet = False, None
+        if GRAVAR_PARQUET:
+            try:
+                buffer_parquet = BytesIO()
+                df.to_parquet(buffer_parquet, index=False)
+                versao_parquet = self._enviar_particao(
+                    pasta, f"{nome}.parquet", buffer_parquet.getvalue(),
+                    entrada.get("versao_parquet") if entrada else None
+                )
+                parquet = True
+            except ConflitoVersao:
+                raise
+            except Exception as e:
+                print(f"⚠️ Parquet não gravado para {chave} (apenas XLSX): {e}")
+        
+        manifesto[chave] = {
+            "chave": chave,
+            "unidade": unidade,
+            "ano": ano,
+            "mes": mes,
+            "aba": sheet_name,
+            "linhas": len(df),
+            "hash": hash_novo,
+            "versao": versao,
+            "parquet": parquet,
+            "versao_parquet": versao_parquet,
+            "atualizado": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._cache_particoes[chave] = (versao, df)
+        return True
     
-    def _aplicar_formatacao_tabelas(self, buffer: BytesIO) -> BytesIO:
-        """Aplica formatação de tabelas ao Excel."""
-        try:
-            buffer.seek(0)
-            wb = load_workbook(buffer)
-            
-            for aba_nome in wb.sheetnames:
-                ws = wb[aba_nome]
-                max_col = ws.max_column
-                max_row = ws.max_row
-                
-                if max_row > 1 and max_col > 0:
-                    # Calcula referência da tabela
-                    col_letter_end = chr(ord('A') + max_col - 1)
-                    ref = f"A1:{col_letter_end}{max_row}"
-                    nome_tabela = f"Tabela_{aba_nome.replace(' ', '_')}"
-                    
-                    # Verifica se tabela já existe
-                    tabelas_existentes = [t.displayName for t in ws.tables.values()]
-                    if nome_tabela not in tabelas_existentes:
-                        table = Table(displayName=nome_tabela, ref=ref)
-                        style = TableStyleInfo(
-                            name="TableStyleMedium9",
-                            showFirstColumn=False,
-                            showLastColumn=False,
-                            showRowStripes=True,
-                            showColumnStripes=False
-                        )
-                        table.tableStyleInfo = style
-                        ws.add_table(table)
-            
-            # Salva resultado
-            buffer_resultado = BytesIO()
-            wb.save(buffer_resultado)
-            buffer_resultado.seek(0)
-            return buffer_resultado
+    def carregar_particoes(self, unidade: str, sheet_name: str, desde: Optional[datetime.date] = None,
+                           reler_manifesto: bool = True) -> pd.DataFrame:
+        """
+        Carrega uma aba da unidade a partir das partições mensais.
+        
+        Args:
+            unidade: Nome da unidade
+            sheet_name: Nome da aba (ex: "Candles", "Resumo por Hora")
+            desde: Primeira data necessária (apenas partições do mês dela em diante); None = todas
+            reler_manifesto: False usa o último manifesto conhecido (sem consulta ao SharePoint)
             
+        Returns:
+            DataFrame com dados (vazio se não houver partições)
+        """
+        try:
+            if reler_manifesto or self.manifesto is None:
+                self.carregar_manifesto()
         except Exception as e:
-            print(f"⚠️ Erro na formatação, usando arquivo sem formatação: {e}")
-            buffer.seek(0)
-            return buffer
+            print(f"⚠️ Manifesto de reports indisponível: {e}")
+            if self.manifesto is None:
+                return pd.DataFrame()
+        
+        entradas = sorted(
+            (entrada for entrada in self.manifesto.values()
+             if entrada["unidade"] == unidade and entrada["aba"] == sheet_name
+             and (desde is None or (entrada["ano"], entrada["mes"]) >= (desde.year, desde.month))),
+            key=lambda entrada: (entrada["ano"], entrada["mes"])
+        )
+        
+        partes = []
+        for entrada in entradas:
+            try:
+                partes.append(self._ler_particao(entrada))
+            except Exception as e:
+                print(f"⚠️ Erro ao ler partição {entrada['chave']}: {e}")
+        
+        if not partes:
+            return pd.DataFrame()
+        
+        return pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
     
     def atualizar_resumo_diario(self, unidade: str, data: datetime.date, 
                                tpv_ac: float, dm_valor: float, total_veiculos: int) -> bool:
         """
-        Atualiza resumo diário no arquivo reports.
+        Atualiza resumo diário na partição Resumo da unidade/mês.
         
         Args:
             unidade: Nome da unidade
@@ -254,43 +638,51 @@ class SharePointReportsManager:
         Returns:
             True se atualizado com sucesso
         """
-        try:
-            # Carrega dados existentes
-            df_existente = self.carregar_arquivo_reports()
-            
-            # Calcula DM percentual
-            dm_percentual = 100 * (total_veiculos * 24 - dm_valor - 24 * 3) / (total_veiculos * 24)
-            
-            # Nova linha
-            nova_linha = pd.DataFrame([{
-                'Data': data,
-                'TPV AC': tpv_ac / 24,  # Normaliza TPV
-                'DM RRP': dm_percentual,
-                'Unidade': unidade
-            }])
+        # Calcula DM percentual
+        dm_percentual = 100 * (total_veiculos * 24 - dm_valor - 24 * 3) / (total_veiculos * 24)
+        
+        # Nova linha
+        nova_linha = pd.DataFrame([{
+            'Data': data,
+            'TPV AC': tpv_ac / 24,  # Normaliza TPV
+            'DM RRP': dm_percentual,
+            'Unidade': unidade
+        }])
+        
+        def atualizar(manifesto: Dict[str, Dict[str, Any]]) -> bool:
+            entrada = manifesto.get(self._chave_particao(unidade, data.year, data.month, "Resumo"))
+            df_existente = self._ler_particao(entrada) if entrada is not None else None
             
-            if df_existente is not None:
+            if df_existente is not None and not df_existente.empty:
                 # Verifica se data já existe
                 if data in df_existente['Data'].values:
                     print(f"⚠️ Data {data} já existe no arquivo reports")
-                    return True
+                    return False
                 
                 df_resultado = pd.concat([df_existente, nova_linha], ignore_index=True)
             else:
                 df_resultado = nova_linha
             
-            # Salva arquivo
-            return self.salvar_arquivo_reports(df_resultado)
+            return self._gravar_particao(manifesto, unidade, data.year, data.month, "Resumo", df_resultado)
+        
+        _LOCK_ARQUIVO_REPORTS.acquire()
+        try:
+            if self._atualizar_manifesto(atualizar):
+                print(f"✅ Resumo diário salvo no SharePoint: {unidade} {data}")
+            return True
             
         except Exception as e:
             print(f"❌ Erro ao atualizar resumo diário: {e}")
             return False
+        
+        finally:
+            _LOCK_ARQUIVO_REPORTS.release()
     
     def atualizar_candles(self, df_eventos_novos: pd.DataFrame, 
                          df_resumo_novos: pd.DataFrame, poi: str, 
-                         mes: int, ano: int) -> bool:
+                         mes: int, ano: int, unidade: Optional[str] = None) -> bool:
         """
-        Atualiza dados de Candles no SharePoint.
+        Atualiza dados de Candles de um POI no SharePoint.
         
         Args:
             df_eventos_novos: Novos eventos de entrada/saída
@@ -298,57 +690,173 @@ class SharePointReportsManager:
             poi: POI dos dados
             mes: Mês de referência
             ano: Ano de referência
+            unidade: Unidade do POI (partição unidade/mês); padrão: unidade do gerenciador
             
         Returns:
             True se atualizado com sucesso
         """
-        try:
-            # Carrega dados existentes
-            df_candles_existente = self.carregar_candles_sharepoint("Candles")
-            df_resumo_existente = self.carregar_candles_sharepoint("Resumo por Hora")
-            df_resumo_geral = self.carregar_arquivo_reports()
+        unidade = unidade or self.unidade
+        if unidade is None:
+            print(f"❌ Unidade não informada para os Candles de {poi} (gerenciador sem unidade padrão)")
+            return False
+        
+        return self.atualizar_candles_lote({unidade: (df_eventos_novos, df_resumo_novos)}, mes, ano, pois=[poi])
+    
+    def atualizar_candles_lote(self, candles_por_unidade: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]],
+                               mes: int, ano: int, pois: Optional[List[str]] = None) -> bool:
+        """
+        Atualiza Candles de vários POIs (de uma ou mais unidades) com uma gravação do manifesto.
+        Só as partições unidade/mês/aba cujo conteúdo mudou são enviadas.
+        
+        Args:
+            candles_por_unidade: {unidade: (eventos de entrada/saída, resumo por hora)} com coluna POI
+            mes: Mês de referência
+            ano: Ano de referência
+            pois: POIs cujos dados do mês são substituídos (padrão: POIs dos eventos de cada unidade)
             
-            # Remove dados antigos do mesmo POI/mês/ano
-            if not df_candles_existente.empty:
-                df_candles_existente = df_candles_existente[
-                    ~((df_candles_existente['Data Evento'].dt.month == mes) &
-                      (df_candles_existente['Data Evento'].dt.year == ano) &
-                      (df_candles_existente['POI'] == poi))
-                ]
-                df_candles_final = pd.concat([df_candles_existente, df_eventos_novos], ignore_index=True)
-            else:
-                df_candles_final = df_eventos_novos
+        Returns:
+            True se atualizado com sucesso
+        """
+        candles_por_unidade = {
+            unidade: candles for unidade, candles in candles_por_unidade.items() if not candles[0].empty
+        }
+        if not candles_por_unidade:
+            return True
+        
+        enviadas = 0
+        
+        def atualizar(manifesto: Dict[str, Dict[str, Any]]) -> bool:
+            nonlocal enviadas
+            enviadas = 0
             
-            if not df_resumo_existente.empty:
-                df_resumo_existente = df_resumo_existente[
-                    ~((df_resumo_existente['Hora'].dt.month == mes) &
-                      (df_resumo_existente['Hora'].dt.year == ano) &
-                      (df_resumo_existente['POI'] == poi))
-                ]
-                df_resumo_hora_final = pd.concat([df_resumo_existente, df_resumo_novos], ignore_index=True)
-            else:
-                df_resumo_hora_final = df_resumo_novos
+            for unidade, (df_eventos_novos, df_resumo_novos) in candles_por_unidade.items():
+                pois_unidade = pois if pois is not None else df_eventos_novos['POI'].unique().tolist()
+                
+                for sheet_name, df_novos in (("Candles", df_eventos_novos), ("Resumo por Hora", df_resumo_novos)):
+                    for ano_particao, mes_particao, df_particao in self._montar_particoes(
+                        manifesto, unidade, sheet_name, df_novos, pois_unidade, mes, ano
+                    ):
+                        enviadas += self._gravar_particao(
+                            manifesto, unidade, ano_particao, mes_particao, sheet_name, df_particao
+                        )
             
-            # Usa DataFrame de resumo existente ou cria vazio
-            if df_resumo_geral is None:
-                df_resumo_geral = pd.DataFrame()
+            return enviadas > 0
+        
+        _LOCK_ARQUIVO_REPORTS.acquire()
+        try:
+            self._atualizar_manifesto(atualizar)
+            print(f"✅ Candles salvos no SharePoint: {enviadas} partição(ões) alterada(s)")
+            return True
             
-            # Salva arquivo completo
-            return self.salvar_arquivo_reports(
-                df_resumo=df_resumo_geral,
-                df_candles=df_candles_final,
-                df_resumo_hora=df_resumo_hora_final
+        except Exception as e:
+            print(f"❌ Erro ao atualizar candles: {e}")
+            return False
+        
+        finally:
+            _LOCK_ARQUIVO_REPORTS.release()
+    
+    def _montar_particoes(self, manifesto: Dict[str, Dict[str, Any]], unidade: str, sheet_name: str,
+                          df_novos: pd.DataFrame, pois: List[str], mes: int, ano: int):
+        """
+        Conteúdo novo das partições mensais da aba tocadas pela atualização
+        (mês de referência + meses das linhas novas).
+        
+        Yields:
+            Tuples (ano, mês, DataFrame da partição) para partições não vazias
+        """
+        coluna_data = COLUNA_DATA_ABA[sheet_name]
+        datas = pd.to_datetime(df_novos[coluna_data]) if not df_novos.empty else pd.Series(dtype="datetime64[ns]")
+        
+        meses = {(ano, mes)} | set(zip(datas.dt.year, datas.dt.month))
+        for ano_particao, mes_particao in sorted(meses):
+            entrada = manifesto.get(self._chave_particao(unidade, ano_particao, mes_particao, sheet_name))
+            df_existente = self._ler_particao(entrada) if entrada is not None else pd.DataFrame()
+            
+            df_particao = self._substituir_periodo(
+                df_existente,
+                df_novos[(datas.dt.year == ano_particao) & (datas.dt.month == mes_particao)],
+                coluna_data, pois, mes, ano
             )
             
+            if not df_particao.empty:
+                yield ano_particao, mes_particao, df_particao
+    
+    @staticmethod
+    def _substituir_periodo(df_existente: pd.DataFrame, df_novos: pd.DataFrame, coluna_data: str,
+                            pois: List[str], mes: int, ano: int) -> pd.DataFrame:
+        """Remove linhas existentes dos POIs no mês/ano e acrescenta as novas."""
+        if df_existente.empty:
+            return df_novos
+        
+        df_existente = df_existente[
+            ~((df_existente[coluna_data].dt.month == mes) &
+              (df_existente[coluna_data].dt.year == ano) &
+              (df_existente['POI'].isin(pois)))
+        ]
+        return pd.concat([df_existente, df_novos], ignore_index=True)
+    
+    def migrar_arquivo_reports(self, unidade_por_poi: Dict[str, str]) -> bool:
+        """
+        Copia o arquivo monolítico base_dados_reports.xlsx para as partições (execução única).
+        O arquivo original não é removido.
+        
+        Args:
+            unidade_por_poi: Unidade de cada POI (Candles/Resumo por Hora não têm coluna Unidade)
+            
+        Returns:
+            True se migrado com sucesso
+        """
+        workbook = self.carregar_workbook_reports()
+        if not workbook.existe:
+            return False
+        
+        enviadas = 0
+        
+        def atualizar(manifesto: Dict[str, Dict[str, Any]]) -> bool:
+            nonlocal enviadas
+            enviadas = 0
+            
+            for sheet_name in ABAS_REPORTS:
+                df = workbook.aba(sheet_name)
+                if df.empty:
+                    continue
+                
+                coluna_data = COLUNA_DATA_ABA[sheet_name]
+                datas = pd.to_datetime(df[coluna_data])
+                unidades = df["Unidade"] if sheet_name == "Resumo" else df["POI"].map(unidade_por_poi)
+                
+                sem_unidade = unidades.isna() | datas.isna()
+                if sem_unidade.any():
+                    print(f"⚠️ {sheet_name}: {sem_unidade.sum()} linhas sem unidade/data não migradas")
+                
+                validas = ~sem_unidade
+                for (unidade, ano, mes), df_particao in df[validas].groupby(
+                    [unidades[validas], datas[validas].dt.year, datas[validas].dt.month]
+                ):
+                    enviadas += self._gravar_particao(
+                        manifesto, unidade, int(ano), int(mes), sheet_name, df_particao.reset_index(drop=True)
+                    )
+            
+            return True
+        
+        _LOCK_ARQUIVO_REPORTS.acquire()
+        try:
+            self._atualizar_manifesto(atualizar)
+            print(f"✅ Reports migrado para partições: {enviadas} partição(ões)")
+            return True
+            
         except Exception as e:
-            print(f"❌ Erro ao atualizar candles: {e}")
+            print(f"❌ Erro ao migrar reports: {e}")
             return False
+        
+        finally:
+            _LOCK_ARQUIVO_REPORTS.release()
 
 
 # Factory function
-def criar_reports_manager(site_url: str = None, username: str = None, password: str = None) -> SharePointReportsManager:
+def criar_reports_manager(site_url: str = None, username: str = None, password: str = None,
+                          unidade: str = None) -> SharePointReportsManager:
     """Cria gerenciador de reports com configurações padrão."""
-    import os
     from config.settings import ConstantesEspecificas
     
     if site_url is None:
@@ -360,4 +868,22 @@ def criar_reports_manager(site_url: str = None, username: str = None, password:
     if password is None:
         password = os.getenv("SP_PASSWORD")
     
-    return SharePointReportsManager(site_url, username, password)
\ No newline at end of file
+    return SharePointReportsManager(site_url, username, password, unidade)
+
+
+if __name__ == "__main__":
+    # Migração única: python -m core.reports_sharepoint
+    from config.settings import carregar_config
+    
+    config = carregar_config()
+    unidade_por_poi = {
+        poi["ponto_interesse"]: unidade
+        for unidade, pois in config["pois_por_unidade"].items()
+        for poi in pois
+    }
+    
+    manager = criar_reports_manager(
+        username=config["credenciais"]["sp_user"],
+        password=config["credenciais"]["sp_password"]
+    )
+    manager.migrar_arquivo_reports(unidade_por_poi)
@@ -5,6 +5,7 @@ VERSÃO CORRIGIDA: Funciona tanto local quanto Cloud Run com validações robust
 """
 
 import os
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -23,24 +24,31 @@ class FrotalogScraper:
     CORRIGIDO: Funciona local + Cloud Run sem problemas.
     """
     
-    def __init__(self, chrome_driver_path: str, download_timeout: int = 300):
+    def __init__(self, chrome_driver_path: str, download_timeout: int = 300, pasta_download: str = None,
+                 cancelamento: threading.Event = None):
         """
         Inicializa o scraper.
         
         Args:
             chrome_driver_path: Caminho para chromedriver.exe (ignorado no Cloud Run)
             download_timeout: Timeout em segundos para download
+            pasta_download: Pasta exclusiva de downloads (execução paralela: uma por unidade)
+            cancelamento: Evento que interrompe o download (timeout da unidade); ver cancelar()
         """
         self.chrome_driver_path = chrome_driver_path  # Mantém para compatibilidade
         self.download_timeout = download_timeout
+        self.cancelamento = cancelamento or threading.Event()
+        self._driver = None
         
         # Detecta ambiente
         self.is_cloud_run = os.getenv("K_SERVICE") is not None
         
         # Pasta de downloads
         import tempfile
-        self.pasta_download = Path(tempfile.gettempdir()) / "c09_downloads"
-        self.pasta_download.mkdir(exist_ok=True)
+        if pasta_download is None:
+            pasta_download = Path(tempfile.gettempdir()) / "c09_downloads"
+        self.pasta_download = Path(pasta_download)
+        self.pasta_download.mkdir(parents=True, exist_ok=True)
         
         if self.is_cloud_run:
             print(f"🌐 CLOUD RUN detectado - Downloads: {self.pasta_download}")
@@ -133,6 +141,24 @@ class FrotalogScraper:
         
         return options
     
+    def cancelar(self) -> None:
+        """
+        Interrompe o download em andamento (chamado por outra thread no timeout da unidade).
+        Fecha o Chrome, o que faz o comando Selenium pendente falhar, e encerra as esperas.
+        """
+        self.cancelamento.set()
+        driver = self._driver
+        if driver:
+            try:
+                driver.quit()
+            except:
+                pass
+    
+    def _aguardar(self, segundos: float) -> None:
+        """Pausa entre verificações; interrompida se o download for cancelado."""
+        if self.cancelamento.wait(segundos):
+            raise TimeoutException("Download cancelado (timeout da unidade)")
+    
     def _verificar_driver_ativo(self, driver) -> bool:
         """Verifica se driver ainda está ativo."""
         try:
@@ -316,9 +342,9 @@ class FrotalogScraper:
         # Aguarda relatório aparecer na lista
         max_tentativas = 30
         for tentativa in range(1, max_tentativas + 1):
+            self._aguardar(10)  # Aguarda 10s entre tentativas
+            
             try:
-                time.sleep(10)  # Aguarda 10s entre tentativas
-                
                 # Atualiza lista
                 driver.find_element(By.ID, "buttonListReports").click()
                 
@@ -363,7 +389,7 @@ class FrotalogScraper:
                     arquivo_encontrado = arquivo_mais_recente
                     break
             
-            time.sleep(2)
+            self._aguardar(2)
         
         # ===== VALIDAÇÕES CRÍTICAS (ADICIONADAS) =====
         if arquivo_encontrado:
@@ -389,10 +415,14 @@ class FrotalogScraper:
         Download com proteção anti-crash.
         """
         driver = None
+        caminho_arquivo = None
         max_tentativas = 3  # Máximo 3 tentativas
         
         for tentativa in range(1, max_tentativas + 1):
             try:
+                if self.cancelamento.is_set():
+                    raise TimeoutException("Download cancelado (timeout da unidade)")
+                
                 print(f"🚀 Tentativa {tentativa}/{max_tentativas} - Download C09: {empresa_frotalog}")
                 
                 # Criar novo driver a cada tentativa
@@ -402,16 +432,20 @@ class FrotalogScraper:
                     except:
                         pass
                 
-                driver = self._create_webdriver()
+                driver = self._driver = self._create_webdriver()
+                if self.cancelamento.is_set():  # cancelar() chamado enquanto o Chrome abria
+                    raise TimeoutException("Download cancelado (timeout da unidade)")
                 
                 # Configurar timeouts mais conservadores
                 if self.is_cloud_run:
                     wait = WebDriverWait(driver, 10)  # REDUZIDO: 10s
                     driver.set_page_load_timeout(20)  # REDUZIDO: 20s
+                    driver.set_script_timeout(20)
                     print("🔧 Timeouts Cloud Run ultra-conservadores")
                 else:
                     wait = WebDriverWait(driver, 30)
                     driver.set_page_load_timeout(60)
+                    driver.set_script_timeout(60)
                 
                 # Execução com verificação de crash
                 self._fazer_login(driver, wait)
@@ -441,15 +475,18 @@ class FrotalogScraper:
             except Exception as e:
                 print(f"❌ Tentativa {tentativa} falhou: {e}")
                 
-                if tentativa == max_tentativas:
+                if self.cancelamento.is_set():
+                    raise
+                elif tentativa == max_tentativas:
                     print(f"💥 Todas as {max_tentativas} tentativas falharam")
                     raise
                 else:
                     print(f"🔄 Aguardando 10s antes da próxima tentativa...")
-                    time.sleep(10)
+                    self._aguardar(10)
                 
             finally:
-                if driver and tentativa == max_tentativas:
+                # Fecha o Chrome ao terminar (sucesso, última tentativa ou cancelamento): não deixa instância órfã
+                if driver and (caminho_arquivo or tentativa == max_tentativas or self.cancelamento.is_set()):
                     try:
                         driver.quit()
                         print("✅ WebDriver fechado")
@@ -458,7 +495,8 @@ class FrotalogScraper:
 
 
 # Factory function (mantém compatibilidade)
-def criar_scraper(chrome_driver_path: str = None, download_timeout: int = 300) -> FrotalogScraper:
+def criar_scraper(chrome_driver_path: str = None, download_timeout: int = 300,
+                  pasta_download: str = None, cancelamento: threading.Event = None) -> FrotalogScraper:
     """
     Cria instância do scraper com configurações do .env.
     CORRIGIDO: Funciona local + Cloud Run.
@@ -466,4 +504,4 @@ def criar_scraper(chrome_driver_path: str = None, download_timeout: int = 300) -
     if chrome_driver_path is None:
         chrome_driver_path = os.getenv("CHROME_DRIVER_PATH", "")
     
-    return FrotalogScraper(chrome_driver_path, download_timeout)
\ No newline at end of file
+    return FrotalogScraper(chrome_driver_path, download_timeout, pasta_download, cancelamento)
\ No newline at end of file
@@ -0,0 +1,116 @@
+# core/sessao_sharepoint.py
+"""
+Sessões autenticadas do SharePoint compartilhadas pelo processo.
+Uma autenticação (handshake SAML) por site/usuário, reaproveitada por uploader, reports,
+alertas e notificador; renovada antes de expirar. Os contextos de cada thread são clones
+do contexto autenticado: compartilham token e sessão HTTP (pool de conexões).
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from office365.runtime.auth.user_credential import UserCredential
+from office365.sharepoint.client_context import ClientContext
+
+
+# Validade padrão de uma autenticação antes de renová-la
+VALIDADE_MINUTOS = 45
+
+# Instância do processo (compartilhada por todos os módulos)
+_provedor_processo = None
+_LOCK_PROVEDOR = threading.Lock()
+
+
+class ProvedorSessoesSharePoint:
+    """
+    Contextos autenticados por (site, usuário) compartilhados entre threads.
+    ClientContext não é thread-safe (fila de consultas): cada thread recebe um clone,
+    que reaproveita a autenticação e o transporte HTTP do contexto base.
+    """
+
+    def __init__(self, validade_minutos: float = VALIDADE_MINUTOS):
+        """
+        Inicializa provedor de sessões.
+
+        Args:
+            validade_minutos: Idade máxima de uma autenticação antes de renovar
+        """
+        self.validade = validade_minutos * 60
+        self._autenticacoes: Dict[Tuple[str, str], Tuple[ClientContext, float]] = {}
+        self._lock = threading.Lock()
+        self._locais = threading.local()
+
+        # Métricas da execução
+        self.autenticacoes = 0
+        self.tempo_autenticacao = 0.0
+
+    def _autenticar(self, site_url: str, username: str, password: str) -> ClientContext:
+        """Cria contexto base e faz o handshake (primeira requisição autenticada)."""
+        inicio = time.perf_counter()
+
+        ctx = ClientContext(site_url).with_credentials(UserCredential(username, password))
+        ctx.load(ctx.web, ["Id"])
+        ctx.execute_query()
+
+        duracao = time.perf_counter() - inicio
+        self.autenticacoes += 1
+        self.tempo_autenticacao += duracao
+        print(f"🔐 SharePoint autenticado: {site_url} ({duracao:.1f}s)")
+        return ctx
+
+    def obter_contexto(self, site_url: str, username: str, password: str) -> ClientContext:
+        """
+        Contexto autenticado para a thread atual.
+
+        Args:
+            site_url: URL do site SharePoint
+            username: Usuário SharePoint
+            password: Senha SharePoint
+
+        Returns:
+            ClientContext reaproveitado (autenticação renovada se passou da validade)
+        """
+        chave = (site_url, username)
+
+        with self._lock:
+            base, criado_em = self._autenticacoes.get(chave, (None, 0.0))
+            if base is None or time.monotonic() - criado_em > self.validade:
+                base = self._autenticar(site_url, username, password)
+                self._autenticacoes[chave] = (base, time.monotonic())
+
+        # Contexto da thread, clonado de novo quando a autenticação é renovada
+        contextos = self._locais.__dict__.setdefault("contextos", {})
+        ctx, base_ctx = contextos.get(chave, (None, None))
+        if ctx is None or base_ctx is not base:
+            ctx = base.clone(site_url)
+            contextos[chave] = (ctx, base)
+        return ctx
+
+    def resumo(self) -> str:
+        """Linha de log com handshakes de autenticação e tempo total gasto."""
+        return f"🔐 Sessões SharePoint: {self.autenticacoes} autenticações, {self.tempo_autenticacao:.1f}s"
+
+
+# Factory function
+def criar_provedor_sessoes(validade_minutos: float = None) -> ProvedorSessoesSharePoint:
+    """Cria provedor de sessões com configurações padrão."""
+    if validade_minutos is None:
+        validade_minutos = float(os.getenv("C09_SP_SESSAO_MINUTOS", VALIDADE_MINUTOS))
+
+    return ProvedorSessoesSharePoint(validade_minutos)
+
+
+def obter_provedor_sessoes() -> ProvedorSessoesSharePoint:
+    """Provedor de sessões do processo (criado no primeiro uso)."""
+    global _provedor_processo
+    with _LOCK_PROVEDOR:
+        if _provedor_processo is None:
+            _provedor_processo = criar_provedor_sessoes()
+        return _provedor_processo
+
+
+def obter_contexto_sharepoint(site_url: str, username: str, password: str) -> ClientContext:
+    """Contexto autenticado e compartilhado para o site (atalho para o provedor do processo)."""
+    return obter_provedor_sessoes().obter_contexto(site_url, username, password)
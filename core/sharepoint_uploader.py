@@ -4,11 +4,85 @@ Módulo para upload de arquivos no SharePoint.
 Unifica a lógica de upload presente nos scripts RRP/TLS.
 """
 
+import os
+import uuid
+from office365.runtime.queries.service_operation import ServiceOperationQuery
 from office365.sharepoint.client_context import ClientContext
-from office365.runtime.auth.user_credential import UserCredential
+from office365.sharepoint.files.file import File
 from typing import Union
+from io import BytesIO
 from pathlib import Path
 
+from core.pastas_sharepoint import criar_registro_pastas
+from core.sessao_sharepoint import obter_contexto_sharepoint
+
+
+# Acima deste tamanho o envio usa sessão de upload em partes (arquivo lido aos poucos)
+LIMITE_UPLOAD_SIMPLES = 8 * 1024 * 1024
+TAMANHO_PARTE_UPLOAD = 8 * 1024 * 1024
+
+
+def enviar_arquivo(ctx: ClientContext, caminho_pasta: str, nome_arquivo: str,
+                   conteudo: Union[str, bytes]) -> File:
+    """
+    Envia arquivo sobrescrevendo o existente (sem listar ou excluir antes).
+    
+    Args:
+        ctx: Contexto SharePoint
+        caminho_pasta: URL relativa ao servidor da pasta
+        nome_arquivo: Nome do arquivo
+        conteudo: Bytes do arquivo ou caminho de arquivo local
+        
+    Returns:
+        Arquivo gravado (com ETag)
+    """
+    arquivos = ctx.web.get_folder_by_server_relative_url(caminho_pasta).files
+    
+    if isinstance(conteudo, bytes):
+        if len(conteudo) <= LIMITE_UPLOAD_SIMPLES:
+            return arquivos.add(nome_arquivo, conteudo, True).execute_query()
+        return _enviar_em_partes(ctx, caminho_pasta, nome_arquivo, BytesIO(conteudo))
+    
+    if os.path.getsize(conteudo) <= LIMITE_UPLOAD_SIMPLES:
+        with open(conteudo, "rb") as f:
+            return arquivos.add(nome_arquivo, f.read(), True).execute_query()
+    
+    with open(conteudo, "rb") as f:
+        return _enviar_em_partes(ctx, caminho_pasta, nome_arquivo, f)
+
+
+def _enviar_em_partes(ctx: ClientContext, caminho_pasta: str, nome_arquivo: str, fluxo) -> File:
+    """
+    Envia em partes para um nome temporário na mesma pasta e move sobre o destino.
+    
+    A sessão de upload cria o arquivo vazio antes das partes: enviada direto ao destino,
+    deixaria o arquivo publicado vazio (ou truncado, se falhar no meio) durante o envio.
+    """
+    pasta = ctx.web.get_folder_by_server_relative_url(caminho_pasta)
+    # Extensão própria: conectores de pasta (Power BI) que filtram por .xlsx ignoram o temporário
+    nome_temporario = f"{nome_arquivo}.{uuid.uuid4().hex[:8]}.enviando"
+    temporario = ctx.web.get_file_by_server_relative_url(f"{caminho_pasta}/{nome_temporario}")
+    
+    try:
+        pasta.files.create_upload_session(fluxo, TAMANHO_PARTE_UPLOAD, file_name=nome_temporario).execute_query()
+        
+        # moveto com flags=1 (sobrescrever): troca o conteúdo do destino de uma vez
+        ctx.add_query(ServiceOperationQuery(
+            temporario, "moveto", {"newurl": f"{caminho_pasta}/{nome_arquivo}", "flags": 1}
+        ))
+        ctx.execute_query()
+    except Exception:
+        try:
+            temporario.delete_object().execute_query()
+        except Exception:
+            pass
+        raise
+    
+    arquivo = ctx.web.get_file_by_server_relative_url(f"{caminho_pasta}/{nome_arquivo}")
+    ctx.load(arquivo, ["ETag"])
+    ctx.execute_query()
+    return arquivo
+
 
 class SharePointUploader:
     """
@@ -28,19 +102,67 @@ class SharePointUploader:
         self.site_url = site_url
         self.username = username
         self.password = password
-        self._ctx = None
+        self.registro_pastas = criar_registro_pastas()
     
     def _get_context(self) -> ClientContext:
-        """Obtém contexto SharePoint (lazy initialization)."""
-        if self._ctx is None:
-            credentials = UserCredential(self.username, self.password)
-            self._ctx = ClientContext(self.site_url).with_credentials(credentials)
-        return self._ctx
+        """Obtém contexto SharePoint (sessão autenticada compartilhada pelo processo)."""
+        return obter_contexto_sharepoint(self.site_url, self.username, self.password)
+    
+    @staticmethod
+    def _nao_encontrado(erro: Exception) -> bool:
+        """Indica se o erro do SharePoint é 404 (arquivo/pasta inexistente)."""
+        resposta = getattr(erro, "response", None)
+        return getattr(resposta, "status_code", None) == 404
+    
+    @staticmethod
+    def _caminho_relativo(caminho_pasta: str) -> str:
+        """Remove /sites/SITENAME do caminho (ex: /Documentos Compartilhados/...)."""
+        if caminho_pasta.startswith("/sites/"):
+            partes = caminho_pasta.split('/')
+            if len(partes) > 3:
+                return '/' + '/'.join(partes[3:])
+        return caminho_pasta
+    
+    @staticmethod
+    def _raiz_biblioteca(caminho_pasta: str) -> str:
+        """Biblioteca de documentos do caminho (sempre existe no site)."""
+        partes = caminho_pasta.split('/')
+        return '/'.join(partes[:4] if caminho_pasta.startswith("/sites/") else partes[:2])
+    
+    def _descartar_pastas_removidas(self, ctx: ClientContext, caminho_pasta: str) -> None:
+        """
+        Remove do registro a pasta (404 no SharePoint) e as pastas registradas acima dela
+        que também não existem mais, até a mais profunda confirmada no servidor.
+        
+        Args:
+            ctx: Contexto SharePoint
+            caminho_pasta: Pasta que respondeu 404
+        """
+        self.registro_pastas.descartar(self.site_url, caminho_pasta)
+        raiz = self._raiz_biblioteca(caminho_pasta)
+        
+        while True:
+            pai = caminho_pasta.rstrip('/').rsplit('/', 1)[0]
+            ancestral = self.registro_pastas.ancestral_conhecido(self.site_url, pai)
+            if ancestral is None or len(ancestral) <= len(raiz):
+                return
+            
+            try:
+                ctx.web.get_folder_by_server_relative_url(ancestral).get().execute_query()
+                return
+            except Exception as e:
+                if not self._nao_encontrado(e):
+                    return
+            
+            # Descarta a pasta removida e tudo abaixo dela
+            self.registro_pastas.descartar(self.site_url, ancestral)
+            caminho_pasta = ancestral
     
     def _criar_pasta_se_necessario(self, caminho_pasta: str) -> bool:
         """
         Cria pasta no SharePoint se não existir.
-        CORRIGIDO: Usa caminhos relativos corretos.
+        Pastas do registro local não geram requisição; nas demais só o trecho que falta
+        (abaixo da pasta conhecida mais profunda) é criado, em uma única ida ao servidor.
         
         Args:
             caminho_pasta: Caminho da pasta no SharePoint
@@ -48,33 +170,43 @@ class SharePointUploader:
         Returns:
             True se pasta existe ou foi criada com sucesso
         """
+        caminho_pasta = caminho_pasta.rstrip('/')
+        ancestral = self.registro_pastas.ancestral_conhecido(self.site_url, caminho_pasta)
+        if ancestral == caminho_pasta:
+            return True
+        
+        if ancestral is None:
+            ancestral = self._raiz_biblioteca(caminho_pasta)
+        faltantes = caminho_pasta[len(ancestral):].strip('/').split('/')
+        
         try:
             ctx = self._get_context()
-            
-            # Remove site URL do caminho se presente
-            if caminho_pasta.startswith("/sites/"):
-                # Extrai apenas a parte após /sites/SITENAME/
-                partes = caminho_pasta.split('/')
-                if len(partes) > 3:
-                    # Reconstrói caminho relativo: /Documentos Compartilhados/...
-                    caminho_relativo = '/' + '/'.join(partes[3:])
-                else:
-                    caminho_relativo = caminho_pasta
-            else:
-                caminho_relativo = caminho_pasta
-            
-            print(f"🔍 Verificando pasta: {caminho_relativo}")
-            
-            # Tenta acessar a pasta
-            pasta = ctx.web.get_folder_by_server_relative_url(caminho_relativo)
-            ctx.load(pasta)
-            ctx.execute_query()
-            print(f"✅ Pasta já existe: {caminho_relativo}")
-            return True
+        except Exception as e:
+            print(f"❌ Erro ao conectar no SharePoint: {e}")
+            return False
+        
+        try:
+            # Folders.Add devolve a pasta se ela já existir: o lote cria só o que falta
+            pasta = ctx.web.get_folder_by_server_relative_url(ancestral)
+            for parte in faltantes:
+                pasta = pasta.folders.add(parte)
+            ctx.execute_batch()
+            print(f"✅ Pasta garantida: {caminho_pasta}")
             
         except Exception as e:
-            print(f"📁 Pasta não existe, criando: {caminho_relativo}")
-            return self._criar_pasta_recursiva(ctx, caminho_relativo)
+            print(f"📁 Criação em lote falhou ({e}), verificando pasta a pasta: {caminho_pasta}")
+            if self._nao_encontrado(e) and ancestral != self._raiz_biblioteca(caminho_pasta):
+                # Pasta registrada removida no SharePoint
+                self._descartar_pastas_removidas(ctx, ancestral)
+            if not self._criar_pasta_recursiva(ctx, self._caminho_relativo(caminho_pasta)):
+                return False
+        
+        # Registra a pasta e as intermediárias
+        partes = caminho_pasta.split('/')
+        self.registro_pastas.registrar(
+            self.site_url, ('/'.join(partes[:i]) for i in range(len(ancestral.split('/')), len(partes) + 1))
+        )
+        return True
 
     def _criar_pasta_recursiva(self, ctx, caminho_pasta: str) -> bool:
         """
@@ -175,34 +307,6 @@ class SharePointUploader:
             print(f"❌ Método alternativo falhou: {e}")
             return False
     
-    def _excluir_arquivo_antigo(self, caminho_pasta: str, nome_arquivo: str) -> bool:
-        """
-        Exclui arquivo antigo se existir.
-        
-        Args:
-            caminho_pasta: Caminho da pasta no SharePoint
-            nome_arquivo: Nome do arquivo a excluir
-            
-        Returns:
-            True se arquivo foi excluído ou não existia
-        """
-        try:
-            ctx = self._get_context()
-            pasta = ctx.web.get_folder_by_server_relative_url(caminho_pasta)
-            arquivos = pasta.files.get().execute_query()
-            
-            for arquivo in arquivos:
-                if arquivo.name == nome_arquivo:
-                    print(f"Excluindo arquivo antigo: {nome_arquivo}")
-                    arquivo.delete_object()
-            
-            ctx.execute_query()
-            return True
-            
-        except Exception as e:
-            print(f"Erro ao excluir arquivo antigo: {e}")
-            return False
-    
     def upload_arquivo(self, base_sharepoint: str, ano: str, mes: str, 
                       nome_arquivo: str, conteudo: Union[str, bytes], 
                       is_buffer: bool = True) -> bool:
@@ -222,23 +326,25 @@ class SharePointUploader:
                 print("❌ Falha ao criar/acessar pasta")
                 return False
             
-            # 2. Exclui arquivo antigo
-            if not self._excluir_arquivo_antigo(caminho_pasta, nome_arquivo):
-                print("⚠️ Aviso: Não foi possível excluir arquivo antigo")
+            # 2. Faz upload sobrescrevendo o arquivo anterior
+            # (bytes já em memória ou caminho do arquivo em disco, lido em partes se grande)
+            if is_buffer and isinstance(conteudo, str):
+                conteudo = conteudo.encode("utf-8")
             
-            # 3. Prepara conteúdo para upload
-            if is_buffer:
-                # Conteúdo já é bytes
-                dados_upload = conteudo
-            else:
-                # Lê arquivo do disco
-                with open(conteudo, "rb") as f:
-                    dados_upload = f.read()
-            
-            # 4. Faz upload
             ctx = self._get_context()
-            pasta = ctx.web.get_folder_by_server_relative_url(caminho_pasta)
-            pasta.upload_file(nome_arquivo, dados_upload).execute_query()
+            try:
+                enviar_arquivo(ctx, caminho_pasta, nome_arquivo, conteudo)
+            except Exception as e:
+                if not self._nao_encontrado(e):
+                    raise
+                
+                # Pasta removida no SharePoint depois de registrada: recria e tenta de novo
+                print(f"📁 Pasta não encontrada, recriando: {caminho_pasta}")
+                self._descartar_pastas_removidas(ctx, caminho_pasta)
+                if not self._criar_pasta_se_necessario(caminho_pasta):
+                    print("❌ Falha ao criar/acessar pasta")
+                    return False
+                enviar_arquivo(ctx, caminho_pasta, nome_arquivo, conteudo)
             
             print(f"✅ Upload concluído: {nome_arquivo}")
             return True
@@ -263,7 +369,6 @@ class SharePointUploader:
         try:
             # Separa pasta e nome do arquivo
             caminho = Path(caminho_sharepoint_completo)
-            caminho_pasta = str(caminho.parent).replace('\\', '/')
             nome_arquivo = caminho.name
             
             # Usa método principal
@@ -9,16 +9,23 @@ Suporta dois modos de execução:
 import sys
 import os
 import json
+import tempfile
+import threading
+import time
 import traceback
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from pathlib import Path
-from io import BytesIO
 
 # Adiciona diretórios ao path para imports
 sys.path.append(str(Path(__file__).parent))
 
 from core.scraper import criar_scraper
-from core.processor import criar_processor_rrp, criar_processor_tls
+from core.processor import criar_processor_rrp, criar_processor_tls, ResultadoProcessamento
+from core.parse_cache import criar_cache_leitura
+from core.cache_sharepoint import obter_cache_sharepoint
+from core.sessao_sharepoint import obter_provedor_sessoes
 from config.settings import carregar_config, validar_configuracao, ConstantesEspecificas
 
 if os.name == 'nt':
@@ -43,22 +50,34 @@ class C09Orchestrator:
         
         self.credenciais = self.config["credenciais"]
         
+        # Relatório com conteúdo já lido (retry, CANDLES x COMPLETO) não é relido do Excel
+        self.cache_leitura = criar_cache_leitura()
+        
         # Detecta modo de execução
         self.modo_execucao = self._detectar_modo_execucao()
         print(f" Modo de execução: {self.modo_execucao}")
         
-        # Inicializa componentes baseado no modo
+        # Execução paralela: cada unidade usa scraper próprio (pasta de download + Chrome isolados)
+        self.max_unidades_paralelas = int(os.getenv(
+            "C09_MAX_UNIDADES_PARALELAS", ConstantesEspecificas.MAX_UNIDADES_PARALELAS
+        ))
+        self.timeout_unidade = int(os.getenv("C09_TIMEOUT_UNIDADE", ConstantesEspecificas.TIMEOUT_UNIDADE))
+        
+        # Prazo da execução inteira (todas as tentativas), dentro do timeout do app.py
+        self.prazo_execucao = time.monotonic() + int(os.getenv("C09_PRAZO_EXECUCAO", ConstantesEspecificas.PRAZO_EXECUCAO))
+        
+        # Controle da unidade em execução na thread (evento de cancelamento + scraper ativo)
+        self._local = threading.local()
+        
+        # Modo CANDLES: candles gerados por unidade, gravados em lote ao fim do ciclo
+        self.candles_pendentes = {}
+        
         if self.modo_execucao == "CANDLES":
-            # Modo rápido - não precisa de scraper
-            self.scraper = None
             print(" Modo CANDLES - Processamento rápido (4h de dados)")
         else:
-            # Modo completo - inicializa scraper
-            self.scraper = criar_scraper(
-                chrome_driver_path=self.credenciais["chrome_driver_path"],
-                download_timeout=ConstantesEspecificas.DOWNLOAD_TIMEOUT
-            )
             print("🔄 Modo COMPLETO - Processamento completo + alertas")
+        print(f" Até {self.max_unidades_paralelas} unidades em paralelo "
+              f"(timeout {self.timeout_unidade}s por unidade, prazo total {self._tempo_restante():.0f}s)")
         
     def _detectar_modo_execucao(self) -> str:
         """
@@ -130,6 +149,42 @@ class C09Orchestrator:
             from core.processor import C09DataProcessor
             return C09DataProcessor(config_pois)
     
+    def _criar_scraper_unidade(self, unidade: str):
+        """
+        Cria scraper exclusivo da unidade (pasta de download e perfil Chrome próprios).
+        
+        Args:
+            unidade: Nome da unidade
+            
+        Returns:
+            FrotalogScraper isolado para a unidade
+        """
+        controle = getattr(self._local, "controle", None)
+        scraper = criar_scraper(
+            chrome_driver_path=self.credenciais["chrome_driver_path"],
+            download_timeout=ConstantesEspecificas.DOWNLOAD_TIMEOUT,
+            pasta_download=Path(tempfile.gettempdir()) / "c09_downloads" / unidade,
+            cancelamento=controle["cancelamento"] if controle else None
+        )
+        
+        # Registrado para o timeout da unidade poder fechar o Chrome (ver _executar_unidades)
+        if controle:
+            controle["scraper"] = scraper
+        return scraper
+    
+    def _tempo_restante(self) -> float:
+        """Segundos até o prazo da execução."""
+        return self.prazo_execucao - time.monotonic()
+    
+    def _verificar_cancelamento(self, unidade: str) -> None:
+        """
+        Interrompe a unidade se ela estourou o timeout (já contada como falha).
+        Chamado entre as etapas: unidade cancelada não envia arquivos nem grava candles.
+        """
+        controle = getattr(self._local, "controle", None)
+        if controle and controle["cancelamento"].is_set():
+            raise TimeoutError(f"Unidade {unidade} cancelada por timeout")
+    
     def processar_unidade_modo_candles(self, unidade_config: dict) -> bool:
         """
         Modo CANDLES: Download completo (01-hoje) + processamento + atualiza APENAS candles.
@@ -147,22 +202,27 @@ class C09Orchestrator:
             
             # 2. Download com período completo (igual ao modo COMPLETO)
             print(f" Baixando relatório C09...")
-            caminho_relatorio = self.scraper.baixar_relatorio_c09(
+            caminho_relatorio = self._criar_scraper_unidade(unidade).baixar_relatorio_c09(
                 empresa_frotalog=empresa_frotalog,
                 data_inicial=data_inicial,
                 data_final=data_final
             )
             
             # 3. Processamento completo dos dados
+            self._verificar_cancelamento(unidade)
             print(f" Processando dados...")
             processor = self._criar_processor_para_unidade(unidade)
-            buffer_tratado = processor.processar_relatorio_c09(caminho_relatorio)
+            resultado = processor.processar_relatorio_c09(
+                caminho_relatorio,
+                cache_leitura=self.cache_leitura
+            )
             
             # 4. Atualiza APENAS candles (sem alertas, sem métricas pesadas)
+            self._verificar_cancelamento(unidade)
             print(f" Atualizando candles (sem alertas)...")
             sucesso_candles = self._processar_candles_sem_alertas(
                 unidade=unidade,
-                buffer_tratado=buffer_tratado,
+                resultado=resultado,
                 data_referencia=data_final
             )
             
@@ -170,10 +230,10 @@ class C09Orchestrator:
             self._limpar_arquivo_temporario(caminho_relatorio)
             
             if sucesso_candles:
-                print(f" CANDLES {unidade} - Atualizados com sucesso")
+                print(f" CANDLES {unidade} - Gerados (gravação em lote ao fim do ciclo)")
                 return True
             else:
-                print(f" CANDLES {unidade} - Falha na atualização")
+                print(f" CANDLES {unidade} - Falha na geração")
                 return False
                 
         except Exception as e:
@@ -181,14 +241,15 @@ class C09Orchestrator:
             self._log_erro_detalhado(e, f"Modo CANDLES - Unidade {unidade}")
             return False
     
-    def _processar_candles_sem_alertas(self, unidade: str, buffer_tratado: BytesIO, 
+    def _processar_candles_sem_alertas(self, unidade: str, resultado: ResultadoProcessamento, 
                                     data_referencia: datetime) -> bool:
         """
         Processa apenas candles sem sistema de alertas (versão light para modo CANDLES).
+        Os candles ficam em candles_pendentes e são gravados junto com as demais unidades.
         
         Args:
             unidade: Nome da unidade
-            buffer_tratado: Buffer com dados processados
+            resultado: Resultado do processamento (DataFrame em memória)
             data_referencia: Data de referência
             
         Returns:
@@ -202,62 +263,45 @@ class C09Orchestrator:
                 config=self.config
             )
             
-            # Carrega dados do buffer
-            df = processor_analytics.carregar_planilha_buffer(buffer_tratado)
+            # Dados tratados em memória (sem releitura de Excel)
+            df = processor_analytics.carregar_dados_tratados(resultado)
             if df.empty:
                 print(" Dados vazios para candles")
                 return True  # Não é erro, apenas sem dados novos
             
             print(f" Processando candles com {len(df)} registros")
             
-            # Define POIs para candles baseado na unidade
-            if unidade == "RRP":
-                pois_candles = ["Descarga Inocencia", "Carregamento Fabrica RRP", "PA AGUA CLARA", "Oficina JSL"]
-            elif unidade == "TLS":
-                pois_candles = ["PA Celulose", "Manutencao Celulose", "Carregamento Fabrica", "Descarga TAP", "Oficina Central JSL"]
-            else:
+            # POIs para candles vêm da configuração da unidade (coluna candles em POIs_<unidade>)
+            pois_candles = processor_analytics.obter_pois_candles()
+            if not pois_candles:
                 print(f"⚠️ Unidade {unidade} não configurada para candles")
                 return False
             
-            # Processa candles para cada POI
-            mes_atual = data_referencia.month
-            ano_atual = data_referencia.year
-            
-            sucessos = 0
-            total_eventos = 0
+            # Gera candles de todos os POIs em uma passada (já com correção de saídas falsas)
+            print(f"📈 Processando candles: {', '.join(pois_candles)}")
+            df_eventos, df_resumo_hora = processor_analytics.gerar_candles_todos(df, pois_candles)
             
+            eventos_por_poi = df_eventos['POI'].value_counts() if not df_eventos.empty else {}
             for poi in pois_candles:
-                print(f"📈 Processando candles: {poi}")
-                
-                # Gera candles para este POI (já com correção de saídas falsas)
-                df_eventos, df_resumo_hora = processor_analytics.gerar_candles_poi(df, poi)
-                
-                if not df_eventos.empty:
-                    # Atualiza candles no SharePoint
-                    sucesso = processor_analytics.reports_manager.atualizar_candles(
-                        df_eventos_novos=df_eventos,
-                        df_resumo_novos=df_resumo_hora,
-                        poi=poi,
-                        mes=mes_atual,
-                        ano=ano_atual
-                    )
-                    
-                    if sucesso:
-                        sucessos += 1
-                        total_eventos += len(df_eventos)
-                        print(f" {poi}: {len(df_eventos)} eventos atualizados")
-                    else:
-                        print(f" {poi}: Falha na atualização SharePoint")
+                if poi in eventos_por_poi:
+                    print(f" {poi}: {eventos_por_poi[poi]} eventos gerados")
                 else:
                     print(f" {poi}: Nenhum evento no período")
-                    sucessos += 1  # Sem dados é normal, não é erro
+            
+            # Gravação no SharePoint: uma vez para todas as unidades ao fim do ciclo (_salvar_candles_pendentes)
+            self._verificar_cancelamento(unidade)
+            self.candles_pendentes[unidade] = (
+                data_referencia.month,
+                data_referencia.year,
+                processor_analytics.exportar_ocupacao(df_eventos),
+                processor_analytics.exportar_ocupacao(df_resumo_hora)
+            )
             
             # Log final
-            print(f" RESUMO CANDLES: {sucessos}/{len(pois_candles)} POIs processados")
-            print(f" Total de eventos processados: {total_eventos}")
+            print(f" RESUMO CANDLES: {len(eventos_por_poi)}/{len(pois_candles)} POIs com eventos")
+            print(f" Total de eventos processados: {len(df_eventos)}")
             
-            # Considera sucesso se processou todos os POIs
-            return sucessos == len(pois_candles)
+            return True
             
         except ImportError as e:
             print(f" Erro de import no processamento candles: {e}")
@@ -291,23 +335,28 @@ class C09Orchestrator:
             
             # 2. Download do relatório
             print(f"\n[1/4] Baixando relatório C09...")
-            caminho_relatorio = self.scraper.baixar_relatorio_c09(
+            caminho_relatorio = self._criar_scraper_unidade(unidade).baixar_relatorio_c09(
                 empresa_frotalog=empresa_frotalog,
                 data_inicial=data_inicial,
                 data_final=data_final
             )
             
             # 3. Processamento dos dados
+            self._verificar_cancelamento(unidade)
             print(f"\n[2/4] Processando dados...")
             processor = self._criar_processor_para_unidade(unidade)
-            buffer_tratado = processor.processar_relatorio_c09(caminho_relatorio)
+            resultado = processor.processar_relatorio_c09(
+                caminho_relatorio,
+                cache_leitura=self.cache_leitura
+            )
             
             # 4. Upload para SharePoint
+            self._verificar_cancelamento(unidade)
             print(f"\n[3/4] Enviando para SharePoint...")
             sucesso_upload = self._upload_sharepoint(
                 unidade_config=unidade_config,
                 data_referencia=data_final,
-                buffer_tratado=buffer_tratado,
+                resultado=resultado,
                 caminho_original=caminho_relatorio
             )
             
@@ -316,8 +365,9 @@ class C09Orchestrator:
                 return False
             
             # 5. Processamento de analytics completo (com alertas)
+            self._verificar_cancelamento(unidade)
             print(f"\n[4/4] Processamento de analytics...")
-            self._processar_analytics(unidade, buffer_tratado, data_final)
+            self._processar_analytics(unidade, resultado, data_final)
             
             # 6. Limpeza
             self._limpar_arquivo_temporario(caminho_relatorio)
@@ -362,14 +412,14 @@ class C09Orchestrator:
             return False
     
     def _upload_sharepoint(self, unidade_config: dict, data_referencia: datetime, 
-                          buffer_tratado: BytesIO, caminho_original: str) -> bool:
+                          resultado: ResultadoProcessamento, caminho_original: str) -> bool:
         """
         Faz upload dos arquivos para SharePoint.
         
         Args:
             unidade_config: Configuração da unidade
             data_referencia: Data de referência para nome do arquivo
-            buffer_tratado: Buffer com Excel tratado
+            resultado: Resultado do processamento (Excel gerado aqui)
             caminho_original: Caminho do arquivo original
             
         Returns:
@@ -398,7 +448,7 @@ class C09Orchestrator:
                 ano=ano_referencia,
                 mes=nome_pasta_mes,
                 nome_arquivo=nome_arquivo,
-                conteudo=buffer_tratado.read(),
+                conteudo=resultado.excel_bytes,
                 is_buffer=True
             )
             
@@ -406,6 +456,7 @@ class C09Orchestrator:
                 return False
             
             # Upload arquivo original (se configurado)
+            self._verificar_cancelamento(unidade_config["unidade"])
             base_original = unidade_config["base_sharepoint"] + " Original"
             sucesso_original = uploader.upload_arquivo(
                 base_sharepoint=base_original,
@@ -427,13 +478,13 @@ class C09Orchestrator:
             print(f"Erro no upload SharePoint: {e}")
             return False
     
-    def _processar_analytics(self, unidade: str, buffer_tratado: BytesIO, data_referencia: datetime):
+    def _processar_analytics(self, unidade: str, resultado: ResultadoProcessamento, data_referencia: datetime):
         """
         Executa processamento de analytics e alertas (modo completo).
         
         Args:
             unidade: Nome da unidade
-            buffer_tratado: Buffer com dados tratados
+            resultado: Resultado do processamento (DataFrame em memória)
             data_referencia: Data de referência
         """
         try:
@@ -447,7 +498,7 @@ class C09Orchestrator:
             )
             
             sucesso = processor_analytics.processar_analytics_completo(
-                buffer_dados=buffer_tratado,
+                dados_tratados=resultado,
                 data_referencia=data_referencia
             )
             
@@ -509,6 +560,11 @@ class C09Orchestrator:
             True se executado com sucesso
         """
         for tentativa in range(1, max_tentativas + 1):
+            # Nova tentativa só se couber no prazo (app.py encerra o processo depois dele)
+            if tentativa > 1 and self._tempo_restante() <= 0:
+                print(f" Prazo da execução esgotado após {tentativa - 1} tentativa(s)")
+                return False
+            
             try:
                 if self.modo_execucao == "CANDLES":
                     sucesso = self.executar_ciclo_candles()
@@ -524,17 +580,95 @@ class C09Orchestrator:
                 print(f" Tentativa {tentativa}/{max_tentativas} - Erro: {e}")
                 self._log_erro_detalhado(e, f"Tentativa {tentativa}")
                 
-                if tentativa == max_tentativas:
-                    # Última tentativa - enviar e-mail de falha crítica
+                espera = min(60 * tentativa, 600)  # Backoff exponencial, max 10 min
+                if tentativa == max_tentativas or espera >= self._tempo_restante():
+                    # Última tentativa (ou sem prazo para outra) - enviar e-mail de falha crítica
                     self._notificar_falha_critica(e, tentativa)
                     return False
                 
-                # Aguarda antes da próxima tentativa (backoff exponencial)
-                import time
-                time.sleep(min(60 * tentativa, 600))  # Max 10 min
+                # Aguarda antes da próxima tentativa
+                time.sleep(espera)
         
         return False
     
+    def _executar_unidades(self, processar_unidade, unidades_ativas: list) -> dict:
+        """
+        Executa unidades em paralelo (pool limitado a max_unidades_paralelas).
+        
+        Args:
+            processar_unidade: Função que processa uma unidade e retorna True/False
+            unidades_ativas: Configurações das unidades
+            
+        Returns:
+            Dicionário {unidade: True/False}; unidade que estoura o timeout conta como falha
+        """
+        # Por unidade: evento de cancelamento, scraper ativo e início (timeout conta do início, não da fila)
+        controles = {
+            u["unidade"]: {"cancelamento": threading.Event(), "scraper": None, "inicio": None}
+            for u in unidades_ativas
+        }
+        
+        def executar(unidade_config: dict) -> bool:
+            controle = controles[unidade_config["unidade"]]
+            if controle["cancelamento"].is_set():
+                return False
+            
+            controle["inicio"] = time.monotonic()
+            self._local.controle = controle
+            try:
+                return processar_unidade(unidade_config)
+            finally:
+                self._local.controle = None
+        
+        def cancelar(unidade: str) -> None:
+            # Fecha o Chrome da unidade (comando Selenium pendente falha) e interrompe as etapas seguintes
+            controle = controles[unidade]
+            controle["cancelamento"].set()
+            if controle["scraper"]:
+                controle["scraper"].cancelar()
+        
+        num_workers = max(1, min(self.max_unidades_paralelas, len(unidades_ativas)))
+        pool = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="unidade")
+        futuros = {pool.submit(executar, u): u["unidade"] for u in unidades_ativas}
+        resultados = {}
+        
+        try:
+            while len(resultados) < len(futuros):
+                concluidos, _ = wait(
+                    [f for f, unidade in futuros.items() if unidade not in resultados],
+                    timeout=1, return_when=FIRST_COMPLETED
+                )
+                
+                for futuro in concluidos:
+                    unidade = futuros[futuro]
+                    try:
+                        resultados[unidade] = bool(futuro.result())
+                    except Exception as e:
+                        print(f" ERRO {unidade}: {e}")
+                        self._log_erro_detalhado(e, f"Execução paralela - Unidade {unidade}")
+                        resultados[unidade] = False
+                
+                # Timeout da unidade, limitado ao prazo da execução (unidades na fila também falham no prazo)
+                agora = time.monotonic()
+                for unidade, controle in controles.items():
+                    if unidade in resultados:
+                        continue
+                    inicio = controle["inicio"]
+                    if inicio and agora - inicio > self.timeout_unidade:
+                        print(f" TIMEOUT {unidade}: excedeu {self.timeout_unidade}s")
+                    elif agora > self.prazo_execucao:
+                        print(f" TIMEOUT {unidade}: prazo da execução esgotado")
+                    else:
+                        continue
+                    cancelar(unidade)
+                    resultados[unidade] = False
+        finally:
+            # Unidade cancelada termina sozinha ao ver o cancelamento; não bloqueia o ciclo esperando por ela
+            pool.shutdown(wait=False, cancel_futures=True)
+        
+        # Mantém a ordem das unidades na configuração
+        return {u["unidade"]: resultados[u["unidade"]] for u in unidades_ativas}
+    
     def executar_ciclo_candles(self) -> bool:
         """
         Executa ciclo rápido para todas as unidades (modo 10min).
@@ -546,21 +680,61 @@ class C09Orchestrator:
         
         print(f" MODO CANDLES - Atualizando {len(unidades_ativas)} unidades...")
         
-        sucessos = 0
-        falhas = 0
-        
-        for unidade_config in unidades_ativas:
-            sucesso = self.processar_unidade_modo_candles(unidade_config)
-            
-            if sucesso:
-                sucessos += 1
-            else:
-                falhas += 1
+        self.candles_pendentes = {}
+        resultados = self._executar_unidades(self.processar_unidade_modo_candles, unidades_ativas)
+        resultados = self._salvar_candles_pendentes(resultados)
+        sucessos = sum(resultados.values())
+        falhas = len(resultados) - sucessos
         
         # Relatório resumido
+        for unidade, sucesso in resultados.items():
+            print(f" {unidade}: {'✅' if sucesso else '❌'}")
         print(f"\n CANDLES CONCLUÍDO: {sucessos}✅ {falhas}❌")
+        print(self.cache_leitura.resumo())
+        print(obter_cache_sharepoint().resumo())
+        print(obter_provedor_sessoes().resumo())
         return falhas == 0
     
+    def _salvar_candles_pendentes(self, resultados: dict) -> dict:
+        """
+        Grava candles gerados pelas unidades do ciclo com uma atualização das partições de reports
+        (um manifesto por mês de referência; só partições alteradas são enviadas).
+        
+        Args:
+            resultados: Dicionário {unidade: True/False} da geração
+            
+        Returns:
+            Resultados atualizados; unidade cujo lote falhou passa a contar como falha
+        """
+        pendentes, self.candles_pendentes = self.candles_pendentes, {}
+        
+        # Unidade com falha/timeout não grava (dados podem estar incompletos)
+        por_mes = defaultdict(dict)
+        for unidade, (mes, ano, df_eventos, df_resumo_hora) in pendentes.items():
+            if resultados.get(unidade) and not df_eventos.empty:
+                por_mes[(mes, ano)][unidade] = (df_eventos, df_resumo_hora)
+        
+        if not por_mes:
+            return resultados
+        
+        from core.reports_sharepoint import criar_reports_manager
+        reports_manager = criar_reports_manager(
+            username=self.credenciais["sp_user"],
+            password=self.credenciais["sp_password"]
+        )
+        
+        resultados = dict(resultados)
+        for (mes, ano), candles_por_unidade in por_mes.items():
+            print(f" Gravando candles em lote ({mes:02d}/{ano}): {', '.join(candles_por_unidade)}")
+            sucesso = reports_manager.atualizar_candles_lote(candles_por_unidade, mes=mes, ano=ano)
+            
+            if not sucesso:
+                print(f" Falha na gravação em lote dos candles: {', '.join(candles_por_unidade)}")
+                for unidade in candles_por_unidade:
+                    resultados[unidade] = False
+        
+        return resultados
+    
     def executar_ciclo_completo(self) -> bool:
         """
         Executa ciclo completo para todas as unidades (modo 1h).
@@ -570,56 +744,45 @@ class C09Orchestrator:
         """
         unidades_ativas = [u for u in self.config["unidades"] if u.get("ativo", True)]
         
-        print(f"Iniciando processamento de {len(unidades_ativas)} unidades...")
-        
-        sucessos = 0
-        falhas = 0
+        print(f"Iniciando processamento de {len(unidades_ativas)} unidades "
+              f"(até {self.max_unidades_paralelas} em paralelo)...")
         
-        for unidade_config in unidades_ativas:
-            unidade = unidade_config["unidade"]
-            print(f"\n AGUARDANDO PROCESSAMENTO DE {unidade}...")
-            print(f" Outras unidades aguardarão {unidade} terminar completamente")
-            
-            sucesso = self.processar_unidade_modo_completo(unidade_config)
-            
-            if sucesso:
-                sucessos += 1
-                print(f" {unidade} CONCLUÍDA - Próxima unidade pode iniciar")
-            else:
-                falhas += 1
-                print(f" {unidade} FALHADA - Continuando para próxima unidade")
-            
-            # Pausa entre unidades para garantir limpeza
-            import time
-            time.sleep(2)
+        resultados = self._executar_unidades(self.processar_unidade_modo_completo, unidades_ativas)
+        sucessos = sum(resultados.values())
+        falhas = len(resultados) - sucessos
         
         # Relatório final
         print(f"\n{'='*60}")
         print(f"RELATÓRIO FINAL")
         print(f"{'='*60}")
+        for unidade, sucesso in resultados.items():
+            print(f" {unidade}: {'CONCLUÍDA' if sucesso else 'FALHADA'}")
         print(f" Sucessos: {sucessos}")
         print(f" Falhas: {falhas}")
         print(f" Total: {len(unidades_ativas)}")
+        print(self.cache_leitura.resumo())
+        print(obter_cache_sharepoint().resumo())
+        print(obter_provedor_sessoes().resumo())
         
         if falhas > 0:
             print(f"\n ATENÇÃO: {falhas} unidade(s) falharam!")
-            self._notificar_falhas(falhas)
+            self._notificar_falhas([unidade for unidade, sucesso in resultados.items() if not sucesso])
         
         return falhas == 0
     
-    def _notificar_falhas(self, num_falhas: int):
+    def _notificar_falhas(self, unidades_falhas: list):
         """
         Notifica falhas por e-mail.
         
         Args:
-            num_falhas: Número de falhas ocorridas
+            unidades_falhas: Unidades que falharam (erro ou timeout)
         """
         try:
             from core.email_notifier import EmailNotifier
             
             notifier = EmailNotifier(self.config)
             notifier.enviar_falha_sistema(
-                erro=f"{num_falhas} unidade(s) falharam no processamento",
+                erro=f"{len(unidades_falhas)} unidade(s) falharam no processamento: {', '.join(unidades_falhas)}",
                 contexto=f"Modo {self.modo_execucao}",
                 timestamp=datetime.now()
             )